@@ -2,17 +2,31 @@ import asyncio
 import logging
 
 from agents import (
+    AdmissionController,
     AgentRegistry,
+    BudgetController,
     CommunicationAgent,
     EscalationAgent,
     InstallmentPlanAgent,
     RiskAssessmentAgent,
     TaskAgent,
+    WorkerAutoscaler,
+    create_queue,
+    workflow_tracker,
 )
-from chromadb.utils import embedding_functions
-from config import chroma_client
-from knowledge import KnowledgeBase
+from config import settings
+from knowledge import RuleEngine, get_knowledge_base
+from messages import Envelope
 from models import DebtorProfile
+from observability import (
+    JsonlSpanExporter,
+    LoopWatchdog,
+    MetricsServer,
+    cost_ledger,
+    tracer,
+)
+from runtime import ProcessRuntime, default_specs
+from transport import open_transport
 
 logging.basicConfig(level=logging.INFO)
 
@@ -20,53 +34,47 @@ logging.basicConfig(level=logging.INFO)
 async def main():
     try:
         # Initialize shared components
-        agent_registry = AgentRegistry()
+        transport = open_transport()
+        await transport.connect()
+        agent_registry = AgentRegistry(
+            transport,
+            strategies=settings.ROUTING_STRATEGIES,
+            default_strategy=settings.ROUTING_STRATEGY,
+        )
 
         # Define queues
-        task_queue = asyncio.Queue()
-        escalation_queue = asyncio.Queue()
-        risk_assessment_queue = asyncio.Queue()
-        installment_plan_queue = asyncio.Queue()
-        debtor_communication_queue = asyncio.Queue()
+        task_queue = create_queue("TaskAgent")
+        escalation_queue = create_queue("EscalationAgent")
+        risk_assessment_queue = create_queue("RiskAssessmentAgent")
+        installment_plan_queue = create_queue("InstallmentPlanAgent")
+        debtor_communication_queue = create_queue("CommunicationAgent")
+        admission = AdmissionController(task_queue, rate=settings.INGRESS_MAX_RATE)
 
         # Register queues with the registry
         agent_registry.register("escalate", escalation_queue)
         agent_registry.register("installment_plan", installment_plan_queue)
 
         # Define agents
+        knowledge_base = get_knowledge_base("business_rules")
         task_agent = TaskAgent(
             "TaskAgent",
             task_queue,
-            KnowledgeBase(
-                chroma_client.get_collection(
-                    "business_rules",
-                    embedding_function=embedding_functions.DefaultEmbeddingFunction(),
-                )
-            ),
+            knowledge_base,
             agent_registry,
+            rule_engine=RuleEngine(knowledge_base),
         )
 
         installment_agent = InstallmentPlanAgent(
             "InstallmentPlanAgent",
             installment_plan_queue,
-            KnowledgeBase(
-                chroma_client.get_collection(
-                    "business_rules",
-                    embedding_function=embedding_functions.DefaultEmbeddingFunction(),
-                )
-            ),
+            knowledge_base,
             agent_registry,
         )
 
         communication_agent = CommunicationAgent(
             "CommunicationAgent",
             debtor_communication_queue,
-            KnowledgeBase(
-                chroma_client.get_collection(
-                    "business_rules",
-                    embedding_function=embedding_functions.DefaultEmbeddingFunction(),
-                )
-            ),
+            knowledge_base,
             agent_registry,
         )
 
@@ -78,12 +86,58 @@ async def main():
             "RiskAssessmentAgent", risk_assessment_queue, agent_registry
         )
 
+        agents = [
+            task_agent,
+            escalation_agent,
+            installment_agent,
+            risk_assessment_agent,
+            communication_agent,
+        ]
+        autoscalers = []
+        if settings.AUTOSCALE_INTERVAL:
+            autoscalers = [
+                WorkerAutoscaler(
+                    agent,
+                    *settings.WORKER_BOUNDS.get(agent.name, (1, 20)),
+                    interval=settings.AUTOSCALE_INTERVAL,
+                )
+                for agent in agents
+            ]
+
+        cost_ledger.prices.update(settings.OAI_PRICES)
+        cost_ledger.export_path = settings.COST_EXPORT_PATH
+        cost_ledger.flush_interval = settings.COST_FLUSH_INTERVAL
+        if settings.BUDGET_TOKENS_PER_MINUTE or settings.BUDGET_DAILY_SPEND:
+            budget = BudgetController(
+                settings.BUDGET_TOKENS_PER_MINUTE,
+                settings.BUDGET_DAILY_SPEND,
+                settings.BUDGET_SLOW_DOWN_AT,
+            )
+            cost_ledger.add_listener(budget.observe)
+            for agent in (task_agent, installment_agent, communication_agent):
+                agent.budget = budget
+
+        if settings.TRACE_EXPORT_PATH:
+            tracer.configure(JsonlSpanExporter(settings.TRACE_EXPORT_PATH))
+
+        watchdog = None
+        if settings.WATCHDOG_THRESHOLD is not None:
+            watchdog = LoopWatchdog(
+                settings.WATCHDOG_THRESHOLD,
+                settings.WATCHDOG_INTERVAL,
+                export_path=settings.WATCHDOG_EXPORT_PATH,
+            )
+            await watchdog.start()
+
+        if settings.METRICS_PORT is not None:
+            await MetricsServer(
+                agents, settings.METRICS_HOST, settings.METRICS_PORT, watchdog
+            ).start()
+
         asyncio.gather(
-            task_agent.run(),
-            escalation_agent.run(),
-            installment_agent.run(),
-            risk_assessment_agent.run(),
-            communication_agent.run(),
+            *(agent.run() for agent in agents),
+            *(autoscaler.run() for autoscaler in autoscalers),
+            cost_ledger.run(),
         )
 
         debtor_profile = DebtorProfile(
@@ -95,7 +149,17 @@ async def main():
             outstanding_balance=2000.0,
             name="John Doe",
         )
-        await task_queue.put(debtor_profile)
+        envelope = Envelope.ingress(debtor_profile)
+        completion = workflow_tracker.track(envelope.workflow_id)
+        if await admission.submit(envelope):
+            result = await completion
+            logging.info(
+                f"Workflow {result.workflow_id} finished by {result.agent} "
+                f"after {result.latency:.2f}s: {result.envelope.breakdown()}"
+            )
+        else:
+            workflow_tracker.forget(envelope.workflow_id)
+            logging.warning(f"Profile {debtor_profile.name} was not admitted.")
 
         await asyncio.Event().wait()
 
@@ -103,5 +167,34 @@ async def main():
         logging.error(f"A main exception occurred: {e}")
 
 
+async def main_processes():
+    """Runs every agent in its own processes, see RUNTIME_PROCESSES."""
+    runtime = ProcessRuntime(default_specs(settings.RUNTIME_PROCESSES))
+    try:
+        runtime.start()
+        supervisor = asyncio.create_task(runtime.supervise())
+
+        debtor_profile = DebtorProfile(
+            communication_state="NO_RESPONSE",
+            income=50000,
+            installment_plan=None,
+            risk_level=None,
+            overdue_days=120,
+            outstanding_balance=2000.0,
+            name="John Doe",
+        )
+        await runtime.submit("next_action", Envelope.ingress(debtor_profile))
+
+        await supervisor
+
+    except Exception as e:
+        logging.error(f"A main exception occurred: {e}")
+    finally:
+        runtime.stop()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if settings.RUNTIME == "process":
+        asyncio.run(main_processes())
+    else:
+        asyncio.run(main())
@@ -1,15 +1,65 @@
+from .autoscaler import WorkerAutoscaler
+from .base import (
+    BudgetController,
+    WorkflowResult,
+    WorkflowTracker,
+    workflow_tracker,
+)
+from .cache import DecisionCache
+from .calculator import InstallmentPlanCalculator
 from .communication import CommunicationAgent
+from .durable import DurableQueue
 from .escalation import EscalationAgent
 from .installment import InstallmentPlanAgent
+from .priority import priority_score
+from .queues import (
+    AdmissionController,
+    BackpressurePolicy,
+    BoundedQueue,
+    PriorityInbox,
+    QueueRejectedError,
+    create_queue,
+)
 from .registry import AgentRegistry
 from .risk import RiskAssessmentAgent
+from .routing import (
+    Broadcast,
+    LeastQueueDepth,
+    PowerOfTwoChoices,
+    RoundRobin,
+    RoutingStrategy,
+)
+from .sinks import BufferSink, LoggingSink, MessageSink
 from .task import TaskAgent
 
 __all__ = [
+    "AdmissionController",
     "AgentRegistry",
+    "BackpressurePolicy",
+    "BoundedQueue",
+    "Broadcast",
+    "BudgetController",
+    "BufferSink",
     "CommunicationAgent",
+    "DecisionCache",
+    "DurableQueue",
     "EscalationAgent",
     "InstallmentPlanAgent",
+    "InstallmentPlanCalculator",
+    "LeastQueueDepth",
+    "LoggingSink",
+    "MessageSink",
+    "PowerOfTwoChoices",
+    "PriorityInbox",
+    "QueueRejectedError",
     "RiskAssessmentAgent",
+    "RoundRobin",
+    "RoutingStrategy",
     "TaskAgent",
+    "WorkerAutoscaler",
+    "WorkflowResult",
+    "WorkflowTracker",
+    "create_queue",
+    "priority_score",
+    "workflow_tracker",
 ]
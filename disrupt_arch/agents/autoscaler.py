@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+from .base.agent import Agent
+
+
+class WorkerAutoscaler:
+    def __init__(
+        self,
+        agent: Agent,
+        min_workers: int = 1,
+        max_workers: int = 20,
+        target_latency: float = 1.0,
+        interval: float = 1.0,
+        idle_ticks: int = 5,
+    ):
+        """
+        Grows and shrinks the worker set of an agent between bounds.
+        :param agent: The agent to scale.
+        :param min_workers: Lower bound of workers.
+        :param max_workers: Upper bound of workers.
+        :param target_latency: Seconds in which the queued messages should be
+            handled. Together with the service time this gives the workers needed.
+        :param interval: Seconds between scaling decisions.
+        :param idle_ticks: Consecutive decisions with an empty queue and idle
+            workers before a worker is removed.
+        """
+        self.agent = agent
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_latency = target_latency
+        self.interval = interval
+        self.idle_ticks = idle_ticks
+        self.idle_streak = 0
+        self.rate_limited = self.downstream_rate_limited()
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self.decisions = deque(maxlen=100)
+
+    def downstream_rate_limited(self) -> int:
+        backend = getattr(self.agent, "reasoning_backend", None)
+        return getattr(backend, "rate_limited", 0)
+
+    def desired_workers(self) -> tuple[int, str]:
+        """Returns the number of workers the agent should have and why."""
+        workers = self.agent.active_workers
+        depth = self.agent.queue.qsize()
+
+        rate_limited = self.downstream_rate_limited()
+        saturated = rate_limited > self.rate_limited
+        self.rate_limited = rate_limited
+        if saturated:
+            return workers // 2, "downstream saturated"
+
+        busy = workers - len(self.agent.idle_workers)
+        needed = math.ceil(
+            (depth + busy) * self.agent.service_time / self.target_latency
+        )
+        if depth and needed > workers:
+            self.idle_streak = 0
+            return needed, f"queue depth {depth}"
+
+        if depth == 0 and self.agent.idle_workers:
+            self.idle_streak += 1
+            if self.idle_streak >= self.idle_ticks:
+                self.idle_streak = 0
+                return workers - 1, "idle"
+        else:
+            self.idle_streak = 0
+        return workers, "steady"
+
+    def scale(self):
+        """Takes one scaling decision and applies it."""
+        workers = self.agent.active_workers
+        desired, reason = self.desired_workers()
+        desired = max(self.min_workers, min(self.max_workers, desired))
+        if desired == workers:
+            return
+
+        for _ in range(desired - workers):
+            self.agent.add_worker()
+        for _ in range(workers - desired):
+            self.agent.remove_worker()
+
+        if desired > workers:
+            self.scale_ups += 1
+        else:
+            self.scale_downs += 1
+        self.decisions.append(
+            {
+                "time": time.time(),
+                "from": workers,
+                "to": desired,
+                "reason": reason,
+                "queue_depth": self.agent.queue.qsize(),
+                "service_time": self.agent.service_time,
+            }
+        )
+        logging.info(
+            f"{self.agent.name} scaling from {workers} to {desired} workers: {reason}"
+        )
+
+    async def run(self):
+        """Takes scaling decisions in the configured interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.scale()
+            except Exception as e:
+                logging.error(f"{self.agent.name} autoscaler error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.agent.active_workers,
+            "min_workers": self.min_workers,
+            "max_workers": self.max_workers,
+            "queue_depth": self.agent.queue.qsize(),
+            "service_time": self.agent.service_time,
+            "scale_ups": self.scale_ups,
+            "scale_downs": self.scale_downs,
+            "last_decision": self.decisions[-1] if self.decisions else None,
+        }
@@ -1,4 +1,19 @@
+from .budget import BudgetController
 from .cognitive import CognitiveAgent
 from .operational import OperationalAgent
+from .prompt import PromptBuilder
+from .publisher import Publisher
+from .reasoning import ReasoningBackend
+from .workflows import WorkflowResult, WorkflowTracker, workflow_tracker
 
-__all__ = ["CognitiveAgent", "OperationalAgent"]
+__all__ = [
+    "BudgetController",
+    "CognitiveAgent",
+    "OperationalAgent",
+    "PromptBuilder",
+    "Publisher",
+    "ReasoningBackend",
+    "WorkflowResult",
+    "WorkflowTracker",
+    "workflow_tracker",
+]
@@ -1,49 +1,327 @@
 import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
 from asyncio import Queue
+from contextvars import ContextVar
 
+from messages import Envelope
 from models import DebtorProfile
+from observability import AgentMetrics
+from observability.tracing import Span, current_span, tracer
+
+from .publisher import Publisher, pending_publishes
+from .workflows import WorkflowResult, workflow_tracker
+
+# Weight of the latest measurement in the moving average of the service time.
+SERVICE_TIME_ALPHA = 0.2
+
+# Seconds a stopping agent waits for its pending publishes.
+SHUTDOWN_TIMEOUT = 5.0
+
+# Envelopes of the messages a worker is processing, by the id of their profile.
+current_envelopes: ContextVar[dict[int, Envelope]] = ContextVar(
+    "current_envelopes", default={}
+)
+# Unix time the worker received its current messages.
+current_received_at: ContextVar[float | None] = ContextVar(
+    "current_received_at", default=None
+)
+# Spans of the queue waits of the current messages, by the id of their profile.
+current_waits: ContextVar[dict[int, Span]] = ContextVar("current_waits", default={})
 
 
 class Agent(ABC):
-    def __init__(self, name: str, queue: Queue, num_workers: int = 5):
+    def __init__(
+        self,
+        name: str,
+        queue: Queue,
+        num_workers: int = 5,
+        batch_size: int = 1,
+        batch_window: float = 0.0,
+        max_pending_publishes: int = 100,
+    ):
         """
         Base class for all agents.
         :param name: The name of the agent.
         :param queue: The asyncio queue for receiving messages.
         :param num_workers: Number of worker tasks to process messages concurrently.
+        :param batch_size: Maximum number of messages a worker processes at once.
+            A batch size of 1 disables batching.
+        :param batch_window: Seconds a worker waits for a batch to fill up.
+        :param max_pending_publishes: Maximum number of background publishes.
         """
         self.name = name
         self.queue = queue
         self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
         self.tasks = []
+        self.idle_workers: set[asyncio.Task] = set()
+        self.retiring = 0
+        self.service_time = 0.0
+        self.messages_processed = 0
+        self.publisher = Publisher(self, max_pending_publishes)
+        self.workflows = workflow_tracker
+        self.metrics = AgentMetrics()
+        self.tracer = tracer
 
     @abstractmethod
     async def process_message(self, message: DebtorProfile):
         """Process a message received."""
         pass
 
+    async def process_batch(self, messages: list[DebtorProfile]):
+        """Process a batch of messages. Processes them one by one unless overridden."""
+        for message in messages:
+            await self.process_message(message)
+
     async def publish_message(self, queues: list[Queue] | None, entity: DebtorProfile):
-        """Publish message in target queues."""
+        """
+        Publish message in target queues. Full queues apply their backpressure
+        policy, so this waits, drops or raises QueueFull depending on the queue.
+        """
         if not queues:
-            logging.warning(
-                f"{self.name}: No agents available for target queue.")
+            logging.warning(f"{self.name}: No agents available for target queue.")
             return
 
-        for queue in queues:
-            await queue.put(entity)
-            logging.info(
-                f"{self.name} published profile {entity.name} in queue {queue}.")
+        parent = current_span.get() or self.lookup(current_waits.get(), entity)
+        with self.tracer.span(
+            f"{self.name}.publish", parent, agent=self.name, queues=len(queues)
+        ) as span:
+            message = self.seal(entity, span)
+            for index, queue in enumerate(queues):
+                try:
+                    # Every receiver of a broadcast gets its own copy of the profile.
+                    if index and isinstance(message, Envelope):
+                        await queue.put(message.update())
+                    else:
+                        await queue.put(message)
+                except asyncio.QueueFull:
+                    logging.error(
+                        f"{self.name}: Target queue rejected profile {entity.name}."
+                    )
+                    raise
+        logging.info(
+            f"{self.name} published profile {entity.name} in {len(queues)} queues."
+        )
+
+    def open_envelopes(self, messages: list) -> list[DebtorProfile]:
+        """
+        Returns the profiles of received messages and remembers the envelopes
+        of the enveloped ones for publishing. The time an envelope waited in the
+        queue is traced as span of its workflow. A single message is processed
+        within the span of its wait.
+        """
+        received_at = time.time()
+        envelopes = {}
+        waits = {}
+        profiles = []
+        for message in messages:
+            if isinstance(message, Envelope):
+                envelopes[id(message.profile)] = message
+                sent_at = (
+                    message.timings[-1][1] if message.timings else message.created_at
+                )
+                self.metrics.observe("queue_wait", received_at - sent_at)
+                wait = self.tracer.record(
+                    f"{self.name}.queue_wait",
+                    sent_at,
+                    received_at,
+                    message.workflow_id,
+                    message.span_id,
+                    agent=self.name,
+                )
+                if wait is not None:
+                    waits[id(message.profile)] = wait
+                message = message.profile
+            profiles.append(message)
+        current_envelopes.set(envelopes)
+        current_received_at.set(received_at)
+        current_waits.set(waits)
+        current_span.set(
+            next(iter(waits.values())) if len(messages) == 1 and waits else None
+        )
+        return profiles
+
+    @staticmethod
+    def lookup(current: dict, entity: DebtorProfile):
+        """
+        Returns what belongs to the message of a profile, or to the only message
+        if the profile is a new one.
+        """
+        found = current.get(id(entity))
+        if found is None and len(current) == 1:
+            (found,) = current.values()
+        return found
+
+    def revise(self, entity: DebtorProfile, **fields) -> DebtorProfile:
+        """
+        Returns a copy of a received profile with updated fields. The profile
+        itself is left untouched and the copy is published in its envelope.
+        """
+        revised = entity.model_copy(update=fields)
+        for current in (current_envelopes.get(), current_waits.get()):
+            if id(entity) in current:
+                current[id(revised)] = current[id(entity)]
+        return revised
+
+    def seal(
+        self, entity: DebtorProfile, span: Span | None = None
+    ) -> DebtorProfile | Envelope:
+        """
+        Puts a profile to publish into the envelope of the workflow it belongs to.
+        Profiles of messages received without envelope are published as they are.
+        :param span: The span publishing the profile, passed on as trace context.
+        """
+        envelope = self.lookup(current_envelopes.get(), entity)
+        if envelope is None:
+            return entity
+        return envelope.with_profile(
+            entity,
+            hop=self.name,
+            received_at=current_received_at.get(),
+            span_id=span.span_id if span is not None else None,
+        )
+
+    def complete_workflow(
+        self, entity: DebtorProfile, result=None, error: Exception | None = None
+    ):
+        """
+        Reports the workflow of a profile as finished. Called by terminal agents
+        once they handled the profile. Profiles without envelope are ignored.
+        """
+        envelope = self.seal(entity)
+        if isinstance(envelope, Envelope):
+            self.workflows.complete(WorkflowResult(envelope, self.name, result, error))
+
+    async def next_batch(self) -> list[DebtorProfile]:
+        """
+        Waits for a message and gathers further messages until the batch is full
+        or the batch window has elapsed.
+        """
+        messages = [await self.queue.get()]
+        # Holding a message, the worker must not be stopped as an idle one.
+        self.idle_workers.discard(asyncio.current_task())
+        deadline = time.monotonic() + self.batch_window
+
+        while len(messages) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                messages.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except TimeoutError:
+                break
+
+        return messages
+
+    def acknowledge(self, messages: list):
+        """
+        Acknowledges processed messages to a durable queue once the publishes
+        they caused are done, so a restart does not lose their results.
+        """
+        ack = getattr(self.queue, "ack", None)
+        if ack is None:
+            return
+
+        started = pending_publishes.get() or []
+        publishes = [task for task in started if not task.done()]
+        if not publishes:
+            ack(messages)
+            return
+
+        remaining = len(publishes)
+
+        def published(_):
+            nonlocal remaining
+            remaining -= 1
+            if not remaining:
+                ack(messages)
+
+        for task in publishes:
+            task.add_done_callback(published)
+
+    def record_service_time(self, seconds: float, messages: int = 1):
+        """Updates the moving average of the processing time per message."""
+        per_message = seconds / messages
+        if self.messages_processed == 0:
+            self.service_time = per_message
+        else:
+            self.service_time += SERVICE_TIME_ALPHA * (per_message - self.service_time)
+        self.messages_processed += messages
+        for _ in range(messages):
+            self.metrics.observe("service_time", per_message)
+        self.metrics.count("messages", messages)
+
+    def gauges(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "in_flight": len(self.tasks) - len(self.idle_workers),
+            "workers": len(self.tasks),
+        }
+
+    def snapshot(self) -> dict:
+        """Returns the current runtime metrics of the agent."""
+        return {
+            **self.gauges(),
+            **self.metrics.snapshot(),
+            "publisher": self.publisher.stats(),
+        }
 
     async def worker(self):
         """Worker task that continuously processes messages asynchronously."""
+        current = asyncio.current_task()
         while True:
+            if self.retiring:
+                self.retiring -= 1
+                logging.info(f"{self.name} worker retired.")
+                break
+
             try:
-                message = await self.queue.get()
+                self.idle_workers.add(current)
+                if self.batch_size > 1:
+                    received = await self.next_batch()
+                    messages = self.open_envelopes(received)
+                    pending_publishes.set([])
+                    self.idle_workers.discard(current)
+                    logging.info(
+                        f"{self.name} processing batch of {len(messages)} messages"
+                    )
+
+                    spans = [
+                        self.tracer.start_span(
+                            f"{self.name}.process",
+                            wait,
+                            agent=self.name,
+                            batch_size=len(messages),
+                        )
+                        for wait in current_waits.get().values()
+                    ]
+                    started = time.perf_counter()
+                    await self.process_batch(messages)
+                    self.record_service_time(
+                        time.perf_counter() - started, len(messages)
+                    )
+                    for span in spans:
+                        self.tracer.end_span(span)
+                    self.acknowledge(received)
+
+                    for _ in messages:
+                        self.queue.task_done()
+                    continue
+
+                received = await self.queue.get()
+                (message,) = self.open_envelopes([received])
+                pending_publishes.set([])
+                self.idle_workers.discard(current)
                 logging.info(f"{self.name} processing message: {message}")
 
-                await self.process_message(message)
+                started = time.perf_counter()
+                with self.tracer.span(f"{self.name}.process", agent=self.name):
+                    await self.process_message(message)
+                self.record_service_time(time.perf_counter() - started)
+                self.acknowledge([received])
 
                 self.queue.task_done()
 
@@ -51,19 +329,53 @@ class Agent(ABC):
                 logging.warning(f"{self.name} worker task cancelled: {e}")
                 break
             except Exception as e:
+                self.metrics.count("errors")
                 logging.error(f"{self.name} encountered an error: {e}")
+            finally:
+                self.idle_workers.discard(current)
+
+    def add_worker(self):
+        """Starts another worker task."""
+        task = asyncio.create_task(self.worker())
+        task.add_done_callback(self.forget_worker)
+        self.tasks.append(task)
+
+    def forget_worker(self, task: asyncio.Task):
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def remove_worker(self):
+        """
+        Stops a worker task. An idle worker is stopped right away, otherwise the
+        next worker to finish its message retires.
+        """
+        if self.idle_workers:
+            task = self.idle_workers.pop()
+            task.cancel()
+            self.forget_worker(task)
+        else:
+            self.retiring += 1
+
+    @property
+    def active_workers(self) -> int:
+        return len(self.tasks) - self.retiring
 
     async def run(self):
-        """Starts multiple worker tasks for parallel message processing."""
+        """
+        Starts multiple worker tasks for parallel message processing and runs
+        until cancelled. Workers may be added and removed while running.
+        """
         logging.info(f"{self.name} starting {self.num_workers} workers...")
-        self.tasks = [asyncio.create_task(self.worker())
-                      for _ in range(self.num_workers)]
+        for _ in range(self.num_workers):
+            self.add_worker()
 
         try:
-            await asyncio.gather(*self.tasks)
+            while self.tasks:
+                await asyncio.wait(list(self.tasks))
         except asyncio.CancelledError as e:
-            logging.warning(
-                f"{self.name} CancelledError. Agent shutting down: {e}")
+            logging.warning(f"{self.name} CancelledError. Agent shutting down: {e}")
         finally:
-            logging.warning(
-                f"{self.name} ensuring all tasks complete before shutdown.")
+            logging.warning(f"{self.name} ensuring all tasks complete before shutdown.")
+            for task in list(self.tasks):
+                task.cancel()
+            await self.publisher.drain(SHUTDOWN_TIMEOUT)
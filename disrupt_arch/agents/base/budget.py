@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+
+def seconds_until_midnight() -> float:
+    """Seconds until the next day begins in UTC."""
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (midnight - now).total_seconds()
+
+
+class BudgetController:
+    def __init__(
+        self,
+        tokens_per_minute: int | None = None,
+        daily_spend: float | None = None,
+        slow_down_at: float = 0.8,
+        max_delay: float = 5.0,
+        window: float = 60.0,
+    ):
+        """
+        Throttles the completions of cognitive agents as the usage approaches a
+        ceiling. Above the slow down threshold every completion is delayed, the
+        more the closer the usage is to the ceiling. At the ceiling completions
+        pause until tokens leave the window or the next day begins in UTC.
+        Completions are accounted once they finished, so concurrent completions
+        can overshoot a ceiling by what they use.
+        :param tokens_per_minute: Ceiling of tokens in the sliding window.
+        :param daily_spend: Ceiling of the USD spent per day.
+        :param slow_down_at: Fraction of a ceiling from which on completions are
+            delayed.
+        :param max_delay: Seconds a completion is delayed just below a ceiling.
+            A paused completion checks the budget again at this interval.
+        :param window: Seconds of the sliding window of the token ceiling.
+        """
+        self.tokens_per_minute = tokens_per_minute
+        self.daily_spend = daily_spend
+        self.slow_down_at = slow_down_at
+        self.max_delay = max_delay
+        self.window = window
+        self.usage: deque[tuple[float, int]] = deque()
+        self.window_tokens = 0
+        self.day = datetime.now(timezone.utc).date()
+        self.spent = 0.0
+        self.delayed = 0
+        self.paused = 0
+        self.delayed_seconds = 0.0
+
+    def observe(self, tokens: int, cost: float):
+        """Accounts a finished completion. Listens to the CostLedger."""
+        self.roll_over()
+        self.usage.append((time.monotonic(), tokens))
+        self.window_tokens += tokens
+        self.spent += cost
+
+    def roll_over(self):
+        """Drops tokens that left the window and the spend of past days."""
+        expired = time.monotonic() - self.window
+        while self.usage and self.usage[0][0] <= expired:
+            self.window_tokens -= self.usage.popleft()[1]
+        today = datetime.now(timezone.utc).date()
+        if today != self.day:
+            self.day = today
+            self.spent = 0.0
+
+    def pressure(self) -> float:
+        """Returns the used fraction of the tightest ceiling."""
+        self.roll_over()
+        fractions = [0.0]
+        if self.tokens_per_minute:
+            fractions.append(self.window_tokens / self.tokens_per_minute)
+        if self.daily_spend:
+            fractions.append(self.spent / self.daily_spend)
+        return max(fractions)
+
+    def delay(self) -> float:
+        """Returns the seconds the next completion should wait."""
+        pressure = self.pressure()
+        if pressure >= 1.0:
+            waits = []
+            if self.daily_spend and self.spent >= self.daily_spend:
+                waits.append(seconds_until_midnight())
+            if self.tokens_per_minute and self.window_tokens >= self.tokens_per_minute:
+                waits.append(self.usage[0][0] + self.window - time.monotonic())
+            return max(max(waits, default=0.0), 0.0)
+        if pressure <= self.slow_down_at:
+            return 0.0
+        return (
+            self.max_delay * (pressure - self.slow_down_at) / (1.0 - self.slow_down_at)
+        )
+
+    async def admit(self):
+        """Waits before a completion as long as the budget requires."""
+        delay = self.delay()
+        if delay <= 0:
+            return
+
+        if self.pressure() >= 1.0:
+            self.paused += 1
+            logging.warning(f"Budget exhausted, pausing completions for {delay:.1f}s.")
+        else:
+            self.delayed += 1
+        started = time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(min(delay, self.max_delay))
+            if self.pressure() < 1.0:
+                break
+            delay = self.delay()
+        self.delayed_seconds += time.monotonic() - started
+
+    def stats(self) -> dict:
+        return {
+            "pressure": self.pressure(),
+            "window_tokens": self.window_tokens,
+            "spent_today": self.spent,
+            "delayed": self.delayed,
+            "paused": self.paused,
+            "delayed_seconds": self.delayed_seconds,
+        }
@@ -1,71 +1,233 @@
 import logging
+import time
 from abc import abstractmethod
 from asyncio import Queue
-from typing import Type
+from collections import deque
+from typing import Sequence, Type
 
-from config import openai_client
 from knowledge import KnowledgeBase
+from models import DebtorProfile
+from observability.costs import cost_ledger
 from pydantic import BaseModel
 
-from .agent import Agent
+from .agent import Agent, current_envelopes
+from .budget import BudgetController
+from .prompt import PromptBuilder
+from .reasoning import ReasoningBackend
 
 
 class CognitiveAgent(Agent):
-    def __init__(self, name: str, input_queue: Queue, knowledge_base: KnowledgeBase):
+    def __init__(
+        self,
+        name: str,
+        input_queue: Queue,
+        knowledge_base: KnowledgeBase,
+        reasoning_backend: ReasoningBackend | None = None,
+        budget: BudgetController | None = None,
+        **kwargs,
+    ):
         """
         Base class for agents that use reasoning capabilities.
         :param name: The name of the agent.
         :param input_queue: The asyncio queue for receiving messages.
         :param knowledge_base: The KnowledgeBase instance for reasoning.
+        :param reasoning_backend: The async reasoning backend. Each agent gets its own
+            backend with its own in-flight limit unless one is provided.
+        :param budget: Throttles completions near a token or spend ceiling.
+            Usually shared by all cognitive agents.
+        :param kwargs: Further worker options passed on to Agent.
         """
-        super().__init__(name, input_queue)
+        super().__init__(name, input_queue, **kwargs)
         self.knowledge_base = knowledge_base
+        self.reasoning_backend = reasoning_backend or ReasoningBackend()
+        self.prompt_builder = PromptBuilder()
+        self.stream_metrics = deque(maxlen=1000)
+        self.budget = budget
+        self.costs = cost_ledger
 
     @abstractmethod
     async def process_message(self, message):
         pass
 
     async def reason_structured(
-        self, content: str, response_format: Type[BaseModel], task: str
+        self,
+        content: str,
+        response_format: Type[BaseModel],
+        task: str,
+        rules: tuple[str, ...] = (),
+        entities: Sequence[DebtorProfile] = (),
     ):
+        """
+        Generates a completion parsed into the response format.
+        :param entities: The profiles the completion is made for. Its cost is
+            split among their workflows.
+        """
         try:
-            completion = openai_client.beta.chat.completions.parse(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a debt collection assistant. {task}",
-                    },
-                    {"role": "user", "content": content},
-                ],
-                response_format=response_format,
-            )
+            await self.admit()
+            self.metrics.count("llm_calls")
+            started = time.perf_counter()
+            with self.tracer.span(
+                f"{self.name}.llm", **self.llm_attributes(response_format.__name__)
+            ) as span:
+                completion = await self.reasoning_backend.parse(
+                    messages=self.prompt_builder.messages(task, content, rules),
+                    response_format=response_format,
+                )
+                self.record_completion(
+                    started, getattr(completion, "usage", None), span, entities
+                )
 
             result = completion.choices[0].message.parsed
 
             return result
         except Exception as e:
+            self.metrics.count("llm_errors")
+            logging.error(f"{self.name} encountered an error reasoning: {e}")
+
+    async def reason_unstructured(
+        self,
+        content: str,
+        task: str,
+        rules: tuple[str, ...] = (),
+        entities: Sequence[DebtorProfile] = (),
+    ):
+        """
+        Generates a plain text completion.
+        :param entities: The profiles the completion is made for. Its cost is
+            split among their workflows.
+        """
+        try:
+            await self.admit()
+            self.metrics.count("llm_calls")
+            started = time.perf_counter()
+            with self.tracer.span(
+                f"{self.name}.llm", **self.llm_attributes("text")
+            ) as span:
+                completion = await self.reasoning_backend.create(
+                    messages=self.prompt_builder.messages(
+                        task, content, rules, role="developer"
+                    ),
+                )
+                self.record_completion(
+                    started, getattr(completion, "usage", None), span, entities
+                )
+
+            result = completion.choices[0].message
+
+            return result
+        except Exception as e:
+            self.metrics.count("llm_errors")
             logging.error(f"{self.name} encountered an error reasoning: {e}")
 
-    async def reason_unstructured(self, content: str, task: str):
+    async def reason_streaming(
+        self, content: str, task: str, sink, entity, rules: tuple[str, ...] = ()
+    ) -> str | None:
+        """
+        Generates a plain text completion incrementally, forwards every chunk to
+        the sink and records time to first token and tokens per second.
+        :param sink: The MessageSink receiving the chunks.
+        :param entity: The profile the message is generated for.
+        :return: The complete message.
+        """
         try:
-            completion = openai_client.chat.completions.create(
-                model="gpt-4o-2024-08-06",
-                messages=[
-                    {
-                        "role": "developer",
-                        "content": f"You are a debt collection assistant. {task}",
-                    },
-                    {"role": "user", "content": content},
-                ],
-            )
-
-            resukt = completion.choices[0].message
-
-            return resukt
+            await self.admit()
+            self.metrics.count("llm_calls")
+            start_time = time.perf_counter()
+            first_token_time = None
+            chunks = []
+            completion_tokens = None
+            usage = None
+
+            with self.tracer.span(
+                f"{self.name}.llm", **self.llm_attributes("stream")
+            ) as span:
+                async for chunk in self.reasoning_backend.stream(
+                    messages=self.prompt_builder.messages(
+                        task, content, rules, role="developer"
+                    )
+                ):
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                        completion_tokens = chunk.usage.completion_tokens
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter()
+                    chunks.append(chunk.choices[0].delta.content)
+                    await sink.write(entity, chunks[-1])
+
+                end_time = time.perf_counter()
+                self.record_completion(start_time, usage, span, [entity])
+            message = "".join(chunks)
+            await sink.close(entity, message)
+
+            tokens = completion_tokens if completion_tokens is not None else len(chunks)
+            metrics = {
+                "time_to_first_token": (first_token_time or end_time) - start_time,
+                "duration": end_time - start_time,
+                "tokens": tokens,
+                "tokens_per_second": tokens / (end_time - start_time)
+                if end_time > start_time
+                else 0.0,
+            }
+            self.stream_metrics.append(metrics)
+            logging.info(f"{self.name} streamed message: {metrics}")
+
+            return message
         except Exception as e:
+            self.metrics.count("llm_errors")
             logging.error(f"{self.name} encountered an error reasoning: {e}")
 
+    def llm_attributes(self, response_format: str) -> dict:
+        return {
+            "agent": self.name,
+            "llm.model": self.reasoning_backend.model,
+            "llm.response_format": response_format,
+        }
+
+    async def admit(self):
+        """Waits before a completion while the budget requires it."""
+        if self.budget is not None:
+            await self.budget.admit()
+
+    def record_completion(
+        self,
+        started: float,
+        usage,
+        span=None,
+        entities: Sequence[DebtorProfile] = (),
+    ):
+        """
+        Records the latency and the usage block of a completion and accounts
+        its cost to the workflows of the profiles it was made for.
+        """
+        self.metrics.observe("llm_latency", time.perf_counter() - started)
+        self.metrics.record_usage(usage)
+        envelopes = current_envelopes.get()
+        workflow_ids = []
+        for entity in entities:
+            envelope = self.lookup(envelopes, entity)
+            if envelope is not None:
+                workflow_ids.append(envelope.workflow_id)
+        self.costs.record(self.name, self.reasoning_backend.model, usage, workflow_ids)
+        if span is not None and usage is not None:
+            for key in ("prompt_tokens", "completion_tokens"):
+                tokens = getattr(usage, key, None)
+                if isinstance(tokens, int):
+                    span.set_attribute(f"llm.{key}", tokens)
+
     async def query_knowledge(self, query):
-        """Queries the knowledge base."""
-        return self.knowledge_base.query_knowledge(query)
+        """Queries the knowledge base without blocking the event loop."""
+        self.metrics.count("retrievals")
+        started = time.perf_counter()
+        with self.tracer.span(f"{self.name}.retrieval", agent=self.name):
+            result = await self.knowledge_base.aquery_knowledge(query)
+        self.metrics.observe("retrieval_latency", time.perf_counter() - started)
+        return result
+
+    def snapshot(self) -> dict:
+        usage = self.costs.agents.get(self.name)
+        snapshot = {**super().snapshot(), "cost": usage.cost if usage else 0.0}
+        if self.budget is not None:
+            snapshot["budget"] = self.budget.stats()
+        return snapshot
@@ -0,0 +1,144 @@
+import json
+import logging
+from functools import cache
+
+from pydantic import BaseModel
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@cache
+def get_encoding():
+    """
+    Returns the tokenizer of the reasoning model, or None if unavailable. Cached,
+    so a missing tokenizer is logged once.
+    """
+    if tiktoken is None:
+        logging.warning("tiktoken is not installed, estimating token counts.")
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.warning(f"Unable to load tokenizer, estimating token counts: {e}")
+        return None
+
+
+def tokens_estimated() -> bool:
+    """Whether token counts are estimated, since the tokenizer is unavailable."""
+    return get_encoding() is None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text. Without the optional tiktoken package they are
+    estimated at 4 characters per token, see tokens_estimated.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+class PromptBuilder:
+    def __init__(self, preamble: str = "You are a debt collection assistant."):
+        """
+        Builds compact prompts whose static part comes first, so that provider side
+        prefix caching applies to the instructions and business rules.
+        :param preamble: The first sentence of every system prompt.
+        """
+        self.preamble = preamble
+        self.prefixes: dict[tuple, tuple[str, int]] = {}
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.last_prompt_tokens = 0
+
+    @staticmethod
+    def encode_profile(entity: BaseModel) -> str:
+        """
+        Canonical, compact JSON encoding of a profile. Missing values are kept as
+        explicit nulls, since business rules ask for them, e.g. a missing risk
+        level.
+        """
+        return json.dumps(
+            entity.model_dump(mode="json"),
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+
+    @classmethod
+    def encode_profiles(cls, entities: dict[str, BaseModel]) -> str:
+        """Encodes profiles keyed by their profile key."""
+        return "{%s}" % ",".join(
+            f"{json.dumps(key)}:{cls.encode_profile(entity)}"
+            for key, entity in entities.items()
+        )
+
+    @classmethod
+    def encode_rules(cls, rules) -> tuple[str, ...]:
+        """
+        Extracts the rule documents from knowledge base results, a list of results
+        or plain text, with normalized whitespace and without duplicates.
+        """
+        documents = []
+        if rules is None:
+            pass
+        elif isinstance(rules, str):
+            documents.append(rules)
+        elif isinstance(rules, dict):
+            for group in rules.get("documents") or []:
+                documents.extend(group)
+        else:
+            for result in rules:
+                documents.extend(cls.encode_rules(result))
+
+        normalized = (
+            " ".join(document.strip('" \n').split()) for document in documents
+        )
+        return tuple(dict.fromkeys(document for document in normalized if document))
+
+    def system_prompt(self, task: str, rules: tuple[str, ...] = ()) -> tuple[str, int]:
+        """
+        Returns the static system prompt of a task and its rules with its token
+        count. Both are computed once per distinct combination.
+        """
+        key = (task, rules)
+        prefix = self.prefixes.get(key)
+        if prefix is None:
+            text = f"{self.preamble} {task}"
+            if rules:
+                text += "\nBusiness rules:\n" + "\n".join(f"- {rule}" for rule in rules)
+            prefix = self.prefixes[key] = (text, count_tokens(text))
+        return prefix
+
+    def messages(
+        self,
+        task: str,
+        content: str,
+        rules: tuple[str, ...] = (),
+        role: str = "system",
+    ) -> list[dict]:
+        """Builds the messages of a prompt and records its token count."""
+        system_prompt, prefix_tokens = self.system_prompt(task, rules)
+
+        self.last_prompt_tokens = prefix_tokens + count_tokens(content)
+        self.prompts += 1
+        self.prompt_tokens += self.last_prompt_tokens
+
+        return [
+            {"role": role, "content": system_prompt},
+            {"role": "user", "content": content},
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "prompts": self.prompts,
+            "prompt_tokens": self.prompt_tokens,
+            "avg_prompt_tokens": self.prompt_tokens / self.prompts
+            if self.prompts
+            else 0.0,
+            "prefixes": len(self.prefixes),
+            "estimated": tokens_estimated(),
+        }
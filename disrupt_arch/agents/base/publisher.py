@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from asyncio import Queue
+from contextvars import ContextVar
+
+from models import DebtorProfile
+
+# Publishing tasks started while a worker processes its current messages.
+pending_publishes: ContextVar[list[asyncio.Task] | None] = ContextVar(
+    "pending_publishes", default=None
+)
+
+
+class Publisher:
+    def __init__(self, agent, max_in_flight: int = 100):
+        """
+        Publishes the messages of an agent in the background. Keeps track of the
+        publishing tasks, bounds their number and counts their outcome.
+        :param agent: The publishing agent.
+        :param max_in_flight: Maximum number of publishing tasks. Further publishes
+            wait until one of them finished.
+        """
+        self.agent = agent
+        self.max_in_flight = max_in_flight
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.tasks: set[asyncio.Task] = set()
+        self.high_water_mark = 0
+        self.published = 0
+        self.failed = 0
+        self.last_error: str | None = None
+
+    async def publish(self, queues: list[Queue], entity: DebtorProfile):
+        """Starts publishing a message, waiting while too many publishes are pending."""
+        await self.publish_many([(queues, entity)])
+
+    async def publish_many(self, messages: list[tuple[list[Queue], DebtorProfile]]):
+        """Starts publishing several messages in one task."""
+        if not messages:
+            return
+
+        await self.slots.acquire()
+        task = asyncio.create_task(self.publish_all(messages))
+        self.tasks.add(task)
+        self.high_water_mark = max(self.high_water_mark, len(self.tasks))
+        task.add_done_callback(self.finish)
+        started = pending_publishes.get()
+        if started is not None:
+            started.append(task)
+
+    async def publish_all(self, messages: list[tuple[list[Queue], DebtorProfile]]):
+        for queues, entity in messages:
+            try:
+                await self.agent.publish_message(queues, entity)
+                self.published += 1
+            except Exception as e:
+                self.failed += 1
+                self.last_error = repr(e)
+                logging.error(
+                    f"{self.agent.name} failed to publish profile {entity.name}: {e}"
+                )
+
+    def finish(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        self.slots.release()
+
+    async def drain(self, timeout: float | None = None) -> bool:
+        """Waits for pending publishes. Returns whether all of them finished."""
+        if not self.tasks:
+            return True
+        _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+        if pending:
+            logging.warning(
+                f"{self.agent.name} has {len(pending)} unfinished publishes."
+            )
+        return not pending
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.tasks),
+            "max_in_flight": self.max_in_flight,
+            "high_water_mark": self.high_water_mark,
+            "published": self.published,
+            "failed": self.failed,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Type
+
+from config import async_openai_client, settings
+from openai import AsyncOpenAI, RateLimitError
+from pydantic import BaseModel
+
+
+class ReasoningBackend:
+    def __init__(
+        self,
+        client: AsyncOpenAI | None = None,
+        model: str | None = None,
+        max_in_flight: int | None = None,
+        timeout: float | None = None,
+    ):
+        """
+        Non-blocking access to the reasoning model.
+        :param client: The async OpenAI client. Defaults to the shared, pooled client.
+        :param model: The model used for completions.
+        :param max_in_flight: Maximum number of concurrent completions.
+        :param timeout: Timeout in seconds for a single completion.
+        """
+        self.client = client or async_openai_client
+        self.model = model or settings.OAI_MODEL
+        self.max_in_flight = max_in_flight or settings.OAI_MAX_IN_FLIGHT
+        self.timeout = timeout or settings.OAI_TIMEOUT
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.rate_limited = 0
+
+    async def parse(self, messages: list[dict], response_format: Type[BaseModel]):
+        """Requests a completion parsed into the given response format."""
+        async with self.semaphore:
+            try:
+                return await self.client.beta.chat.completions.parse(
+                    model=self.model,
+                    messages=messages,
+                    response_format=response_format,
+                    timeout=self.timeout,
+                )
+            except RateLimitError:
+                self.rate_limited += 1
+                raise
+
+    async def create(self, messages: list[dict]):
+        """Requests a plain text completion."""
+        async with self.semaphore:
+            try:
+                return await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=self.timeout,
+                )
+            except RateLimitError:
+                self.rate_limited += 1
+                raise
+
+    async def stream(self, messages: list[dict]):
+        """Requests a plain text completion and yields its chunks as they arrive."""
+        async with self.semaphore:
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=self.timeout,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+            except RateLimitError:
+                self.rate_limited += 1
+                raise
+            async for chunk in stream:
+                yield chunk
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from messages import Envelope
+
+
+class WorkflowResult:
+    def __init__(
+        self,
+        envelope: Envelope,
+        agent: str,
+        result=None,
+        error: Exception | None = None,
+    ):
+        """
+        Outcome of a workflow, reported by the terminal agent that finished it.
+        :param envelope: The last envelope of the workflow including the hop of
+            the terminal agent.
+        :param agent: Name of the terminal agent.
+        :param result: What the terminal agent produced, e.g. the contact message.
+        :param error: The exception the terminal agent failed with, if any.
+        """
+        self.envelope = envelope
+        self.agent = agent
+        self.result = result
+        self.error = error
+        self.completed_at = time.time()
+
+    @property
+    def workflow_id(self) -> str:
+        return self.envelope.workflow_id
+
+    @property
+    def latency(self) -> float:
+        """Seconds from entering the system until the workflow finished."""
+        return self.completed_at - self.envelope.created_at
+
+
+class WorkflowTracker:
+    def __init__(self):
+        """
+        Completion futures of workflows. Callers track a workflow before it is
+        submitted and await its future, listeners are called for every finished
+        workflow.
+        """
+        self.futures: dict[str, asyncio.Future] = {}
+        self.listeners: list[Callable[[WorkflowResult], None]] = []
+        self.completed = 0
+        self.failed = 0
+
+    def track(self, workflow_id: str) -> asyncio.Future:
+        """Returns the future resolved with the WorkflowResult of a workflow."""
+        future = self.futures.get(workflow_id)
+        if future is None or future.get_loop().is_closed():
+            future = asyncio.get_running_loop().create_future()
+            self.futures[workflow_id] = future
+        return future
+
+    def forget(self, workflow_id: str):
+        """Stops tracking a workflow, e.g. after waiting for it timed out."""
+        future = self.futures.pop(workflow_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def add_listener(self, listener: Callable[[WorkflowResult], None]):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[WorkflowResult], None]):
+        self.listeners.remove(listener)
+
+    def complete(self, result: WorkflowResult):
+        """
+        Resolves the future of a finished workflow and notifies the listeners.
+        Workflows that branch resolve their future with the first result.
+        """
+        if result.error is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+        future = self.futures.pop(result.workflow_id, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+        for listener in self.listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                logging.error(f"Workflow listener failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.futures),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+# Tracker shared by the agents of a process.
+workflow_tracker = WorkflowTracker()
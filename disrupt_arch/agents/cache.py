@@ -0,0 +1,103 @@
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from models import DebtorProfile, NextBestAction
+
+# Overdue day bands of the seeded business rules. Bucket i holds the values
+# up to and including boundary i, e.g. 0-60, 61-120 and more than 120 days.
+DEFAULT_BUCKETS = {
+    "risk_level": None,
+    "overdue_days": [60, 120],
+    "communication_state": None,
+}
+
+
+class DecisionCache:
+    def __init__(
+        self,
+        buckets: dict[str, list[float] | None] | None = None,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+    ):
+        """
+        LRU and TTL cache for next best actions keyed on bucketed profile features.
+        :param buckets: Profile fields forming the key, mapped to ascending bucket
+            boundaries. Fields mapped to None are used as they are.
+        :param max_size: Maximum number of cached decisions.
+        :param ttl: Seconds a cached decision stays valid.
+        """
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[tuple, tuple[float, NextBestAction]] = OrderedDict()
+        self.knowledge_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, entity: DebtorProfile) -> tuple:
+        """Builds the canonical cache key of a profile."""
+        key = []
+        for field, boundaries in self.buckets.items():
+            value = getattr(entity, field)
+            if boundaries is not None and value is not None:
+                value = bisect_left(boundaries, value)
+            key.append((field, value))
+        return tuple(key)
+
+    def get(
+        self, entity: DebtorProfile, knowledge_version=None
+    ) -> NextBestAction | None:
+        """Returns the cached decision for a profile or None on a miss."""
+        self.sync(knowledge_version)
+        key = self.key(entity)
+        entry = self.entries.get(key)
+
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self.entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self, entity: DebtorProfile, decision: NextBestAction, knowledge_version=None
+    ):
+        """Caches the decision for the bucket of a profile."""
+        self.sync(knowledge_version)
+        key = self.key(entity)
+        self.entries[key] = (time.monotonic(), decision)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def sync(self, knowledge_version):
+        """Drops all decisions when the business rules have changed."""
+        if knowledge_version != self.knowledge_version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.knowledge_version = knowledge_version
+
+    def invalidate(self):
+        self.entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,99 @@
+import numpy as np
+from models import DebtorProfile, InstallmentPlan, RiskLevel
+
+# Payment durations in months by risk level as defined by the seeded business
+# rule for installment plans. Any other risk level spreads over 3 months.
+DURATION_BY_RISK = {RiskLevel.HIGH.value: 12, RiskLevel.MEDIUM.value: 6}
+DEFAULT_DURATION = 3
+INCOME_SHARE = 0.2
+
+
+class InstallmentPlanCalculator:
+    def __init__(
+        self,
+        duration_by_risk: dict[str, int] | None = None,
+        default_duration: int = DEFAULT_DURATION,
+        income_share: float = INCOME_SHARE,
+    ):
+        """
+        Vectorized implementation of the installment plan business rule.
+        :param duration_by_risk: Payment duration in months by risk level.
+        :param default_duration: Payment duration for any other risk level.
+        :param income_share: Maximum share of the monthly income paid per month.
+        """
+        self.duration_by_risk = duration_by_risk or DURATION_BY_RISK
+        self.default_duration = default_duration
+        self.income_share = income_share
+
+    def calculate_arrays(
+        self, balances: np.ndarray, incomes: np.ndarray, durations: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculates installment plans for whole columns of debtor data.
+        :param balances: Outstanding balances.
+        :param incomes: Monthly incomes.
+        :param durations: Payment durations in months derived from the risk levels.
+        :return: Monthly payments, durations in months and a mask of the rows the
+            rule can be applied to. Rows outside the mask are exceptions.
+        """
+        balances = np.asarray(balances, dtype=np.float64)
+        incomes = np.asarray(incomes, dtype=np.float64)
+        durations = np.asarray(durations, dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            monthly_payments = np.minimum(
+                balances / durations, incomes * self.income_share
+            )
+            valid = (
+                np.isfinite(monthly_payments)
+                & (monthly_payments > 0)
+                & (balances > 0)
+                & (durations > 0)
+            )
+            # The epsilon keeps exact divisions such as 2000 / (2000 / 12) from
+            # being truncated to one month less due to floating point error.
+            months = np.floor(np.where(valid, balances / monthly_payments, 0) + 1e-9)
+
+        return monthly_payments, months.astype(np.int64), valid
+
+    def durations(self, profiles: list[DebtorProfile]) -> np.ndarray:
+        """Payment durations of the profiles. Profiles without a risk level get 0."""
+        return np.fromiter(
+            (
+                0
+                if p.risk_level is None
+                else self.duration_by_risk.get(p.risk_level, self.default_duration)
+                for p in profiles
+            ),
+            dtype=np.float64,
+            count=len(profiles),
+        )
+
+    def calculate(self, profiles: list[DebtorProfile]) -> list[InstallmentPlan | None]:
+        """
+        Calculates the installment plans of a batch of profiles.
+        :return: One plan per profile, None for profiles the rule cannot be applied
+            to, e.g. because the risk has not been assessed or there is no income.
+        """
+        count = len(profiles)
+        balances = np.fromiter(
+            (p.outstanding_balance for p in profiles), dtype=np.float64, count=count
+        )
+        incomes = np.fromiter(
+            (p.income for p in profiles), dtype=np.float64, count=count
+        )
+
+        monthly_payments, months, valid = self.calculate_arrays(
+            balances, incomes, self.durations(profiles)
+        )
+
+        return [
+            InstallmentPlan.model_construct(
+                monthly_payment=payment, duration_months=duration
+            )
+            if is_valid
+            else None
+            for payment, duration, is_valid in zip(
+                monthly_payments.tolist(), months.tolist(), valid.tolist()
+            )
+        ]
@@ -4,8 +4,9 @@ import logging
 from knowledge import KnowledgeBase
 from models import DebtorProfile
 
-from .base import CognitiveAgent
+from .base import CognitiveAgent, ReasoningBackend
 from .registry import AgentRegistry
+from .sinks import LoggingSink, MessageSink
 
 
 class CommunicationAgent(CognitiveAgent):
@@ -15,27 +16,45 @@ class CommunicationAgent(CognitiveAgent):
         queue: asyncio.Queue,
         knowledge_base: KnowledgeBase,
         agent_registry: AgentRegistry,
+        reasoning_backend: ReasoningBackend | None = None,
+        stream: bool = False,
+        sink: MessageSink | None = None,
     ):
-        super().__init__(name, queue, knowledge_base)
+        super().__init__(name, queue, knowledge_base, reasoning_backend)
         self.agent_registry = agent_registry
         self.agent_registry.register("contact_debtor", queue)
+        self.stream = stream
+        self.sink = sink or LoggingSink()
         self.task = "Your task is to evaluate debtor information and write a personalized message to the debtor to suggest the created payment plan."
 
     async def process_message(self, entity: DebtorProfile):
         try:
             logging.info(f"{self.name} received message: {entity}")
 
-            reasoning_task = asyncio.create_task(
-                self.reason_unstructured(
-                    content=entity.model_dump_json(), task=self.task
+            if self.stream:
+                reasoning = self.reason_streaming(
+                    content=self.prompt_builder.encode_profile(entity),
+                    task=self.task,
+                    sink=self.sink,
+                    entity=entity,
                 )
-            )
+            else:
+                reasoning = self.reason_unstructured(
+                    content=self.prompt_builder.encode_profile(entity),
+                    task=self.task,
+                    entities=[entity],
+                )
+            reasoning_task = asyncio.create_task(reasoning)
 
             result = await reasoning_task
+            if result is None:
+                raise RuntimeError(f"No contact message created for {entity.name}.")
 
             logging.info(
                 f"{self.name} created contact message for {entity.name}: {result}"
             )
+            self.complete_workflow(entity, result)
 
         except Exception as e:
             logging.error(f"{self.name} encountered an exception: {e}")
+            self.complete_workflow(entity, error=e)
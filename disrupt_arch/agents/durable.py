@@ -0,0 +1,343 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import zlib
+
+from messages import decode_local_message, encode_local_message
+
+# A record is its payload length, the crc32 of the payload and its offset,
+# followed by the encoded message.
+RECORD_HEADER = struct.Struct("<IIQ")
+# The ack log holds the offsets of acknowledged records.
+ACK_RECORD = struct.Struct("<Q")
+SEGMENT_SUFFIX = ".log"
+ACK_LOG = "acks"
+
+
+class Segment:
+    def __init__(self, path: str, base: int):
+        """
+        A file of the log holding the records from the base offset onwards.
+        :param path: The segment file.
+        :param base: Offset of the first record.
+        """
+        self.path = path
+        self.base = base
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self.size = os.fstat(self.fd).st_size
+        self.map: mmap.mmap | None = None
+        self.pending = 0
+
+    def append(self, offset: int, payload: bytes) -> int:
+        """Appends a record and returns its position."""
+        position = self.size
+        header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), offset)
+        os.write(self.fd, header + payload)
+        self.size += RECORD_HEADER.size + len(payload)
+        return position
+
+    def read(self, position: int) -> bytes:
+        """Reads the payload of the record at a position through a memory map."""
+        if self.map is None or position + RECORD_HEADER.size > len(self.map):
+            self.remap()
+        length, _, _ = RECORD_HEADER.unpack_from(self.map, position)
+        start = position + RECORD_HEADER.size
+        if start + length > len(self.map):
+            self.remap()
+        return self.map[start : start + length]
+
+    def remap(self):
+        if self.map is not None:
+            self.map.close()
+        self.map = mmap.mmap(self.fd, self.size, access=mmap.ACCESS_READ)
+
+    def scan(self):
+        """
+        Yields the offset and position of every intact record. A torn record at
+        the end of the segment, left by a crash during a write, is cut off.
+        """
+        if not self.size:
+            return
+        self.remap()
+        position = 0
+        while position + RECORD_HEADER.size <= self.size:
+            length, checksum, offset = RECORD_HEADER.unpack_from(self.map, position)
+            start = position + RECORD_HEADER.size
+            if (
+                start + length > self.size
+                or zlib.crc32(self.map[start : start + length]) != checksum
+            ):
+                break
+            yield offset, position
+            position = start + length
+
+        if position < self.size:
+            logging.warning(
+                f"Truncating torn record at {position} of segment {self.path}."
+            )
+            self.map.close()
+            self.map = None
+            os.ftruncate(self.fd, position)
+            self.size = position
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        os.close(self.fd)
+
+
+class DurableQueue(asyncio.Queue):
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = 0,
+        segment_size: int = 64 * 1024 * 1024,
+        commit_delay: float = 0.002,
+        fsync: bool = True,
+    ):
+        """
+        Agent inbox backed by an append-only log on disk. Every message put into
+        the queue is appended to the current segment of the log and read back
+        through a memory map when it is taken, so only the positions of waiting
+        messages are held in memory. Agents acknowledge a message once they have
+        processed it and published its results. Reopening the queue after a
+        crash or restart delivers the unacknowledged messages again in order.
+        Fully acknowledged segments are deleted.
+        :param path: Directory of the log. Only one queue may use it at a time.
+        :param maxsize: Maximum number of waiting messages, 0 for no limit.
+        :param segment_size: Bytes after which a new segment is started.
+        :param commit_delay: Seconds a commit waits to sync further writes with
+            a single fsync.
+        :param fsync: Whether commits fsync the log. Without fsync messages
+            survive a crash of the process, but not of the machine.
+        """
+        super().__init__(maxsize)
+        self.path = path
+        self.segment_size = segment_size
+        self.commit_delay = commit_delay
+        self.fsync = fsync
+        self.segments: dict[int, Segment] = {}
+        self.delivered: dict[int, tuple] = {}
+        self.acked: set[int] = set()
+        self.next_offset = 0
+        self.written = 0
+        self.committed = 0
+        self.commits = 0
+        self.committing: asyncio.Future | None = None
+        self.compacting: asyncio.Future | None = None
+        self.compact_again = False
+        os.makedirs(path, exist_ok=True)
+        self.recover()
+
+    def recover(self):
+        """Opens the log and queues the records that were not acknowledged."""
+        ack_path = os.path.join(self.path, ACK_LOG)
+        self.ack_fd = os.open(ack_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        with open(ack_path, "rb") as file:
+            data = file.read()
+        complete = len(data) - len(data) % ACK_RECORD.size
+        if complete < len(data):
+            os.ftruncate(self.ack_fd, complete)
+        self.acked = {offset for (offset,) in ACK_RECORD.iter_unpack(data[:complete])}
+
+        bases = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        for base in bases:
+            segment = self.open_segment(base)
+            # A segment may have been started before its first record was written.
+            self.next_offset = max(self.next_offset, base)
+            for offset, position in segment.scan():
+                self.next_offset = offset + 1
+                if offset not in self.acked:
+                    segment.pending += 1
+                    self._queue.append((segment, position, offset))
+
+        stale = [s for s in list(self.segments.values())[:-1] if not s.pending]
+        for segment in stale:
+            self.delete_segment(segment)
+        if stale:
+            write_acks(self.temporary_ack_path(), self.acked, self.fsync)
+            self.replace_acks()
+        if not self.segments:
+            self.open_segment(self.next_offset)
+        self.active = self.segments[max(self.segments)]
+
+        self._unfinished_tasks = len(self._queue)
+        if self._queue:
+            self._finished.clear()
+            logging.info(
+                f"Recovered {len(self._queue)} unacknowledged messages from {self.path}."
+            )
+
+    def open_segment(self, base: int) -> Segment:
+        segment = Segment(os.path.join(self.path, f"{base:020d}{SEGMENT_SUFFIX}"), base)
+        self.segments[base] = segment
+        return segment
+
+    def delete_segment(self, segment: Segment):
+        """
+        Deletes a fully acknowledged segment and forgets its acks. The ack log
+        is rewritten by the caller.
+        """
+        del self.segments[segment.base]
+        segment.close()
+        os.unlink(segment.path)
+
+        first = min(self.segments) if self.segments else self.next_offset
+        self.acked = {offset for offset in self.acked if offset >= first}
+
+    def compact_acks(self):
+        """Rewrites the ack log in the background, one rewrite at a time."""
+        if self.compacting is None or self.compacting.done():
+            self.compacting = asyncio.ensure_future(self.rewrite_acks())
+        else:
+            self.compact_again = True
+
+    async def rewrite_acks(self):
+        """
+        Replaces the ack log by the acks of the remaining segments. The new log
+        is written and synced from a worker thread, acks logged meanwhile are
+        carried over once it replaces the old one.
+        """
+        while True:
+            self.compact_again = False
+            acked = set(self.acked)
+            await asyncio.to_thread(
+                write_acks, self.temporary_ack_path(), acked, self.fsync
+            )
+            self.replace_acks(self.acked - acked)
+            if not self.compact_again:
+                return
+
+    def temporary_ack_path(self) -> str:
+        return os.path.join(self.path, ACK_LOG + ".tmp")
+
+    def replace_acks(self, missed: set[int] = frozenset()):
+        """Swaps in the rewritten ack log and appends the acks it misses."""
+        ack_path = os.path.join(self.path, ACK_LOG)
+        os.replace(self.temporary_ack_path(), ack_path)
+        os.close(self.ack_fd)
+        self.ack_fd = os.open(ack_path, os.O_RDWR | os.O_APPEND)
+        if missed:
+            os.write(
+                self.ack_fd, b"".join(ACK_RECORD.pack(offset) for offset in missed)
+            )
+            self.written += 1
+            self.schedule_commit()
+
+    def _put(self, item):
+        if self.active.size >= self.segment_size:
+            full = self.active
+            self.active = self.open_segment(self.next_offset)
+            if not full.pending:
+                self.delete_segment(full)
+                self.compact_acks()
+        offset = self.next_offset
+        self.next_offset += 1
+        position = self.active.append(offset, encode_local_message(item))
+        self.active.pending += 1
+        self.written += 1
+        self._queue.append((self.active, position, offset))
+
+    def _get(self):
+        segment, position, offset = self._queue.popleft()
+        item = decode_local_message(segment.read(position))
+        self.delivered[id(item)] = (segment, offset, item)
+        return item
+
+    async def put(self, item):
+        """Puts a message into the queue and waits until it is committed."""
+        await super().put(item)
+        await self.commit()
+
+    def ack(self, items: list):
+        """
+        Acknowledges processed messages so they are not delivered again after a
+        restart. The acks become durable with the next commit.
+        """
+        for item in items:
+            delivery = self.delivered.pop(id(item), None)
+            if delivery is None:
+                continue
+            segment, offset, _ = delivery
+            os.write(self.ack_fd, ACK_RECORD.pack(offset))
+            self.acked.add(offset)
+            self.written += 1
+            segment.pending -= 1
+            if not segment.pending and segment is not self.active:
+                self.delete_segment(segment)
+                self.compact_acks()
+        self.schedule_commit()
+
+    def schedule_commit(self):
+        if self.committed < self.written and (
+            self.committing is None or self.committing.done()
+        ):
+            self.committing = asyncio.ensure_future(self.group_commit())
+
+    async def commit(self):
+        """Waits until everything written so far is on disk."""
+        target = self.written
+        while self.committed < target:
+            self.schedule_commit()
+            await asyncio.shield(self.committing)
+
+    async def group_commit(self):
+        """Syncs the writes of all puts and acks since the last commit at once."""
+        if self.commit_delay:
+            await asyncio.sleep(self.commit_delay)
+        target = self.written
+        if self.fsync:
+            # Duplicates keep the files open while the segments may be deleted.
+            fds = [os.dup(segment.fd) for segment in self.segments.values()]
+            fds.append(os.dup(self.ack_fd))
+            await asyncio.to_thread(sync_files, fds)
+        self.committed = max(self.committed, target)
+        self.commits += 1
+
+    def close(self):
+        """Syncs and closes the log. Unacknowledged messages stay in the log."""
+        if self.compacting is not None:
+            # The old ack log is complete, the rewrite is done on reopening.
+            self.compacting.cancel()
+        if self.fsync:
+            sync_files(
+                [os.dup(segment.fd) for segment in self.segments.values()]
+                + [os.dup(self.ack_fd)]
+            )
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
+        os.close(self.ack_fd)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.qsize(),
+            "capacity": self.maxsize,
+            "unacknowledged": sum(s.pending for s in self.segments.values()),
+            "segments": len(self.segments),
+            "log_bytes": sum(s.size for s in self.segments.values()),
+            "commits": self.commits,
+        }
+
+
+def write_acks(path: str, acked: set[int], fsync: bool):
+    with open(path, "wb") as file:
+        file.write(b"".join(ACK_RECORD.pack(offset) for offset in acked))
+        file.flush()
+        if fsync:
+            os.fsync(file.fileno())
+
+
+def sync_files(fds: list[int]):
+    for fd in fds:
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -12,7 +12,12 @@ class EscalationAgent(OperationalAgent):
 
     async def process_message(self, entity):
         logging.info(f"{self.name} received profile: {entity}")
-        await self.execute_task(entity)
+        try:
+            await self.execute_task(entity)
+        except Exception as e:
+            self.complete_workflow(entity, error=e)
+            raise
+        self.complete_workflow(entity)
 
     async def execute_task(self, task):
         logging.info(f"{self.name}: Executing escalation task {task}")
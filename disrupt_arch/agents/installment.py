@@ -1,45 +1,159 @@
 import asyncio
 import logging
+import random
+from collections import Counter
 
 from knowledge import KnowledgeBase
 from models import DebtorProfile, InstallmentPlan
 
-from .base import CognitiveAgent
+from .base import CognitiveAgent, ReasoningBackend
+from .base.agent import SHUTDOWN_TIMEOUT
+from .calculator import InstallmentPlanCalculator
 from .registry import AgentRegistry
 
 
 class InstallmentPlanAgent(CognitiveAgent):
     def __init__(
-        self, name, queue, knowledge_base: KnowledgeBase, agent_registry: AgentRegistry
+        self,
+        name,
+        queue,
+        knowledge_base: KnowledgeBase,
+        agent_registry: AgentRegistry,
+        reasoning_backend: ReasoningBackend | None = None,
+        use_calculator: bool = True,
+        calculator: InstallmentPlanCalculator | None = None,
+        validation_rate: float = 0.0,
+        max_validations: int = 10,
+        batch_size: int = 1,
+        batch_window: float = 0.05,
     ):
-        super().__init__(name, queue, knowledge_base)
+        super().__init__(
+            name,
+            queue,
+            knowledge_base,
+            reasoning_backend,
+            batch_size=batch_size,
+            batch_window=batch_window,
+        )
         self.agent_registry = agent_registry
         agent_registry.register("installment_plan", queue)
         self.task = "Your task is to evaluate debtor information and create an installment plan by reasoning based on the provided business rules."
+        self.calculator = (
+            (calculator or InstallmentPlanCalculator()) if use_calculator else None
+        )
+        self.validation_rate = validation_rate
+        self.max_validations = max_validations
+        self.validations: set[asyncio.Task] = set()
+        self.plan_paths = Counter()
+
+    async def run(self):
+        """Runs the agent and waits for pending validations when it stops."""
+        try:
+            await super().run()
+        finally:
+            await self.drain_validations(SHUTDOWN_TIMEOUT)
 
     async def process_message(self, entity: DebtorProfile):
         try:
             logging.info(f"{self.name} received message: {entity}")
-            business_rules = await self.retrieve()
-            content = f"debtor profile: {entity}, business rules: {business_rules}"
+            await self.create_plans([entity])
+        except Exception as e:
+            logging.error(f"{self.name} encountered an exception: {e}")
 
-            reasoning_task = asyncio.create_task(
-                self.reason_structured(
-                    content=content, response_format=InstallmentPlan, task=self.task
-                )
-            )
+    async def process_batch(self, entities: list[DebtorProfile]):
+        try:
+            logging.info(f"{self.name} received batch of {len(entities)} profiles")
+            await self.create_plans(entities)
+        except Exception as e:
+            logging.error(f"{self.name} encountered an exception: {e}")
+
+    async def create_plans(self, entities: list[DebtorProfile]):
+        """
+        Calculates the installment plans of the profiles and reasons only about
+        profiles the calculator cannot handle.
+        """
+        if self.calculator is not None:
+            plans = self.calculator.calculate(entities)
+        else:
+            plans = [None] * len(entities)
+
+        routes = []
+        for entity, plan in zip(entities, plans):
+            if plan is None:
+                plan = await self.reason_plan(entity)
+                self.plan_paths["llm"] += 1
+            else:
+                self.plan_paths["calculator"] += 1
+                if self.validation_rate and random.random() < self.validation_rate:
+                    self.start_validation(entity, plan)
 
-            result = await reasoning_task
+            entity = self.revise(entity, installment_plan=plan)
 
             logging.info(
-                f"{self.name} created installment plan for {entity.name}: {result}"
+                f"{self.name} created installment plan for {entity.name}: {plan}"
             )
 
             target_queues = self.agent_registry.get_agents_for_task("contact_debtor")
-            asyncio.create_task(self.publish_message(target_queues, entity))
+            routes.append((target_queues, entity))
+        await self.publisher.publish_many(routes)
 
-        except Exception as e:
-            logging.error(f"{self.name} encountered an exception: {e}")
+    async def reason_plan(self, entity: DebtorProfile) -> InstallmentPlan | None:
+        business_rules = await self.retrieve()
+
+        reasoning_task = asyncio.create_task(
+            self.reason_structured(
+                content=self.prompt_builder.encode_profile(entity),
+                response_format=InstallmentPlan,
+                task=self.task,
+                rules=self.prompt_builder.encode_rules(business_rules),
+                entities=[entity],
+            )
+        )
+
+        return await reasoning_task
+
+    def start_validation(self, entity: DebtorProfile, plan: InstallmentPlan):
+        """
+        Validates a calculated plan in the background. Samples beyond the
+        maximum number of pending validations are skipped.
+        """
+        if len(self.validations) >= self.max_validations:
+            self.plan_paths["validation_skipped"] += 1
+            return
+        task = asyncio.create_task(self.validate_plan(entity, plan))
+        self.validations.add(task)
+        task.add_done_callback(self.validations.discard)
+
+    async def drain_validations(self, timeout: float | None = None) -> bool:
+        """
+        Waits for pending validations and cancels those unfinished after the
+        timeout. Returns whether all of them finished.
+        """
+        if not self.validations:
+            return True
+        _, pending = await asyncio.wait(set(self.validations), timeout=timeout)
+        if pending:
+            logging.warning(f"{self.name} cancelled {len(pending)} validations.")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return not pending
+
+    async def validate_plan(self, entity: DebtorProfile, plan: InstallmentPlan):
+        """Compares a calculated plan with the plan the reasoning model creates."""
+        reasoned_plan = await self.reason_plan(entity)
+        self.plan_paths["validated"] += 1
+
+        if (
+            reasoned_plan is None
+            or reasoned_plan.duration_months != plan.duration_months
+            or abs(reasoned_plan.monthly_payment - plan.monthly_payment) > 0.01
+        ):
+            self.plan_paths["validation_mismatch"] += 1
+            logging.warning(
+                f"{self.name} calculated plan {plan} for {entity.name} differs from "
+                f"reasoned plan {reasoned_plan}"
+            )
 
     async def retrieve(self):
         try:
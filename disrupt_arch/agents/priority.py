@@ -0,0 +1,18 @@
+import math
+
+from models import DebtorProfile
+
+RISK_WEIGHTS = {"HIGH": 2.0, "MEDIUM": 1.0, "LOW": 0.0}
+
+
+def priority_score(profile: DebtorProfile) -> float:
+    """
+    Scores how urgently a case needs an action. An order of magnitude in balance,
+    30 days overdue and a step in risk level weigh about the same.
+    """
+    balance = max(profile.outstanding_balance or 0.0, 0.0)
+    return (
+        math.log10(1 + balance)
+        + (profile.overdue_days or 0) / 30
+        + RISK_WEIGHTS.get(profile.risk_level or "", 0.0)
+    )
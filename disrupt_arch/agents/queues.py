@@ -0,0 +1,316 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import struct
+import tempfile
+import time
+from enum import Enum
+from typing import Callable
+
+from config import settings
+from messages import Envelope, decode_local_message, encode_local_message
+from models import DebtorProfile
+from pydantic import ValidationError
+
+from .durable import DurableQueue
+from .priority import priority_score
+
+# Spilled messages are stored as a 4 byte length followed by the encoded message.
+SPILL_RECORD_LENGTH = struct.Struct("<I")
+
+
+class BackpressurePolicy(str, Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    REJECT = "reject"
+    SPILL = "spill"
+
+
+class QueueRejectedError(asyncio.QueueFull):
+    """Raised when a full queue with the reject policy refuses a message."""
+
+
+class BoundedQueue(asyncio.Queue):
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        policy: BackpressurePolicy | str = BackpressurePolicy.BLOCK,
+        spill_dir: str | None = None,
+    ):
+        """
+        Agent inbox with a capacity and a backpressure policy for full queues.
+        :param maxsize: Maximum number of messages held in memory.
+        :param policy: What put does when the queue is full: block until there is
+            space, drop the oldest message, reject the new message or spill it to
+            disk until there is space again.
+        :param spill_dir: Directory of the spill file. Defaults to the temp directory.
+        """
+        super().__init__(maxsize)
+        self.policy = BackpressurePolicy(policy)
+        self.high_water_mark = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.spilled = 0
+        self.spill_file = None
+        self.spill_dir = spill_dir
+        self.spill_pending = 0
+
+    async def put(self, item):
+        """Puts a message into the queue, applying the policy when it is full."""
+        if self.policy == BackpressurePolicy.BLOCK:
+            await super().put(item)
+        else:
+            self.put_nowait(item)
+
+    def put_nowait(self, item):
+        if self.policy == BackpressurePolicy.SPILL and (
+            self.spill_pending or self.full()
+        ):
+            self.spill(item)
+            return
+
+        if self.full():
+            if self.policy == BackpressurePolicy.DROP_OLDEST:
+                dropped = self.evict()
+                self.task_done()
+                self.dropped += 1
+                logging.warning(f"Queue full, dropped message: {dropped}")
+            elif self.policy == BackpressurePolicy.REJECT:
+                self.rejected += 1
+                raise QueueRejectedError(f"Queue full at {self.maxsize} messages.")
+
+        super().put_nowait(item)
+
+    def _put(self, item):
+        self.push(item)
+        self.high_water_mark = max(self.high_water_mark, self.qsize())
+
+    def _get(self):
+        item = self.pop()
+        if self.spill_pending:
+            self.restore()
+        return item
+
+    def push(self, item):
+        """Adds a message to the in-memory queue."""
+        self._queue.append(item)
+
+    def pop(self):
+        """Removes the next message from the in-memory queue."""
+        return self._queue.popleft()
+
+    def evict(self):
+        """Removes the message dropped from a full queue, i.e. the oldest one."""
+        return self.pop()
+
+    def spill(self, item):
+        """Appends a message to the spill file. It still counts as unfinished."""
+        if self.spill_file is None:
+            fd, path = tempfile.mkstemp(suffix=".bin", dir=self.spill_dir)
+            self.spill_file = os.fdopen(fd, "w+b")
+            self.spill_read_offset = 0
+            os.unlink(path)
+
+        self.spill_file.seek(0, os.SEEK_END)
+        record = encode_local_message(item)
+        self.spill_file.write(SPILL_RECORD_LENGTH.pack(len(record)) + record)
+        self.spill_file.flush()
+        self.spill_pending += 1
+        self.spilled += 1
+        self._unfinished_tasks += 1
+        self._finished.clear()
+
+    def restore(self):
+        """Moves the oldest spilled message back into memory."""
+        self.spill_file.seek(self.spill_read_offset)
+        (length,) = SPILL_RECORD_LENGTH.unpack(
+            self.spill_file.read(SPILL_RECORD_LENGTH.size)
+        )
+        record = self.spill_file.read(length)
+        self.spill_read_offset = self.spill_file.tell()
+        self.spill_pending -= 1
+
+        if not self.spill_pending:
+            self.spill_file.seek(0)
+            self.spill_file.truncate()
+            self.spill_read_offset = 0
+
+        self.push(decode_local_message(record))
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.qsize(),
+            "spilled_depth": self.spill_pending,
+            "capacity": self.maxsize,
+            "high_water_mark": self.high_water_mark,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "spilled": self.spilled,
+        }
+
+
+class PriorityInbox(BoundedQueue):
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        policy: BackpressurePolicy | str = BackpressurePolicy.BLOCK,
+        spill_dir: str | None = None,
+        score: Callable[[DebtorProfile], float] = priority_score,
+        aging_rate: float = 0.05,
+    ):
+        """
+        Agent inbox handing out the message with the highest priority first. The
+        priority of a waiting message grows by the aging rate per second, so low
+        scored messages are not starved by a steady flow of high scored ones.
+        Full queues drop the message with the lowest priority. Spilled messages
+        return to memory in arrival order before they are prioritized.
+        :param maxsize: Maximum number of messages held in memory.
+        :param policy: What put does when the queue is full.
+        :param spill_dir: Directory of the spill file.
+        :param score: Scores a message, higher scores are handled first.
+        :param aging_rate: Priority gained per second of waiting.
+        """
+        super().__init__(maxsize, policy, spill_dir)
+        self.score = score
+        self.aging_rate = aging_rate
+
+    def _init(self, maxsize):
+        self._queue = []
+        self.sequence = itertools.count()
+
+    def push(self, item):
+        # A message enqueued at t has priority score + aging_rate * (now - t), so
+        # ordering by aging_rate * t - score stays valid as time passes.
+        profile = item.profile if isinstance(item, Envelope) else item
+        key = self.aging_rate * time.monotonic() - self.score(profile)
+        heapq.heappush(self._queue, (key, next(self.sequence), item))
+
+    def pop(self):
+        return heapq.heappop(self._queue)[2]
+
+    def evict(self):
+        index = max(range(len(self._queue)), key=self._queue.__getitem__)
+        entry = self._queue[index]
+        self._queue[index] = self._queue[-1]
+        self._queue.pop()
+        heapq.heapify(self._queue)
+        return entry[2]
+
+
+def create_queue(agent_name: str) -> BoundedQueue | DurableQueue:
+    """
+    Creates the inbox of an agent with the capacity, policy and scheduling from
+    the settings. With QUEUE_DURABLE_DIR set, the inbox is a durable FIFO queue
+    in a subdirectory named after the agent, which blocks when it is full.
+    """
+    if settings.QUEUE_DURABLE_DIR:
+        if settings.QUEUE_SCHEDULING != "fifo":
+            raise ValueError("Durable queues only support fifo scheduling.")
+        return DurableQueue(
+            os.path.join(settings.QUEUE_DURABLE_DIR, agent_name),
+            maxsize=settings.QUEUE_CAPACITIES.get(agent_name, settings.QUEUE_CAPACITY),
+            segment_size=settings.QUEUE_SEGMENT_SIZE,
+            commit_delay=settings.QUEUE_COMMIT_DELAY,
+            fsync=settings.QUEUE_FSYNC,
+        )
+
+    options = {
+        "maxsize": settings.QUEUE_CAPACITIES.get(agent_name, settings.QUEUE_CAPACITY),
+        "policy": settings.QUEUE_POLICY,
+        "spill_dir": settings.QUEUE_SPILL_DIR,
+    }
+    if settings.QUEUE_SCHEDULING == "priority":
+        return PriorityInbox(**options, aging_rate=settings.QUEUE_AGING_RATE)
+    if settings.QUEUE_SCHEDULING != "fifo":
+        raise ValueError(f"Unknown queue scheduling: {settings.QUEUE_SCHEDULING}")
+    return BoundedQueue(**options)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        max_depth: int | None = None,
+        rate: float | None = None,
+        burst: int | None = None,
+        timeout: float = 0.0,
+    ):
+        """
+        Admits messages into the ingress queue or turns them away.
+        :param queue: The ingress queue.
+        :param max_depth: Queue depth above which messages are not admitted.
+            Defaults to the capacity of the queue.
+        :param rate: Maximum sustained admissions per second. None disables the limit.
+        :param burst: Admissions allowed at once above the rate. Defaults to the rate
+            rounded up, at least 1.
+        :param timeout: Seconds a submission waits for the queue to drain below
+            max_depth before it is turned away.
+        """
+        if burst is not None and burst < 1:
+            raise ValueError("The burst must admit at least one message.")
+        self.queue = queue
+        self.max_depth = max_depth or queue.maxsize or None
+        self.rate = rate
+        self.burst = burst or (max(1, math.ceil(rate)) if rate else None)
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+        self.timeout = timeout
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire_token(self) -> bool:
+        if self.rate is None:
+            return True
+
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.refilled_at) * self.rate
+        )
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def submit(self, entity) -> bool:
+        """
+        Validates a profile and puts it into the ingress queue in an envelope if it
+        is admitted. Invalid profiles are rejected. Envelopes created with
+        Envelope.ingress are admitted as they are, so callers can track their
+        workflow beforehand.
+        """
+        if isinstance(entity, Envelope):
+            envelope = entity
+        else:
+            try:
+                envelope = Envelope.ingress(entity)
+            except ValidationError as e:
+                logging.warning(f"Rejected invalid profile at ingress: {e}")
+                self.rejected += 1
+                return False
+
+        if not self.acquire_token():
+            self.rejected += 1
+            return False
+
+        deadline = time.monotonic() + self.timeout
+        while self.max_depth is not None and self.queue.qsize() >= self.max_depth:
+            if time.monotonic() >= deadline:
+                self.rejected += 1
+                return False
+            await asyncio.sleep(min(0.01, max(deadline - time.monotonic(), 0)))
+
+        try:
+            await self.queue.put(envelope)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+
+        self.admitted += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"admitted": self.admitted, "rejected": self.rejected}
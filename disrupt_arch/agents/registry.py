@@ -1,9 +1,28 @@
 from asyncio import Queue
 
+from transport import InProcessTransport, Transport
+
+from .routing import RoutingStrategy, create_strategy
+
 
 class AgentRegistry:
-    def __init__(self):
-        self.registry = {}
+    def __init__(
+        self,
+        transport: Transport | None = None,
+        strategies: dict[str, str | RoutingStrategy] | None = None,
+        default_strategy: str = "broadcast",
+    ):
+        """
+        Maps tasks to the queues of the agents handling them.
+        :param transport: Carries the messages. Defaults to in-process queues.
+        :param strategies: Routing strategy per task, e.g. "round_robin".
+        :param default_strategy: Routing strategy of the other tasks.
+        """
+        self.transport = transport or InProcessTransport()
+        self.default_strategy = default_strategy
+        self.strategies: dict[str, RoutingStrategy] = {}
+        for task, strategy in (strategies or {}).items():
+            self.set_strategy(task, strategy)
 
     def register(self, task, queue: Queue):
         """
@@ -11,11 +30,17 @@ class AgentRegistry:
         :param task: The task type (e.g., "escalate").
         :param queue: The asyncio queue for handling the task.
         """
-        if task not in self.registry:
-            self.registry[task] = []
-        if queue not in self.registry[task]:
-            self.registry[task].append(queue)
+        self.transport.bind(task, queue)
+
+    def set_strategy(self, task, strategy: str | RoutingStrategy):
+        """
+        Sets how messages of a task are routed: broadcast to all queues,
+        round_robin, least_queue_depth or power_of_two.
+        """
+        self.strategies[task] = create_strategy(strategy)
 
     def get_agents_for_task(self, task) -> list[Queue]:
-        """Retrieves queues capable of handling the task."""
-        return self.registry.get(task, [])
+        """Retrieves the queues a message of the task is published to."""
+        if task not in self.strategies:
+            self.strategies[task] = create_strategy(self.default_strategy)
+        return self.strategies[task].select(self.transport.endpoints(task))
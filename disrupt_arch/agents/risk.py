@@ -15,7 +15,7 @@ class RiskAssessmentAgent(OperationalAgent):
 
     async def process_message(self, entity: DebtorProfile):
         risk_level = await self.execute_task(entity)
-        entity.risk_level = risk_level.value
+        entity = self.revise(entity, risk_level=risk_level.value)
         logging.info(
             f"{self.name} assessed risk as: {entity.risk_level} for profile: {
                 entity.name
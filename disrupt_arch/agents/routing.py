@@ -0,0 +1,79 @@
+import random
+from abc import ABC, abstractmethod
+from asyncio import Queue
+
+
+def queue_depth(queue) -> int:
+    try:
+        return queue.qsize()
+    except (AttributeError, NotImplementedError):
+        return 0
+
+
+class RoutingStrategy(ABC):
+    """Selects the queues of a task a message is published to."""
+
+    @abstractmethod
+    def select(self, queues: list[Queue]) -> list[Queue]:
+        pass
+
+
+class Broadcast(RoutingStrategy):
+    """Every agent of the task receives the message."""
+
+    def select(self, queues: list[Queue]) -> list[Queue]:
+        return queues
+
+
+class RoundRobin(RoutingStrategy):
+    """The agents of the task receive the messages in turns."""
+
+    def __init__(self):
+        self.position = 0
+
+    def select(self, queues: list[Queue]) -> list[Queue]:
+        if not queues:
+            return []
+        queue = queues[self.position % len(queues)]
+        self.position += 1
+        return [queue]
+
+
+class LeastQueueDepth(RoutingStrategy):
+    """The agent with the fewest waiting messages receives the message."""
+
+    def select(self, queues: list[Queue]) -> list[Queue]:
+        if not queues:
+            return []
+        return [min(queues, key=queue_depth)]
+
+
+class PowerOfTwoChoices(RoutingStrategy):
+    """
+    The less loaded of two random agents receives the message. Close to the
+    least queue depth without looking at every queue.
+    """
+
+    def __init__(self, rng: random.Random | None = None):
+        self.rng = rng or random.Random()
+
+    def select(self, queues: list[Queue]) -> list[Queue]:
+        if len(queues) < 2:
+            return queues
+        return [min(self.rng.sample(queues, 2), key=queue_depth)]
+
+
+ROUTING_STRATEGIES = {
+    "broadcast": Broadcast,
+    "round_robin": RoundRobin,
+    "least_queue_depth": LeastQueueDepth,
+    "power_of_two": PowerOfTwoChoices,
+}
+
+
+def create_strategy(strategy: str | RoutingStrategy) -> RoutingStrategy:
+    if isinstance(strategy, RoutingStrategy):
+        return strategy
+    if strategy not in ROUTING_STRATEGIES:
+        raise ValueError(f"Unknown routing strategy: {strategy}")
+    return ROUTING_STRATEGIES[strategy]()
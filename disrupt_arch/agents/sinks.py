@@ -0,0 +1,35 @@
+import logging
+from abc import ABC, abstractmethod
+
+from models import DebtorProfile
+
+
+class MessageSink(ABC):
+    """Receives debtor messages chunk by chunk, so delivery can start early."""
+
+    @abstractmethod
+    async def write(self, entity: DebtorProfile, chunk: str):
+        """Delivers the next chunk of the message to a debtor."""
+        pass
+
+    async def close(self, entity: DebtorProfile, message: str):
+        """Called once the complete message has been generated."""
+        pass
+
+
+class LoggingSink(MessageSink):
+    async def write(self, entity: DebtorProfile, chunk: str):
+        logging.debug(f"Message chunk for {entity.name}: {chunk}")
+
+
+class BufferSink(MessageSink):
+    def __init__(self):
+        """Collects the chunks of every message, e.g. for tests or batch delivery."""
+        self.chunks: dict[str, list[str]] = {}
+        self.messages: dict[str, str] = {}
+
+    async def write(self, entity: DebtorProfile, chunk: str):
+        self.chunks.setdefault(entity.name, []).append(chunk)
+
+    async def close(self, entity: DebtorProfile, message: str):
+        self.messages[entity.name] = message
@@ -1,11 +1,13 @@
 import asyncio
 import logging
 from asyncio import Queue
+from collections import Counter
 
-from knowledge import KnowledgeBase
-from models import DebtorProfile, NextBestAction
+from knowledge import KnowledgeBase, RuleEngine
+from models import DebtorProfile, NextBestAction, NextBestActionBatch
 
-from .base import CognitiveAgent
+from .base import CognitiveAgent, ReasoningBackend
+from .cache import DecisionCache
 from .registry import AgentRegistry
 
 
@@ -16,31 +18,171 @@ class TaskAgent(CognitiveAgent):
         queue: Queue,
         knowledge_base: KnowledgeBase,
         agent_registry: AgentRegistry,
+        reasoning_backend: ReasoningBackend | None = None,
+        batch_size: int = 1,
+        batch_window: float = 0.05,
+        decision_cache: DecisionCache | None = None,
+        rule_engine: RuleEngine | None = None,
     ):
-        super().__init__(name, queue, knowledge_base)
+        super().__init__(
+            name,
+            queue,
+            knowledge_base,
+            reasoning_backend,
+            batch_size=batch_size,
+            batch_window=batch_window,
+        )
         self.agent_registry = agent_registry
         self.agent_registry.register("next_action", queue)
+        self.decision_cache = decision_cache
+        self.rule_engine = rule_engine
+        self.decision_paths = Counter()
         self.task = "Your task is to evaluate debtor information and determine the next best action based on the provided business rules."
+        self.batch_task = "Your task is to evaluate the information of each debtor and determine the next best action for each debtor based on the provided business rules. Return exactly one action per debtor with the profile key of the debtor."
 
     async def process_message(self, entity: DebtorProfile):
         logging.info(f"{self.name} received message: {entity}")
 
+        next_action = await self.known_decision(entity) or await self.decide(entity)
+
+        logging.info(f"{self.name} decided next action: {next_action}")
+
+        await self.route(entity, next_action)
+
+    async def process_batch(self, entities: list[DebtorProfile]):
+        """Resolves the next best action of unknown profiles in one completion."""
+        logging.info(f"{self.name} received batch of {len(entities)} profiles")
+
+        pending = []
+        routes = []
+        for entity in entities:
+            next_action = await self.known_decision(entity)
+            if next_action is None:
+                pending.append(entity)
+            else:
+                routes.append(self.target(entity, next_action))
+        await self.publisher.publish_many(routes)
+
+        if len(pending) == 1:
+            await self.route(pending[0], await self.decide(pending[0]))
+        if len(pending) <= 1:
+            return
+
+        profiles = {str(index): entity for index, entity in enumerate(pending)}
+        business_rules = await asyncio.gather(*(self.retrieve(e) for e in pending))
+
+        result = await self.reason_structured(
+            content=self.prompt_builder.encode_profiles(profiles),
+            response_format=NextBestActionBatch,
+            task=self.batch_task,
+            rules=self.prompt_builder.encode_rules(business_rules),
+            entities=pending,
+        )
+        actions = {a.profile_key: a for a in result.actions} if result else {}
+
+        missing = [key for key in profiles if key not in actions]
+        for key in missing:
+            logging.warning(
+                f"{self.name} got no batched action for {profiles[key].name}, "
+                "reasoning individually."
+            )
+        fallbacks = dict(
+            zip(
+                missing,
+                await asyncio.gather(*(self.decide(profiles[key]) for key in missing)),
+            )
+        )
+
+        routes = []
+        for key, entity in profiles.items():
+            if key in fallbacks:
+                next_action = fallbacks[key]
+            else:
+                next_action = NextBestAction(
+                    action=actions[key].action, target=actions[key].target
+                )
+                self.cache_decision(entity, next_action)
+                self.decision_paths["llm"] += 1
+
+            if next_action is None:
+                self.undecided(entity)
+                continue
+            logging.info(
+                f"{self.name} decided next action for {entity.name}: {next_action}"
+            )
+            routes.append(self.target(entity, next_action))
+        await self.publisher.publish_many(routes)
+
+    async def decide(self, entity: DebtorProfile) -> NextBestAction | None:
+        """
+        Reasons about the next best action for a single profile. Returns None if
+        the reasoning failed.
+        """
         business_rules = await self.retrieve(entity)
 
         reasoning_task = asyncio.create_task(
             self.reason_structured(
-                content=f"debtor profile: {entity}, business rules: {business_rules}",
+                content=self.prompt_builder.encode_profile(entity),
                 response_format=NextBestAction,
                 task=self.task,
+                rules=self.prompt_builder.encode_rules(business_rules),
+                entities=[entity],
             )
         )
 
         next_action = await reasoning_task
+        self.cache_decision(entity, next_action)
+        self.decision_paths["llm"] += 1
 
-        logging.info(f"{self.name} decided next action: {next_action}")
+        return next_action
+
+    def target(self, entity: DebtorProfile, next_action: NextBestAction):
+        """Returns the queues of the next action with the profile to publish."""
+        return self.agent_registry.get_agents_for_task(next_action.action), entity
+
+    async def route(self, entity: DebtorProfile, next_action: NextBestAction | None):
+        if next_action is None:
+            self.undecided(entity)
+            return
+        await self.publisher.publish(*self.target(entity, next_action))
+
+    def undecided(self, entity: DebtorProfile):
+        """Reports the workflow of a profile without next best action as failed."""
+        logging.error(f"{self.name} found no next best action for {entity.name}.")
+        self.decision_paths["undecided"] += 1
+        self.complete_workflow(
+            entity, error=RuntimeError(f"No next best action for {entity.name}.")
+        )
+
+    async def known_decision(self, entity: DebtorProfile) -> NextBestAction | None:
+        """
+        Looks up the next best action without reasoning, first in the compiled
+        business rules and then in the decision cache.
+        """
+        if self.rule_engine is not None:
+            # Checked here, so evaluate does not block the event loop with it.
+            await self.rule_engine.knowledge_base.check_version()
+            next_action = self.rule_engine.evaluate(entity)
+            if next_action is not None:
+                self.decision_paths["rule_engine"] += 1
+                return next_action
+
+        if self.decision_cache is not None:
+            version = await self.knowledge_base.check_version()
+            next_action = self.decision_cache.get(entity, version)
+            if next_action is not None:
+                self.decision_paths["cache"] += 1
+                return next_action
+
+        return None
+
+    def decision_stats(self) -> dict:
+        """Reports how often each decision path was taken."""
+        return dict(self.decision_paths)
 
-        target_queues = self.agent_registry.get_agents_for_task(next_action.action)
-        asyncio.create_task(self.publish_message(target_queues, entity))
+    def cache_decision(self, entity: DebtorProfile, next_action: NextBestAction):
+        if self.decision_cache is not None and next_action is not None:
+            self.decision_cache.put(entity, next_action, self.knowledge_base.version)
 
     async def retrieve(self, entity: DebtorProfile):
         try:
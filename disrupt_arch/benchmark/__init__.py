@@ -0,0 +1,21 @@
+import os
+
+# The benchmark never calls the model API, a placeholder key lets the settings load.
+os.environ.setdefault("OAI_API_KEY", "offline")
+
+from .distributions import LatencyDistribution  # noqa: E402
+from .fakes import FakeKnowledgeBase, FakeOpenAIClient, generate_profiles  # noqa: E402
+from .harness import Benchmark, percentiles, write_report  # noqa: E402
+from .load import closed_loop, open_loop  # noqa: E402
+
+__all__ = [
+    "Benchmark",
+    "FakeKnowledgeBase",
+    "FakeOpenAIClient",
+    "LatencyDistribution",
+    "closed_loop",
+    "generate_profiles",
+    "open_loop",
+    "percentiles",
+    "write_report",
+]
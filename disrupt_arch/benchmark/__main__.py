@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from benchmark import Benchmark, LatencyDistribution, write_report
+from observability import JsonlSpanExporter, tracer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load tests the agents with fake reasoning and knowledge backends."
+    )
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument("--rate", type=float, help="Open loop: arrivals per second.")
+    load.add_argument("--concurrency", type=int, help="Closed loop: clients.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--llm-latency",
+        default="lognormal:0.05:0.5",
+        help='Completion latency, e.g. "0.05", "uniform:0.02:0.1", '
+        '"exponential:0.05" or "lognormal:0.05:0.5".',
+    )
+    parser.add_argument("--kb-latency", default="0.005")
+    parser.add_argument("--llm-concurrency", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON report.")
+    parser.add_argument("--trace", help="Path of the JSONL file of exported spans.")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    if args.trace:
+        tracer.configure(JsonlSpanExporter(args.trace))
+    benchmark = Benchmark(
+        llm_latency=LatencyDistribution.parse(args.llm_latency, args.seed),
+        kb_latency=LatencyDistribution.parse(args.kb_latency, args.seed + 1),
+        llm_concurrency=args.llm_concurrency,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+    report = asyncio.run(
+        benchmark.run(args.requests, args.rate, args.concurrency, args.timeout)
+    )
+    if args.trace:
+        tracer.exporter.close()
+    if args.output:
+        write_report(report, args.output)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,43 @@
+import math
+import random
+
+
+class LatencyDistribution:
+    KINDS = ("constant", "uniform", "exponential", "lognormal")
+
+    def __init__(self, kind: str = "constant", *params: float, seed: int | None = 0):
+        """
+        Draws simulated latencies in seconds.
+        :param kind: constant (seconds), uniform (low, high), exponential (mean)
+            or lognormal (median, sigma).
+        :param params: The parameters of the distribution.
+        :param seed: Seed of the random numbers. The same seed draws the same
+            latencies.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params) or (0.0,)
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str, seed: int | None = 0) -> "LatencyDistribution":
+        """Parses a distribution like "lognormal:0.8:0.4" or "0.05" (constant)."""
+        kind, *params = spec.split(":")
+        try:
+            return cls("constant", float(kind), seed=seed)
+        except ValueError:
+            return cls(kind, *params, seed=seed)
+
+    def sample(self) -> float:
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(*self.params[:2])
+        if self.kind == "exponential":
+            return self.rng.expovariate(1 / self.params[0]) if self.params[0] else 0.0
+        median, sigma = self.params[:2]
+        return self.rng.lognormvariate(math.log(median), sigma) if median else 0.0
+
+    def __repr__(self) -> str:
+        return ":".join([self.kind, *(f"{p:g}" for p in self.params)])
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+from models import (
+    CommunicationState,
+    DebtorProfile,
+    InstallmentPlan,
+    NextBestAction,
+    NextBestActionBatch,
+    ProfileNextBestAction,
+)
+
+from .distributions import LatencyDistribution
+
+ACTION_TARGETS = {
+    "assess_risk": "RiskAssessmentAgent",
+    "escalate_case": "EscalationAgent",
+    "installment_plan": "InstallmentPlanAgent",
+    "contact_debtor": "CommunicationAgent",
+}
+
+BUSINESS_RULES = [
+    "Assess the risk of debtors without risk level first.",
+    "Escalate debtors with high risk that are more than 150 days overdue.",
+    "Offer an installment plan to debtors without one.",
+    "Contact debtors that have an installment plan.",
+]
+
+
+def decide(profile: dict) -> str:
+    """The next best action the fake reasoning model picks for a profile."""
+    if profile.get("risk_level") is None:
+        return "assess_risk"
+    if profile["risk_level"] == "HIGH" and profile["overdue_days"] > 150:
+        return "escalate_case"
+    if profile.get("installment_plan") is None:
+        return "installment_plan"
+    return "contact_debtor"
+
+
+def generate_profiles(count: int, seed: int = 0) -> list[DebtorProfile]:
+    """Generates reproducible profiles with unique names."""
+    rng = random.Random(seed)
+    states = [CommunicationState.ENGAGED, CommunicationState.NO_RESPONE]
+    return [
+        DebtorProfile(
+            communication_state=rng.choice(states),
+            name=f"Debtor {index}",
+            income=rng.uniform(500, 5000),
+            installment_plan=None,
+            outstanding_balance=rng.uniform(500, 10000),
+            overdue_days=rng.randint(0, 180),
+            risk_level=None,
+        )
+        for index in range(count)
+    ]
+
+
+class FakeOpenAIClient:
+    def __init__(
+        self,
+        latency: LatencyDistribution,
+        completion_tokens: int = 120,
+        tokens_per_second: float = 0.0,
+    ):
+        """
+        Stands in for AsyncOpenAI in the calls the reasoning backend makes. Answers
+        deterministically after a simulated latency and never uses the network.
+        :param latency: Latency of a completion until its first token.
+        :param completion_tokens: Tokens of a plain text completion.
+        :param tokens_per_second: Generation speed of plain text completions. 0
+            returns them at once.
+        """
+        self.latency = latency
+        self.completion_tokens = completion_tokens
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.beta = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(parse=self.parse))
+        )
+
+    @staticmethod
+    def usage(messages: list[dict], completion_tokens: int) -> SimpleNamespace:
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+
+    async def parse(self, model, messages, response_format, timeout=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample())
+
+        content = json.loads(messages[-1]["content"])
+        if response_format is NextBestActionBatch:
+            parsed = NextBestActionBatch(
+                actions=[
+                    ProfileNextBestAction(
+                        profile_key=key,
+                        action=decide(profile),
+                        target=ACTION_TARGETS[decide(profile)],
+                    )
+                    for key, profile in content.items()
+                ]
+            )
+        elif response_format is NextBestAction:
+            action = decide(content)
+            parsed = NextBestAction(action=action, target=ACTION_TARGETS[action])
+        elif response_format is InstallmentPlan:
+            parsed = InstallmentPlan(
+                monthly_payment=round(content["outstanding_balance"] / 12, 2),
+                duration_months=12,
+            )
+        else:
+            raise ValueError(f"Unsupported response format: {response_format}")
+
+        message = SimpleNamespace(parsed=parsed, content=parsed.model_dump_json())
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=message)],
+            usage=self.usage(messages, len(message.content) // 4),
+        )
+
+    async def create(self, model, messages, timeout=None, stream=False, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample())
+        words = ["Dear", "debtor,", "please", "review", "your", "payment", "plan."]
+        tokens = [words[i % len(words)] + " " for i in range(self.completion_tokens)]
+
+        if stream:
+            return self.stream(model, messages, tokens)
+        if self.tokens_per_second:
+            await asyncio.sleep(len(tokens) / self.tokens_per_second)
+
+        message = SimpleNamespace(role="assistant", content="".join(tokens))
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=message)],
+            usage=self.usage(messages, len(tokens)),
+        )
+
+    async def stream(self, model, messages, tokens: list[str]):
+        for token in tokens:
+            if self.tokens_per_second:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            delta = SimpleNamespace(content=token)
+            yield SimpleNamespace(
+                model=model, choices=[SimpleNamespace(delta=delta)], usage=None
+            )
+        yield SimpleNamespace(
+            model=model, choices=[], usage=self.usage(messages, len(tokens))
+        )
+
+
+class FakeKnowledgeBase:
+    def __init__(self, latency: LatencyDistribution, rules: list[str] | None = None):
+        """
+        Stands in for the KnowledgeBase. Returns the same business rules for every
+        query after a simulated retrieval latency.
+        :param latency: Latency of a query.
+        :param rules: The business rules returned.
+        """
+        self.latency = latency
+        self.rules = rules or BUSINESS_RULES
+        self.version = 0
+        self.queries = 0
+
+    def result(self, top_k: int) -> dict:
+        return {"documents": [self.rules[:top_k]]}
+
+    async def check_version(self) -> int:
+        return self.version
+
+    def query_knowledge(self, query_text, top_k=3):
+        self.queries += 1
+        return self.result(top_k)
+
+    async def aquery_knowledge(self, query_text, top_k=3):
+        self.queries += 1
+        await asyncio.sleep(self.latency.sample())
+        return self.result(top_k)
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+
+import numpy as np
+from agents import (
+    AgentRegistry,
+    CommunicationAgent,
+    EscalationAgent,
+    InstallmentPlanAgent,
+    RiskAssessmentAgent,
+    TaskAgent,
+    WorkflowTracker,
+)
+from agents.base import ReasoningBackend
+from messages import Envelope
+from models import DebtorProfile
+from observability import MODEL_PRICES, CostLedger
+
+from .distributions import LatencyDistribution
+from .fakes import FakeKnowledgeBase, FakeOpenAIClient, generate_profiles
+from .load import closed_loop, open_loop
+
+
+def percentiles(values: list[float]) -> dict:
+    """Summarizes latencies in seconds."""
+    if not values:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(values),
+        "mean": float(np.mean(values)),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(np.max(values)),
+    }
+
+
+class Benchmark:
+    def __init__(
+        self,
+        llm_latency: LatencyDistribution | None = None,
+        kb_latency: LatencyDistribution | None = None,
+        llm_concurrency: int = 5,
+        workers: int = 5,
+        batch_size: int = 1,
+        sample_interval: float = 0.05,
+        seed: int = 0,
+    ):
+        """
+        Runs the agents of the debt collection workflow against fake reasoning and
+        knowledge backends and measures them under load, without network access.
+        :param llm_latency: Latency of a completion. Defaults to 50 ms.
+        :param kb_latency: Latency of a knowledge base query. Defaults to 5 ms.
+        :param llm_concurrency: Concurrent completions per cognitive agent.
+        :param workers: Workers per agent.
+        :param batch_size: Batch size of the TaskAgent and InstallmentPlanAgent.
+        :param sample_interval: Seconds between samples of the queue depths.
+        :param seed: Seed of the profiles and latencies.
+        """
+        self.llm_latency = llm_latency or LatencyDistribution("constant", 0.05)
+        self.kb_latency = kb_latency or LatencyDistribution("constant", 0.005)
+        self.llm_concurrency = llm_concurrency
+        self.workers = workers
+        self.batch_size = batch_size
+        self.sample_interval = sample_interval
+        self.seed = seed
+        self.client = FakeOpenAIClient(self.llm_latency)
+        self.knowledge_base = FakeKnowledgeBase(self.kb_latency)
+        self.workflows = WorkflowTracker()
+        self.costs = CostLedger()
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.agents = []
+        self.depths: dict[str, list[int]] = defaultdict(list)
+
+    def reasoning_backend(self) -> ReasoningBackend:
+        return ReasoningBackend(self.client, "fake", self.llm_concurrency)
+
+    def build(self):
+        """Creates the agents and their queues."""
+        registry = AgentRegistry()
+        self.workflows = WorkflowTracker()
+        # The fake completions are priced like the default model.
+        self.costs = CostLedger({**MODEL_PRICES, "fake": MODEL_PRICES["gpt-4o"]})
+        self.queues = {
+            name: asyncio.Queue()
+            for name in [
+                "TaskAgent",
+                "RiskAssessmentAgent",
+                "InstallmentPlanAgent",
+                "CommunicationAgent",
+                "EscalationAgent",
+            ]
+        }
+        self.agents = [
+            TaskAgent(
+                "TaskAgent",
+                self.queues["TaskAgent"],
+                self.knowledge_base,
+                registry,
+                reasoning_backend=self.reasoning_backend(),
+                batch_size=self.batch_size,
+            ),
+            RiskAssessmentAgent(
+                "RiskAssessmentAgent", self.queues["RiskAssessmentAgent"], registry
+            ),
+            InstallmentPlanAgent(
+                "InstallmentPlanAgent",
+                self.queues["InstallmentPlanAgent"],
+                self.knowledge_base,
+                registry,
+                reasoning_backend=self.reasoning_backend(),
+                batch_size=self.batch_size,
+            ),
+            CommunicationAgent(
+                "CommunicationAgent",
+                self.queues["CommunicationAgent"],
+                self.knowledge_base,
+                registry,
+                reasoning_backend=self.reasoning_backend(),
+            ),
+            EscalationAgent(
+                "EscalationAgent", self.queues["EscalationAgent"], registry
+            ),
+        ]
+        for agent in self.agents:
+            agent.num_workers = self.workers
+            agent.workflows = self.workflows
+            if hasattr(agent, "costs"):
+                agent.costs = self.costs
+
+    async def submit(self, profile: DebtorProfile) -> asyncio.Future:
+        """Submits a profile to the TaskAgent and returns the future of its workflow."""
+        envelope = Envelope.ingress(profile)
+        completion = self.workflows.track(envelope.workflow_id)
+        await self.queues["TaskAgent"].put(envelope)
+        return completion
+
+    async def sample_depths(self):
+        while True:
+            for name, queue in self.queues.items():
+                self.depths[name].append(queue.qsize())
+            await asyncio.sleep(self.sample_interval)
+
+    async def run(
+        self,
+        requests: int,
+        rate: float | None = None,
+        concurrency: int | None = None,
+        timeout: float = 60.0,
+    ) -> dict:
+        """
+        Runs one load test and returns its report.
+        :param requests: Number of workflows submitted.
+        :param rate: Arrivals per second of an open-loop load.
+        :param concurrency: Clients of a closed-loop load, used without a rate.
+        :param timeout: Seconds to wait for the last workflows to complete.
+        """
+        if (rate is None) == (concurrency is None):
+            raise ValueError("Set either an arrival rate or a concurrency.")
+
+        self.build()
+        self.depths.clear()
+        profiles = generate_profiles(requests, self.seed)
+        tasks = [asyncio.create_task(agent.run()) for agent in self.agents]
+        sampler = asyncio.create_task(self.sample_depths())
+
+        started = time.perf_counter()
+        try:
+            if rate is not None:
+                completions = await open_loop(self.submit, profiles, rate)
+            else:
+                completions = await closed_loop(self.submit, profiles, concurrency)
+            _, pending = await asyncio.wait(completions, timeout=timeout)
+            duration = time.perf_counter() - started
+        finally:
+            sampler.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(sampler, *tasks, return_exceptions=True)
+
+        for completion in pending:
+            completion.cancel()
+        results = [c.result() for c in completions if c not in pending]
+        return self.report(
+            results,
+            len(pending),
+            duration,
+            {
+                "requests": requests,
+                "mode": "open" if rate is not None else "closed",
+                "rate": rate,
+                "concurrency": concurrency,
+            },
+        )
+
+    def report(self, results: list, timed_out: int, duration: float, load: dict):
+        waits, services = defaultdict(list), defaultdict(list)
+        for result in results:
+            for hop, waited, service in result.envelope.breakdown():
+                waits[hop].append(waited)
+                services[hop].append(service)
+
+        completed = [r for r in results if r.error is None]
+        return {
+            "load": load,
+            "config": {
+                "llm_latency": repr(self.llm_latency),
+                "kb_latency": repr(self.kb_latency),
+                "llm_concurrency": self.llm_concurrency,
+                "workers": self.workers,
+                "batch_size": self.batch_size,
+                "seed": self.seed,
+            },
+            "completed": len(completed),
+            "failed": len(results) - len(completed),
+            "timed_out": timed_out,
+            "duration": duration,
+            "throughput": len(completed) / duration if duration else 0.0,
+            "latency": percentiles([r.latency for r in completed]),
+            "hops": {
+                hop: {
+                    "queue_wait": percentiles(waits[hop]),
+                    "service": percentiles(services[hop]),
+                }
+                for hop in waits
+            },
+            "queue_depth": {
+                name: {"max": max(depths), "mean": sum(depths) / len(depths)}
+                for name, depths in self.depths.items()
+                if depths
+            },
+            "terminals": {
+                agent: sum(1 for r in results if r.agent == agent)
+                for agent in sorted({r.agent for r in results})
+            },
+            "cost": {
+                "total": self.costs.snapshot()["cost"],
+                "per_workflow": percentiles(
+                    [
+                        self.costs.workflows[r.workflow_id].cost
+                        for r in completed
+                        if r.workflow_id in self.costs.workflows
+                    ]
+                ),
+                "agents": {
+                    name: usage.snapshot() for name, usage in self.costs.agents.items()
+                },
+            },
+            "llm_calls": self.client.calls,
+            "knowledge_queries": self.knowledge_base.queries,
+        }
+
+
+def write_report(report: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    logging.info(f"Benchmark report written to {path}")
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from models import DebtorProfile
+
+Submit = Callable[[DebtorProfile], Awaitable[asyncio.Future]]
+
+
+async def open_loop(
+    submit: Submit, profiles: list[DebtorProfile], rate: float
+) -> list[asyncio.Future]:
+    """
+    Submits the profiles at a fixed arrival rate regardless of how fast the
+    system completes them, like independent debtors arriving.
+    :param submit: Submits a profile and returns the future of its workflow.
+    :param rate: Arrivals per second.
+    :return: The futures of the submitted workflows.
+    """
+    started = time.monotonic()
+    completions = []
+    for index, profile in enumerate(profiles):
+        delay = started + index / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        completions.append(await submit(profile))
+    return completions
+
+
+async def closed_loop(
+    submit: Submit, profiles: list[DebtorProfile], concurrency: int
+) -> list[asyncio.Future]:
+    """
+    Keeps a fixed number of workflows in the system. Every client submits its
+    next profile once its previous workflow completed.
+    :param submit: Submits a profile and returns the future of its workflow.
+    :param concurrency: Number of clients.
+    :return: The futures of the submitted workflows.
+    """
+    remaining = iter(profiles)
+    completions = []
+
+    async def client():
+        for profile in remaining:
+            completion = await submit(profile)
+            completions.append(completion)
+            await asyncio.wait([completion])
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return completions
@@ -1,5 +1,17 @@
-from .chroma import chroma_client
-from .openai import openai_client
+from .chroma import get_chroma_client
+from .openai import async_openai_client, openai_client
 from .settings import settings
 
-__all__ = ["chroma_client", "openai_client", "settings"]
+__all__ = [
+    "async_openai_client",
+    "chroma_client",
+    "get_chroma_client",
+    "openai_client",
+    "settings",
+]
+
+
+def __getattr__(name):
+    if name == "chroma_client":
+        return get_chroma_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
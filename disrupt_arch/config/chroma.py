@@ -1,4 +1,19 @@
-from chromadb import HttpClient
+from functools import cache
 
-chroma_client = HttpClient(host="localhost", port=8000)
-chroma_client.heartbeat()
+from chromadb import ClientAPI, HttpClient
+
+from .settings import settings
+
+
+@cache
+def get_chroma_client() -> ClientAPI:
+    """Connects to the Chroma server on first use instead of at import time."""
+    client = HttpClient(host=settings.CHROMA_HOST, port=settings.CHROMA_PORT)
+    client.heartbeat()
+    return client
+
+
+def __getattr__(name):
+    if name == "chroma_client":
+        return get_chroma_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,22 @@
-from openai import Client
+import httpx
+from openai import AsyncOpenAI, Client
 
 from .settings import settings
 
 openai_client = Client(api_key=settings.OAI_API_KEY)
+
+# Shared by all cognitive agents so that completions reuse one pool of
+# keep-alive connections instead of opening a connection per request.
+async_openai_client = AsyncOpenAI(
+    api_key=settings.OAI_API_KEY,
+    base_url=settings.OAI_BASE_URL,
+    timeout=settings.OAI_TIMEOUT,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=settings.OAI_TIMEOUT,
+    ),
+)
@@ -5,6 +5,61 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=(".env"), env_ignore_empty=True)
 
     OAI_API_KEY: str
+    OAI_BASE_URL: str | None = None
+    OAI_MODEL: str = "gpt-4o-2024-08-06"
+    OAI_MAX_CONNECTIONS: int = 100
+    OAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OAI_KEEPALIVE_EXPIRY: float = 30.0
+    OAI_TIMEOUT: float = 60.0
+    OAI_MAX_IN_FLIGHT: int = 5
+
+    CHROMA_HOST: str = "localhost"
+    CHROMA_PORT: int = 8000
+    KNOWLEDGE_BACKEND: str = "chroma"
+    KNOWLEDGE_SNAPSHOT_PATH: str | None = None
+
+    QUEUE_CAPACITY: int = 1000
+    QUEUE_CAPACITIES: dict[str, int] = {}
+    QUEUE_POLICY: str = "block"
+    QUEUE_SPILL_DIR: str | None = None
+    QUEUE_SCHEDULING: str = "fifo"
+    QUEUE_AGING_RATE: float = 0.05
+    QUEUE_DURABLE_DIR: str | None = None
+    QUEUE_SEGMENT_SIZE: int = 64 * 1024 * 1024
+    QUEUE_COMMIT_DELAY: float = 0.002
+    QUEUE_FSYNC: bool = True
+    INGRESS_MAX_RATE: float | None = None
+
+    ROUTING_STRATEGY: str = "broadcast"
+    ROUTING_STRATEGIES: dict[str, str] = {}
+
+    TRANSPORT: str = "memory"
+    BROKER_HOST: str = "127.0.0.1"
+    BROKER_PORT: int = 7000
+    BROKER_PATH: str | None = None
+
+    RUNTIME: str = "async"
+    RUNTIME_PROCESSES: dict[str, int] = {}
+
+    AUTOSCALE_INTERVAL: float | None = 1.0
+    WORKER_BOUNDS: dict[str, tuple[int, int]] = {
+        "RiskAssessmentAgent": (1, 2),
+        "EscalationAgent": (1, 2),
+    }
+
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int | None = None
+    WATCHDOG_THRESHOLD: float | None = None
+    WATCHDOG_INTERVAL: float = 0.05
+    WATCHDOG_EXPORT_PATH: str | None = None
+    TRACE_EXPORT_PATH: str | None = None
+
+    OAI_PRICES: dict[str, tuple[float, float]] = {}
+    COST_EXPORT_PATH: str | None = None
+    COST_FLUSH_INTERVAL: float = 60.0
+    BUDGET_TOKENS_PER_MINUTE: int | None = None
+    BUDGET_DAILY_SPEND: float | None = None
+    BUDGET_SLOW_DOWN_AT: float = 0.8
 
 
 settings = Settings()
@@ -1,3 +1,14 @@
+from .backends import InMemoryBackend, KnowledgeBackend, open_backend
 from .base import KnowledgeBase
+from .rules import CompiledRule, RuleEngine
+from .shared import get_knowledge_base
 
-__all__ = ["KnowledgeBase"]
+__all__ = [
+    "CompiledRule",
+    "InMemoryBackend",
+    "KnowledgeBackend",
+    "KnowledgeBase",
+    "RuleEngine",
+    "get_knowledge_base",
+    "open_backend",
+]
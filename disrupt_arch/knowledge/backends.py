@@ -0,0 +1,208 @@
+import json
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+from chromadb import Collection
+from chromadb.api.types import EmbeddingFunction
+from chromadb.utils import embedding_functions
+from config import get_chroma_client, settings
+
+
+class KnowledgeBackend(ABC):
+    """
+    Storage and similarity search for knowledge. Mirrors the subset of the Chroma
+    collection API used by the KnowledgeBase, so Chroma collections are backends
+    as they are.
+    """
+
+    @abstractmethod
+    def add(self, documents, metadatas=None, ids=None):
+        pass
+
+    @abstractmethod
+    def get(self, include=None) -> dict:
+        pass
+
+    @abstractmethod
+    def query(self, query_texts, n_results=10) -> dict:
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+
+KnowledgeBackend.register(Collection)
+
+
+class InMemoryBackend(KnowledgeBackend):
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction,
+        ids: list[str] | None = None,
+        documents: list[str] | None = None,
+        metadatas: list[dict] | None = None,
+        embeddings: np.ndarray | None = None,
+    ):
+        """
+        In-process vector index holding all embeddings in one contiguous matrix.
+        :param embedding_function: Embeds documents and queries. Must match the
+            function the embeddings were created with.
+        :param ids: Ids of the documents.
+        :param documents: The documents.
+        :param metadatas: Metadata of the documents.
+        :param embeddings: Embeddings of the documents, one row per document.
+        """
+        self.embedding_function = embedding_function
+        self.ids = list(ids or [])
+        self.documents = list(documents or [])
+        self.metadatas = list(metadatas or [None] * len(self.ids))
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.lock = threading.Lock()
+        if embeddings is not None and len(embeddings):
+            self.matrix = self.normalize(embeddings)
+
+    @classmethod
+    def from_collection(
+        cls, collection: Collection, embedding_function: EmbeddingFunction
+    ) -> "InMemoryBackend":
+        """Loads all documents and embeddings of a Chroma collection once."""
+        records = collection.get(include=["documents", "metadatas", "embeddings"])
+        return cls(
+            embedding_function,
+            records["ids"],
+            records["documents"],
+            records["metadatas"],
+            np.asarray(records["embeddings"], dtype=np.float32),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path, embedding_function: EmbeddingFunction):
+        """Loads a snapshot written by snapshot."""
+        path = Path(path)
+        records = json.loads((path / "records.json").read_text())
+        return cls(
+            embedding_function,
+            records["ids"],
+            records["documents"],
+            records["metadatas"],
+            np.load(path / "embeddings.npy"),
+        )
+
+    def snapshot(self, path: str | Path):
+        """Writes documents and embeddings to a directory."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            np.save(path / "embeddings.npy", self.matrix)
+            records = {
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+            }
+        (path / "records.json").write_text(json.dumps(records))
+
+    @staticmethod
+    def normalize(embeddings) -> np.ndarray:
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def add(self, documents, metadatas=None, ids=None):
+        embeddings = self.normalize(self.embedding_function(documents))
+        with self.lock:
+            ids = ids or [str(uuid.uuid4()) for _ in documents]
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas or [None] * len(documents))
+            self.matrix = (
+                np.vstack([self.matrix, embeddings]) if len(self.matrix) else embeddings
+            )
+
+    def get(self, include=None) -> dict:
+        include = include or ["documents", "metadatas"]
+        with self.lock:
+            records = {
+                "ids": list(self.ids),
+                "documents": list(self.documents) if "documents" in include else None,
+                "metadatas": list(self.metadatas) if "metadatas" in include else None,
+                "embeddings": self.matrix.copy() if "embeddings" in include else None,
+            }
+        records["included"] = include
+        return records
+
+    def query(self, query_texts, n_results=10) -> dict:
+        """
+        Answers all queries with one matrix product of the normalized query
+        embeddings and the document matrix. Documents are ranked by cosine
+        similarity. Distances are squared L2 distances of the normalized
+        embeddings, 2 - 2 * cosine similarity. They equal the distances of a
+        Chroma collection with its default l2 space if the embedding function
+        returns normalized embeddings, as the default one does.
+        """
+        queries = self.normalize(self.embedding_function(query_texts))
+        with self.lock:
+            matrix, ids = self.matrix, self.ids
+            documents, metadatas = self.documents, self.metadatas
+
+        k = min(n_results, len(ids))
+        result = {
+            "ids": [],
+            "distances": [],
+            "documents": [],
+            "metadatas": [],
+            "embeddings": None,
+            "included": ["documents", "metadatas", "distances"],
+        }
+        if k == 0:
+            for key in ("ids", "distances", "documents", "metadatas"):
+                result[key] = [[] for _ in query_texts]
+            return result
+
+        scores = queries @ matrix.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates])]
+            result["ids"].append([ids[i] for i in ranked])
+            result["distances"].append((2 - 2 * row[ranked]).tolist())
+            result["documents"].append([documents[i] for i in ranked])
+            result["metadatas"].append([metadatas[i] for i in ranked])
+        return result
+
+    def count(self) -> int:
+        return len(self.ids)
+
+
+def open_backend(
+    name: str = "business_rules", embedding_function: EmbeddingFunction | None = None
+) -> KnowledgeBackend:
+    """
+    Opens a collection with the backend configured in the settings. The in-memory
+    backend loads the snapshot if one exists and otherwise copies the Chroma
+    collection once and writes the snapshot.
+    """
+    embedding_function = (
+        embedding_function or embedding_functions.DefaultEmbeddingFunction()
+    )
+
+    if settings.KNOWLEDGE_BACKEND == "chroma":
+        return get_chroma_client().get_collection(
+            name, embedding_function=embedding_function
+        )
+    if settings.KNOWLEDGE_BACKEND != "memory":
+        raise ValueError(f"Unknown knowledge backend: {settings.KNOWLEDGE_BACKEND}")
+
+    snapshot_path = settings.KNOWLEDGE_SNAPSHOT_PATH
+    if snapshot_path and Path(snapshot_path, "embeddings.npy").exists():
+        return InMemoryBackend.load(snapshot_path, embedding_function)
+
+    backend = InMemoryBackend.from_collection(
+        get_chroma_client().get_collection(name, embedding_function=embedding_function),
+        embedding_function,
+    )
+    if snapshot_path:
+        backend.snapshot(snapshot_path)
+    return backend
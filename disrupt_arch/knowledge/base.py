@@ -1,18 +1,235 @@
+import asyncio
+import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 
 from chromadb import Collection
 
+from .backends import KnowledgeBackend
+
+# Fields of query results that hold one list of matches per query text.
+PER_QUERY_FIELDS = (
+    "ids",
+    "distances",
+    "documents",
+    "metadatas",
+    "embeddings",
+    "uris",
+    "data",
+)
+
 
 class KnowledgeBase:
-    def __init__(self, collection: Collection):
+    def __init__(
+        self,
+        collection: Collection | KnowledgeBackend,
+        cache_size: int = 256,
+        version_check_interval: float | None = 30.0,
+        coalesce_window: float = 0.002,
+    ):
+        """
+        Access to the business rules stored in a collection.
+        :param collection: The Chroma collection or backend holding the knowledge.
+        :param cache_size: Maximum number of memoized query results.
+        :param version_check_interval: Seconds between checks whether the collection
+            was changed by another client. None disables the checks.
+        :param coalesce_window: Seconds async queries wait to be sent together.
+        """
         self.collection = collection
+        self.version = 0
+        self.fingerprint = None
+        self.version_check_interval = version_check_interval
+        self.version_checked_at = None
+        self.version_sync: asyncio.Future | None = None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_version = self.version
+        self.in_flight: dict[tuple, tuple[Future, int]] = {}
+        self.lock = threading.Lock()
+        self.coalesce_window = coalesce_window
+        self.pending: list[tuple] = []
+        self.flush_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.batches = 0
 
     def add_knowledge(self, documents, metadata):
         """Add a business rule."""
         self.collection.add(documents=[documents], metadatas=[metadata])
+        self.version += 1
 
-    def query_knowledge(self, query_text, top_k=3):
-        results = self.collection.query(
-            query_texts=[json.dumps(query_text)], n_results=top_k
+    def sync_version(self):
+        """
+        Bumps the version when the collection was changed by another client,
+        e.g. by re-seeding the business rules.
+        """
+        records = self.collection.get(include=["documents", "metadatas"])
+        fingerprint = hashlib.sha256(
+            json.dumps(records, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        if self.fingerprint is not None and fingerprint != self.fingerprint:
+            self.version += 1
+        self.fingerprint = fingerprint
+        self.version_checked_at = time.monotonic()
+        return self.version
+
+    def version_check_due(self) -> bool:
+        return self.version_check_interval is not None and (
+            self.version_checked_at is None
+            or time.monotonic() - self.version_checked_at > self.version_check_interval
         )
+
+    async def check_version(self) -> int:
+        """
+        Syncs the version without blocking the event loop if a check is due.
+        Callers serving answers derived from the knowledge without querying it
+        check the version first, so they notice changes by other clients.
+        Concurrent callers share a single sync.
+        """
+        if self.version_check_due():
+            if self.version_sync is None:
+                self.version_sync = asyncio.ensure_future(
+                    asyncio.to_thread(self.sync_version)
+                )
+                self.version_sync.add_done_callback(self.version_synced)
+            # Shielded, so a cancelled caller does not cancel the shared sync.
+            await asyncio.shield(self.version_sync)
+        return self.version
+
+    def version_synced(self, sync: asyncio.Future):
+        self.version_sync = None
+        # Retrieved, so a failed sync all callers gave up on is not reported.
+        if not sync.cancelled():
+            sync.exception()
+
+    def lookup(self, key: tuple) -> tuple[dict | None, Future | None, bool]:
+        """
+        Returns the memoized results of a query, or the future of the request
+        serving it and whether the caller owns, i.e. has to send, that request.
+        """
+        with self.lock:
+            if self.cache_version != self.version:
+                self.cache.clear()
+                self.cache_version = self.version
+
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key], None, False
+
+            if key in self.in_flight:
+                self.shared += 1
+                return None, self.in_flight[key][0], False
+
+            self.misses += 1
+            future = Future()
+            self.in_flight[key] = (future, self.version)
+            return None, future, True
+
+    def complete(
+        self, key: tuple, results: dict | None, error: Exception | None = None
+    ):
+        """Memoizes the results of a request and hands them to all waiting callers."""
+        with self.lock:
+            future, version = self.in_flight.pop(key)
+            if error is None and version == self.version:
+                self.cache[key] = results
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        # Waiting callers that were cancelled must not fail the others.
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(results)
+
+    def query_knowledge(self, query_text, top_k=3):
+        """
+        Queries the collection. Results are memoized until the knowledge changes
+        and concurrent identical queries share a single request.
+        """
+        if self.version_check_due():
+            self.sync_version()
+
+        query = json.dumps(query_text)
+        key = (query, top_k)
+        results, future, owner = self.lookup(key)
+        if results is not None:
+            return results
+        if not owner:
+            return future.result()
+
+        try:
+            results = self.collection.query(query_texts=[query], n_results=top_k)
+        except Exception as e:
+            self.complete(key, None, e)
+            raise
+
+        self.complete(key, results)
         return results
+
+    async def aquery_knowledge(self, query_text, top_k=3):
+        """
+        Queries the collection without blocking the event loop. Queries arriving
+        within the coalesce window are sent as one request with multiple query
+        texts from a worker thread.
+        """
+        await self.check_version()
+
+        key = (json.dumps(query_text), top_k)
+        results, future, owner = self.lookup(key)
+        if results is not None:
+            return results
+
+        if owner:
+            self.pending.append(key)
+            if self.flush_task is None:
+                self.flush_task = asyncio.create_task(self.flush())
+
+        # Shielded, so a cancelled caller does not cancel the shared request.
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def flush(self):
+        """Sends all pending queries in one request and splits up the results."""
+        await asyncio.sleep(self.coalesce_window)
+        keys, self.pending, self.flush_task = self.pending, [], None
+        n_results = max(top_k for _, top_k in keys)
+
+        try:
+            results = await asyncio.to_thread(
+                self.collection.query,
+                query_texts=[query for query, _ in keys],
+                n_results=n_results,
+            )
+        except Exception as e:
+            for key in keys:
+                self.complete(key, None, e)
+            return
+
+        self.batches += 1
+        for index, (query, top_k) in enumerate(keys):
+            self.complete(
+                (query, top_k),
+                {
+                    field: [values[index][:top_k]]
+                    if field in PER_QUERY_FIELDS and values is not None
+                    else values
+                    for field, values in results.items()
+                },
+            )
+
+    def cache_stats(self) -> dict:
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "batches": self.batches,
+        }
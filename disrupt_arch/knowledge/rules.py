@@ -0,0 +1,122 @@
+import json
+import logging
+import operator
+from collections import Counter
+from typing import Callable
+
+from models import DebtorProfile, NextBestAction
+
+from .base import KnowledgeBase
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda value, options: value in options,
+}
+
+
+class CompiledRule:
+    def __init__(self, rule_id: str, conditions: list[dict], action: NextBestAction):
+        """
+        A business rule compiled into an executable predicate.
+        :param rule_id: The id of the rule in the knowledge base.
+        :param conditions: Clauses of the form {"field", "op", "value"}, all of
+            which must hold for the rule to match.
+        :param action: The next best action taken when the rule matches.
+        """
+        self.rule_id = rule_id
+        self.action = action
+        self.predicate = self.compile(conditions)
+
+    @staticmethod
+    def compile(conditions: list[dict]) -> Callable[[DebtorProfile], bool]:
+        clauses = []
+        for condition in conditions:
+            field, op, value = condition["field"], condition["op"], condition["value"]
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported operator in rule condition: {op}")
+            if value is None and op in ("==", "!="):
+                compare = operator.is_ if op == "==" else operator.is_not
+            else:
+                compare = OPERATORS[op]
+            clauses.append((operator.attrgetter(field), compare, value))
+
+        def predicate(entity: DebtorProfile) -> bool:
+            for get, compare, value in clauses:
+                actual = get(entity)
+                if actual is None and value is not None:
+                    return False
+                if not compare(actual, value):
+                    return False
+            return True
+
+        return predicate
+
+    def matches(self, entity: DebtorProfile) -> bool:
+        return self.predicate(entity)
+
+
+class RuleEngine:
+    def __init__(self, knowledge_base: KnowledgeBase):
+        """
+        Evaluates business rules that carry structured conditions in their
+        metadata without retrieval or reasoning.
+        :param knowledge_base: The KnowledgeBase holding the business rules.
+        """
+        self.knowledge_base = knowledge_base
+        self.rules: list[CompiledRule] = []
+        self.version = None
+        self.matches = Counter()
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Compiles all rules of the knowledge base that define conditions."""
+        records = self.knowledge_base.collection.get(include=["metadatas"])
+        compiled = []
+
+        for rule_id, metadata in zip(records["ids"], records["metadatas"]):
+            if not metadata or "conditions" not in metadata:
+                continue
+            try:
+                rule = CompiledRule(
+                    rule_id,
+                    json.loads(metadata["conditions"]),
+                    NextBestAction(
+                        action=metadata["action"], target=metadata["target"]
+                    ),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logging.error(f"Unable to compile business rule {rule_id}: {e}")
+                continue
+            compiled.append((metadata.get("priority", len(compiled)), rule))
+
+        self.rules = [rule for _, rule in sorted(compiled, key=lambda r: r[0])]
+        self.version = self.knowledge_base.version
+        logging.info(f"RuleEngine compiled {len(self.rules)} business rules.")
+
+    def evaluate(self, entity: DebtorProfile) -> NextBestAction | None:
+        """
+        Returns the action of the first matching rule or None. Recompiles the
+        rules first if the knowledge changed, checking for changes by other
+        clients when a check is due.
+        """
+        if self.knowledge_base.version_check_due():
+            self.knowledge_base.sync_version()
+        if self.knowledge_base.version != self.version:
+            self.load()
+
+        for rule in self.rules:
+            if rule.matches(entity):
+                self.matches[rule.rule_id] += 1
+                return rule.action
+
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {"matches": dict(self.matches), "misses": self.misses}
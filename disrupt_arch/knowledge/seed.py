@@ -1,3 +1,4 @@
+import json
 import logging
 
 from chromadb import HttpClient
@@ -10,19 +11,54 @@ default_ef = embedding_functions.DefaultEmbeddingFunction()
 rules = [
     {
         "description": "If risk level is None request risk assessment",
-        "metadata": {"action": "assess_risk", "target": "RiskAssessmentAgent"},
+        "metadata": {
+            "action": "assess_risk",
+            "target": "RiskAssessmentAgent",
+            "priority": 1,
+            "conditions": json.dumps(
+                [{"field": "risk_level", "op": "==", "value": None}]
+            ),
+        },
     },
     {
         "description": "If overdue days > 120 and risk level is High, escalate case.",
-        "metadata": {"action": "escalate_case", "target": "LegalAgent"},
+        "metadata": {
+            "action": "escalate_case",
+            "target": "LegalAgent",
+            "priority": 2,
+            "conditions": json.dumps(
+                [
+                    {"field": "overdue_days", "op": ">", "value": 120},
+                    {"field": "risk_level", "op": "==", "value": "HIGH"},
+                ]
+            ),
+        },
     },
     {
         "description": "If risk level is Moderate and overdue days are between 60 and 120, escalate case.",
-        "metadata": {"action": "installment_plan", "target": "InstallmentPlanAgent"},
+        "metadata": {
+            "action": "installment_plan",
+            "target": "InstallmentPlanAgent",
+            "priority": 3,
+            "conditions": json.dumps(
+                [
+                    {"field": "risk_level", "op": "==", "value": "MEDIUM"},
+                    {"field": "overdue_days", "op": ">=", "value": 60},
+                    {"field": "overdue_days", "op": "<=", "value": 120},
+                ]
+            ),
+        },
     },
     {
         "description": "If risk level is Low, contact the debtor directly with a payment plan.",
-        "metadata": {"action": "installment_plan", "target": "InstallmentPlanAgent"},
+        "metadata": {
+            "action": "installment_plan",
+            "target": "InstallmentPlanAgent",
+            "priority": 4,
+            "conditions": json.dumps(
+                [{"field": "risk_level", "op": "==", "value": "LOW"}]
+            ),
+        },
     },
     {
         "description": """"
@@ -51,7 +87,7 @@ def seed_busines_ules():
     )
 
     for index, rule in enumerate(rules, start=1):
-        collection.add(
+        collection.upsert(
             documents=[rule["description"]],
             metadatas=[rule["metadata"]],
             ids=[str(index)],
@@ -0,0 +1,13 @@
+from functools import cache
+
+from .backends import open_backend
+from .base import KnowledgeBase
+
+
+@cache
+def get_knowledge_base(name: str = "business_rules") -> KnowledgeBase:
+    """
+    Returns the knowledge base of a collection shared by all agents of the process,
+    so they use one collection handle, one cache and one request coalescer.
+    """
+    return KnowledgeBase(open_backend(name))
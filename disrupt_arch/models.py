@@ -32,3 +32,11 @@ class DebtorProfile(BaseModel):
 class NextBestAction(BaseModel):
     action: str
     target: str
+
+
+class ProfileNextBestAction(NextBestAction):
+    profile_key: str
+
+
+class NextBestActionBatch(BaseModel):
+    actions: list[ProfileNextBestAction]
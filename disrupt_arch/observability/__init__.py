@@ -0,0 +1,24 @@
+from .costs import MODEL_PRICES, CostLedger, Usage, cost_ledger
+from .metrics import LATENCY_BUCKETS, AgentMetrics, Histogram
+from .server import MetricsServer, render_prometheus, snapshot
+from .tracing import JsonlSpanExporter, Span, Tracer, current_span, tracer
+from .watchdog import LoopWatchdog
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "MODEL_PRICES",
+    "AgentMetrics",
+    "CostLedger",
+    "Histogram",
+    "JsonlSpanExporter",
+    "LoopWatchdog",
+    "MetricsServer",
+    "Span",
+    "Tracer",
+    "Usage",
+    "cost_ledger",
+    "current_span",
+    "render_prometheus",
+    "snapshot",
+    "tracer",
+]
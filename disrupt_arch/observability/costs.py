@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import time
+
+# USD per million prompt and completion tokens.
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-2024-08-06": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+
+class Usage:
+    def __init__(self):
+        """Tokens and cost of a group of completions."""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    def add(self, prompt_tokens: float, completion_tokens: float, cost: float):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+        }
+
+
+class CostLedger:
+    def __init__(
+        self,
+        prices: dict[str, tuple[float, float]] | None = None,
+        export_path: str | None = None,
+        flush_interval: float = 60.0,
+    ):
+        """
+        Accounts the tokens and cost of completions per agent, per workflow and
+        per model in memory. Totals per agent and model are kept for the lifetime
+        of the process. The usage per workflow is appended to the export file with
+        the totals on every flush and then forgotten, so memory does not grow with
+        the number of workflows.
+        :param prices: USD per million prompt and completion tokens by model.
+            Defaults to MODEL_PRICES.
+        :param export_path: JSONL file the usage is flushed to.
+        :param flush_interval: Seconds between flushes.
+        """
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self.export_path = export_path
+        self.flush_interval = flush_interval
+        self.agents: dict[str, Usage] = {}
+        self.models: dict[str, Usage] = {}
+        self.workflows: dict[str, Usage] = {}
+        self.listeners = []
+        self.unpriced: set[str] = set()
+        self.unflushed = False
+
+    def add_listener(self, listener):
+        """Calls the listener with the tokens and cost of every completion."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def price(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Returns the cost of a completion in USD, 0 for models without price."""
+        prices = self.prices.get(model)
+        if prices is None:
+            if model not in self.unpriced:
+                self.unpriced.add(model)
+                logging.warning(f"No price configured for model {model}.")
+            return 0.0
+        prompt_price, completion_price = prices
+        return (
+            prompt_tokens * prompt_price + completion_tokens * completion_price
+        ) / 1e6
+
+    def record(
+        self,
+        agent: str,
+        model: str,
+        usage,
+        workflow_ids: list[str] | tuple[str, ...] = (),
+    ) -> float:
+        """
+        Accounts the usage block of a completion. The usage of a completion
+        made for several workflows at once is split evenly among them.
+        :return: The cost of the completion in USD.
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+            return 0.0
+
+        cost = self.price(model, prompt_tokens, completion_tokens)
+        for key, totals in ((agent, self.agents), (model, self.models)):
+            totals.setdefault(key, Usage()).add(prompt_tokens, completion_tokens, cost)
+        if workflow_ids:
+            share = 1 / len(workflow_ids)
+            for workflow_id in workflow_ids:
+                self.workflows.setdefault(workflow_id, Usage()).add(
+                    prompt_tokens * share, completion_tokens * share, cost * share
+                )
+        self.unflushed = True
+
+        for listener in self.listeners:
+            try:
+                listener(prompt_tokens + completion_tokens, cost)
+            except Exception as e:
+                logging.error(f"Cost listener failed: {e}")
+        return cost
+
+    def snapshot(self) -> dict:
+        return {
+            "cost": sum(usage.cost for usage in self.models.values()),
+            "agents": {name: usage.snapshot() for name, usage in self.agents.items()},
+            "models": {name: usage.snapshot() for name, usage in self.models.items()},
+            "workflows": {
+                workflow_id: usage.snapshot()
+                for workflow_id, usage in self.workflows.items()
+            },
+        }
+
+    async def flush(self):
+        """
+        Appends the totals and the usage per workflow since the last flush to
+        the export file and forgets the workflows. Nothing is appended if no
+        completion was recorded since.
+        """
+        if not self.unflushed:
+            return
+        record = {"time": time.time(), **self.snapshot()}
+        self.workflows = {}
+        self.unflushed = False
+        if not self.export_path:
+            return
+        try:
+            await asyncio.to_thread(self.write, record)
+        except Exception as e:
+            logging.error(f"Unable to flush costs to {self.export_path}: {e}")
+
+    def write(self, record: dict):
+        with open(self.export_path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+    async def run(self):
+        """Flushes periodically until cancelled, then a last time."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            if self.unflushed and self.export_path:
+                self.write({"time": time.time(), **self.snapshot()})
+
+
+# Ledger shared by the agents of a process.
+cost_ledger = CostLedger()
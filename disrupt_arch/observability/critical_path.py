@@ -0,0 +1,156 @@
+import argparse
+import json
+from collections import defaultdict
+
+UNTRACED = "untraced"
+
+
+def load_traces(path: str) -> dict[str, list[dict]]:
+    """Reads spans exported by the JsonlSpanExporter, grouped by trace id."""
+    traces = defaultdict(list)
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for span in scope["spans"]:
+                        traces[span["traceId"]].append(
+                            {
+                                "name": span["name"],
+                                "span_id": span["spanId"],
+                                "parent_id": span.get("parentSpanId"),
+                                "start": int(span["startTimeUnixNano"]) / 1e9,
+                                "end": int(span["endTimeUnixNano"]) / 1e9,
+                            }
+                        )
+    return traces
+
+
+def critical_path(spans: list[dict]) -> list[tuple[str, float]]:
+    """
+    Returns the segments of the critical path of a workflow as operation names
+    and seconds, in order. The path leads from the first span to the span that
+    finished last along the causal chain of parents. Within a span of the chain
+    the time until the next span of the chain started is split among its other
+    children, e.g. LLM calls and retrievals, and the span itself.
+    """
+    if not spans:
+        return []
+    by_id = {span["span_id"]: span for span in spans}
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+
+    chain, seen = [], set()
+    span = max(spans, key=lambda span: span["end"])
+    while span is not None and span["span_id"] not in seen:
+        chain.append(span)
+        seen.add(span["span_id"])
+        span = by_id.get(span["parent_id"])
+    chain.reverse()
+
+    segments = []
+    for index, span in enumerate(chain):
+        following = chain[index + 1] if index + 1 < len(chain) else None
+        until = following["start"] if following else span["end"]
+        end = max(min(until, span["end"]), span["start"])
+
+        cursor = span["start"]
+        for child in sorted(children[span["span_id"]], key=lambda c: c["start"]):
+            if child is following:
+                continue
+            start, stop = max(child["start"], cursor), min(child["end"], end)
+            if stop <= start:
+                continue
+            segments.append((span["name"], start - cursor))
+            segments.append((child["name"], stop - start))
+            cursor = stop
+        segments.append((span["name"], end - cursor))
+        if until > end:
+            segments.append((UNTRACED, until - end))
+
+    merged = []
+    for name, seconds in segments:
+        if seconds <= 0:
+            continue
+        if merged and merged[-1][0] == name:
+            merged[-1] = (name, merged[-1][1] + seconds)
+        else:
+            merged.append((name, seconds))
+    return merged
+
+
+def summarize(paths: list[list[tuple[str, float]]]) -> list[tuple[str, float, float]]:
+    """Returns the mean seconds per workflow and share of each operation."""
+    totals = defaultdict(float)
+    for path in paths:
+        for name, seconds in path:
+            totals[name] += seconds
+    overall = sum(totals.values()) or 1.0
+    return sorted(
+        (
+            (name, seconds / len(paths), seconds / overall)
+            for name, seconds in totals.items()
+        ),
+        key=lambda row: row[1],
+        reverse=True,
+    )
+
+
+def render_path(workflow_id: str, path: list[tuple[str, float]]) -> str:
+    total = sum(seconds for _, seconds in path) or 1.0
+    lines = [f"Workflow {workflow_id}: {total:.4f}s"]
+    lines += [
+        f"  {name:<40} {seconds:>9.4f}s {seconds / total:>6.1%}"
+        for name, seconds in path
+    ]
+    return "\n".join(lines)
+
+
+def render_summary(paths: list[list[tuple[str, float]]]) -> str:
+    lines = [f"Critical path of {len(paths)} workflows, mean per workflow:"]
+    lines += [
+        f"  {name:<40} {seconds:>9.4f}s {share:>6.1%}"
+        for name, seconds, share in summarize(paths)
+    ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Breaks the latency of traced workflows down along their "
+        "critical path."
+    )
+    parser.add_argument("path", help="JSONL file of exported spans.")
+    parser.add_argument("--workflow", help="Show the path of this workflow only.")
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=1,
+        help="Number of slowest workflows shown after the summary.",
+    )
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if args.workflow:
+        print(render_path(args.workflow, critical_path(traces[args.workflow])))
+        return
+
+    paths = {trace_id: critical_path(spans) for trace_id, spans in traces.items()}
+    if not paths:
+        print("No spans found.")
+        return
+    print(render_summary(list(paths.values())))
+    slowest = sorted(
+        paths.items(),
+        key=lambda item: sum(seconds for _, seconds in item[1]),
+        reverse=True,
+    )
+    for workflow_id, path in slowest[: args.slowest]:
+        print()
+        print(render_path(workflow_id, path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import bisect
+from collections import Counter
+
+# Upper bounds in seconds of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Counts observations in fixed buckets, like a Prometheus histogram.
+        :param buckets: Sorted upper bounds of the buckets. Larger values fall
+            into an implicit +Inf bucket.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Returns the upper bound and the cumulative count of every bucket."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class AgentMetrics:
+    HISTOGRAMS = ("queue_wait", "service_time", "llm_latency", "retrieval_latency")
+    COUNTERS = (
+        "messages",
+        "errors",
+        "llm_calls",
+        "llm_errors",
+        "prompt_tokens",
+        "completion_tokens",
+        "retrievals",
+    )
+
+    def __init__(self):
+        """
+        Runtime metrics of an agent. Histograms hold seconds: the time messages
+        waited in the queue, the processing time per message and, for cognitive
+        agents, the latency of completions and knowledge retrievals. Counters
+        count messages, errors, completions, tokens and retrievals.
+        """
+        self.histograms = {name: Histogram() for name in self.HISTOGRAMS}
+        self.counters = Counter({name: 0 for name in self.COUNTERS})
+
+    def observe(self, histogram: str, seconds: float):
+        self.histograms[histogram].observe(seconds)
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] += amount
+
+    def record_usage(self, usage):
+        """Counts the tokens of a completion usage block, if there is one."""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if isinstance(prompt_tokens, int):
+            self.counters["prompt_tokens"] += prompt_tokens
+        if isinstance(completion_tokens, int):
+            self.counters["completion_tokens"] += completion_tokens
+
+    def snapshot(self) -> dict:
+        return {
+            **self.counters,
+            **{name: h.snapshot() for name, h in self.histograms.items()},
+        }
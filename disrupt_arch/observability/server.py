@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+
+HISTOGRAM_HELP = {
+    "queue_wait": "Seconds messages waited in the queue of the agent.",
+    "service_time": "Seconds the agent processed a message.",
+    "llm_latency": "Seconds of a completion of the reasoning model.",
+    "retrieval_latency": "Seconds of a knowledge base query.",
+}
+COUNTER_HELP = {
+    "messages": "Messages processed.",
+    "errors": "Messages whose processing failed.",
+    "llm_calls": "Completions requested.",
+    "llm_errors": "Completions that failed.",
+    "prompt_tokens": "Prompt tokens of completions.",
+    "completion_tokens": "Generated tokens of completions.",
+    "retrievals": "Knowledge base queries.",
+}
+GAUGE_HELP = {
+    "queue_depth": "Messages waiting in the queue of the agent.",
+    "in_flight": "Workers processing messages.",
+    "workers": "Worker tasks of the agent.",
+}
+
+
+def snapshot(agents: list) -> dict:
+    """Returns the metrics of every agent by agent name."""
+    return {agent.name: agent.snapshot() for agent in agents}
+
+
+def render_histogram(lines: list[str], metric: str, histogram, labels: str = ""):
+    separator = "," if labels else ""
+    for bound, count in histogram.cumulative():
+        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+        lines.append(f'{metric}_bucket{{{labels}{separator}le="{le}"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{metric}_sum{suffix} {histogram.sum}")
+    lines.append(f"{metric}_count{suffix} {histogram.count}")
+
+
+def render_watchdog(lines: list[str], watchdog):
+    lines.append("# HELP event_loop_lag_seconds Lag of the event loop timer.")
+    lines.append("# TYPE event_loop_lag_seconds histogram")
+    render_histogram(lines, "event_loop_lag_seconds", watchdog.lag)
+
+    stalls = watchdog.by_method()
+    lines.append("# HELP event_loop_stalls_total Event loop stalls by blocking method.")
+    lines.append("# TYPE event_loop_stalls_total counter")
+    for (agent, method), (count, _) in stalls.items():
+        lines.append(
+            f'event_loop_stalls_total{{agent="{agent}",method="{method}"}} {count}'
+        )
+    lines.append(
+        "# HELP event_loop_stall_seconds_total Seconds the event loop was blocked."
+    )
+    lines.append("# TYPE event_loop_stall_seconds_total counter")
+    for (agent, method), (_, seconds) in stalls.items():
+        lines.append(
+            f'event_loop_stall_seconds_total{{agent="{agent}",method="{method}"}} '
+            f"{seconds}"
+        )
+
+
+def render_prometheus(agents: list, watchdog=None) -> str:
+    """
+    Renders the metrics of the agents and, if given, the event loop lag and
+    stalls of a LoopWatchdog in the Prometheus text format.
+    """
+    lines = []
+    for gauge, help_text in GAUGE_HELP.items():
+        lines.append(f"# HELP agent_{gauge} {help_text}")
+        lines.append(f"# TYPE agent_{gauge} gauge")
+        for agent in agents:
+            lines.append(
+                f'agent_{gauge}{{agent="{agent.name}"}} {agent.gauges()[gauge]}'
+            )
+
+    for counter, help_text in COUNTER_HELP.items():
+        lines.append(f"# HELP agent_{counter}_total {help_text}")
+        lines.append(f"# TYPE agent_{counter}_total counter")
+        for agent in agents:
+            value = agent.metrics.counters[counter]
+            lines.append(f'agent_{counter}_total{{agent="{agent.name}"}} {value}')
+
+    cognitive = [agent for agent in agents if hasattr(agent, "costs")]
+    if cognitive:
+        lines.append("# HELP agent_llm_cost_usd_total USD spent on completions.")
+        lines.append("# TYPE agent_llm_cost_usd_total counter")
+        for agent in cognitive:
+            usage = agent.costs.agents.get(agent.name)
+            cost = usage.cost if usage else 0.0
+            lines.append(f'agent_llm_cost_usd_total{{agent="{agent.name}"}} {cost}')
+
+    for name, help_text in HISTOGRAM_HELP.items():
+        metric = f"agent_{name}_seconds"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for agent in agents:
+            render_histogram(
+                lines, metric, agent.metrics.histograms[name], f'agent="{agent.name}"'
+            )
+
+    if watchdog is not None:
+        render_watchdog(lines, watchdog)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    def __init__(
+        self,
+        agents: list,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        watchdog=None,
+    ):
+        """
+        Minimal HTTP endpoint on the event loop of the agents. Serves the metrics
+        in the Prometheus text format at /metrics and as JSON at /metrics.json.
+        :param agents: The agents whose metrics are served.
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 picks a free port.
+        :param watchdog: LoopWatchdog whose lag and stalls are served as well, the
+            stalls per call site as JSON at /stalls.json.
+        """
+        self.agents = agents
+        self.watchdog = watchdog
+        self.host = host
+        self.port = port
+        self.server: asyncio.Server | None = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else ""
+            if path == "/metrics":
+                status = "200 OK"
+                content_type = "text/plain; version=0.0.4"
+                body = render_prometheus(self.agents, self.watchdog).encode()
+            elif path == "/metrics.json":
+                status = "200 OK"
+                content_type = "application/json"
+                body = json.dumps(snapshot(self.agents)).encode()
+            elif path == "/stalls.json" and self.watchdog is not None:
+                status = "200 OK"
+                content_type = "application/json"
+                body = json.dumps(self.watchdog.snapshot()).encode()
+            else:
+                status = "404 Not Found"
+                content_type = "text/plain"
+                body = b"Not found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logging.error(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
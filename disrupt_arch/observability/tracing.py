@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Span that operations of the current task are recorded under.
+current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        start: int | None = None,
+        attributes: dict | None = None,
+    ):
+        """
+        A timed operation of a workflow.
+        :param name: Name of the operation, e.g. "TaskAgent.llm".
+        :param trace_id: 32 hex digits, the workflow id.
+        :param parent_id: Span id of the operation that caused this one.
+        :param start: Start in nanoseconds since the epoch. Defaults to now.
+        :param attributes: Further details of the operation.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id or None
+        self.start = start or time.time_ns()
+        self.end: int | None = None
+        self.attributes = attributes or {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        """Returns the span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end or self.start),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class JsonlSpanExporter:
+    def __init__(
+        self,
+        path: str,
+        service_name: str = "disrupt_arch",
+        batch_size: int = 512,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Appends finished spans to a file from a background thread, one OTLP JSON
+        export request per line, so exporting never blocks the event loop.
+        :param path: The JSONL file.
+        :param service_name: The service.name resource attribute.
+        :param batch_size: Maximum spans per line.
+        :param flush_interval: Seconds after which buffered spans are written.
+        """
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spans = queue.SimpleQueue()
+        self.exported = 0
+        self.thread = threading.Thread(
+            target=self.run, name="span-exporter", daemon=True
+        )
+        self.thread.start()
+
+    def export(self, span: Span):
+        self.spans.put(span)
+
+    def run(self):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self.spans.get(
+                        timeout=max(deadline - time.monotonic(), 0.001)
+                    )
+                except queue.Empty:
+                    break
+                if span is None:
+                    self.write(batch)
+                    return
+                batch.append(span)
+            self.write(batch)
+
+    def write(self, batch: list[Span]):
+        if not batch:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "disrupt_arch.agents"},
+                            "spans": [span.to_otlp() for span in batch],
+                        }
+                    ],
+                }
+            ]
+        }
+        try:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(request, separators=(",", ":")) + "\n")
+            self.exported += len(batch)
+        except Exception as e:
+            logging.error(f"Unable to export {len(batch)} spans to {self.path}: {e}")
+
+    def close(self):
+        """Writes the buffered spans and stops the exporter."""
+        self.spans.put(None)
+        self.thread.join()
+
+
+class Tracer:
+    def __init__(self, exporter: JsonlSpanExporter | None = None):
+        """
+        Records spans of workflows. Without exporter nothing is recorded.
+        :param exporter: Receives the finished spans.
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: JsonlSpanExporter | None):
+        self.exporter = exporter
+
+    def start_span(
+        self,
+        name: str,
+        parent: Span | None = None,
+        trace_id: str | None = None,
+        parent_id: str | None = None,
+        start: int | None = None,
+        **attributes,
+    ) -> Span | None:
+        """
+        Starts a span under the parent, by default the current span, or in the
+        given trace. Returns None when tracing is off or there is no trace.
+        """
+        if self.exporter is None:
+            return None
+        if trace_id is None:
+            parent = parent or current_span.get()
+            if parent is None:
+                return None
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        return Span(name, trace_id, parent_id, start, attributes)
+
+    def end_span(self, span: Span | None, end: int | None = None):
+        if span is None or self.exporter is None:
+            return
+        span.end = end or time.time_ns()
+        self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, parent: Span | None = None, **attributes):
+        """Records the enclosed operation as the current span."""
+        span = self.start_span(name, parent, **attributes)
+        if span is None:
+            yield None
+            return
+
+        token = current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.status = STATUS_ERROR
+            span.status_message = str(e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end_span(span)
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        trace_id: str,
+        parent_id: str | None = None,
+        **attributes,
+    ) -> Span | None:
+        """Records an operation that already happened, e.g. a wait in a queue."""
+        span = self.start_span(
+            name,
+            trace_id=trace_id,
+            parent_id=parent_id,
+            start=int(start * 1e9),
+            **attributes,
+        )
+        self.end_span(span, int(end * 1e9))
+        return span
+
+
+# Tracer shared by the agents of a process.
+tracer = Tracer()
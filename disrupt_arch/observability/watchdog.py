@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from .metrics import Histogram
+
+UNKNOWN = "unknown"
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        threshold: float = 0.25,
+        interval: float = 0.05,
+        stack_depth: int = 15,
+        export_path: str | None = None,
+        export_interval: float = 10.0,
+    ):
+        """
+        Measures the lag of the event loop and attributes stalls to the code that
+        blocked it. A heartbeat task measures how late its timer fires. A monitor
+        thread notices a heartbeat that is overdue by the threshold and captures
+        the stack of the loop thread while it is still blocked. The stall is
+        attributed to the innermost agent method on that stack and to the frame
+        that was executing.
+        :param threshold: Seconds of lag counted as a stall.
+        :param interval: Seconds between heartbeats and checks of the monitor.
+        :param stack_depth: Frames of the stack kept per call site.
+        :param export_path: JSON file the call site statistics are written to.
+        :param export_interval: Seconds between exports.
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.stack_depth = stack_depth
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.lag = Histogram()
+        self.stalls = 0
+        self.sites: dict[tuple[str, str, str], dict] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.beat_at = time.monotonic()
+        self.captured_beat: float | None = None
+        self.capture: dict | None = None
+        self.loop_thread: int | None = None
+        self.heartbeat_task: asyncio.Task | None = None
+        self.monitor_thread: threading.Thread | None = None
+        self.exported_stalls = 0
+
+    async def start(self):
+        """Starts watching the running event loop."""
+        self.loop_thread = threading.get_ident()
+        self.beat_at = time.monotonic()
+        self.stopped.clear()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+        self.monitor_thread = threading.Thread(
+            target=self.monitor, name="loop-watchdog", daemon=True
+        )
+        self.monitor_thread.start()
+
+    async def stop(self):
+        self.stopped.set()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            await asyncio.gather(self.heartbeat_task, return_exceptions=True)
+        if self.monitor_thread is not None:
+            await asyncio.to_thread(self.monitor_thread.join)
+        if self.export_path:
+            self.export(self.export_path)
+
+    async def heartbeat(self):
+        while True:
+            self.beat_at = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - self.beat_at - self.interval, 0.0)
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                self.record_stall(lag)
+
+    def monitor(self):
+        """Runs in a thread and captures the stack of a blocked loop."""
+        exported_at = time.monotonic()
+        while not self.stopped.wait(self.interval):
+            beat_at = self.beat_at
+            overdue = time.monotonic() - beat_at - self.interval
+            if overdue >= self.threshold and self.captured_beat != beat_at:
+                capture = self.capture_stack()
+                with self.lock:
+                    self.captured_beat = beat_at
+                    self.capture = capture
+
+            if (
+                self.export_path
+                and time.monotonic() - exported_at >= self.export_interval
+            ):
+                exported_at = time.monotonic()
+                if self.exported_stalls != self.stalls:
+                    self.export(self.export_path)
+
+    def capture_stack(self) -> dict | None:
+        frame = sys._current_frames().get(self.loop_thread)
+        if frame is None:
+            return None
+        return attribute(frame, self.stack_depth)
+
+    def record_stall(self, lag: float):
+        """Attributes a stall the heartbeat measured to the captured stack."""
+        with self.lock:
+            capture, self.capture = self.capture, None
+        capture = capture or {
+            "agent": UNKNOWN,
+            "method": UNKNOWN,
+            "site": UNKNOWN,
+            "stack": [],
+        }
+        key = (capture["agent"], capture["method"], capture["site"])
+
+        with self.lock:
+            self.stalls += 1
+            site = self.sites.get(key)
+            if site is None:
+                site = self.sites[key] = {
+                    "agent": capture["agent"],
+                    "method": capture["method"],
+                    "site": capture["site"],
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "stack": capture["stack"],
+                }
+            site["count"] += 1
+            site["total_seconds"] += lag
+            site["max_seconds"] = max(site["max_seconds"], lag)
+
+        logging.warning(
+            f"Event loop blocked for {lag:.3f}s in {capture['agent']}."
+            f"{capture['method']} at {capture['site']}"
+        )
+
+    def stats(self) -> list[dict]:
+        """Returns the statistics per call site, the most blocking first."""
+        with self.lock:
+            sites = [dict(site) for site in self.sites.values()]
+        return sorted(sites, key=lambda site: site["total_seconds"], reverse=True)
+
+    def by_method(self) -> dict[tuple[str, str], tuple[int, float]]:
+        """Returns the stalls and blocked seconds per agent and method."""
+        totals = {}
+        for site in self.stats():
+            key = (site["agent"], site["method"])
+            count, seconds = totals.get(key, (0, 0.0))
+            totals[key] = (count + site["count"], seconds + site["total_seconds"])
+        return totals
+
+    def snapshot(self) -> dict:
+        return {
+            "stalls": self.stalls,
+            "threshold": self.threshold,
+            "lag": self.lag.snapshot(),
+            "sites": self.stats(),
+        }
+
+    def export(self, path: str):
+        """Writes the snapshot to a JSON file."""
+        try:
+            snapshot = self.snapshot()
+            with open(path, "w") as file:
+                json.dump(snapshot, file, indent=2)
+            self.exported_stalls = snapshot["stalls"]
+        except Exception as e:
+            logging.error(f"Unable to export event loop stalls to {path}: {e}")
+
+
+def attribute(frame, stack_depth: int) -> dict:
+    """
+    Finds the innermost agent method on a stack. Its agent and method name and
+    the executing frame identify the call site.
+    """
+    from agents.base.agent import Agent
+
+    agent, method = UNKNOWN, UNKNOWN
+    current = frame
+    while current is not None:
+        owner = current.f_locals.get("self")
+        if isinstance(owner, Agent):
+            agent, method = owner.name, current.f_code.co_name
+            break
+        current = current.f_back
+
+    stack = traceback.extract_stack(frame, limit=stack_depth)
+    executing = stack[-1] if stack else None
+    return {
+        "agent": agent,
+        "method": method,
+        "site": f"{executing.filename}:{executing.lineno} in {executing.name}"
+        if executing
+        else UNKNOWN,
+        "stack": [
+            f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack
+        ],
+    }
@@ -0,0 +1,10 @@
+from .factories import default_specs
+from .process import AgentSpec, ProcessQueue, ProcessRegistry, ProcessRuntime
+
+__all__ = [
+    "AgentSpec",
+    "ProcessQueue",
+    "ProcessRegistry",
+    "ProcessRuntime",
+    "default_specs",
+]
@@ -0,0 +1,67 @@
+from agents import (
+    AgentRegistry,
+    CommunicationAgent,
+    EscalationAgent,
+    InstallmentPlanAgent,
+    RiskAssessmentAgent,
+    TaskAgent,
+)
+from knowledge import RuleEngine, get_knowledge_base
+
+from .process import AgentSpec
+
+
+def task_agent(queue, agent_registry: AgentRegistry) -> TaskAgent:
+    knowledge_base = get_knowledge_base("business_rules")
+    return TaskAgent(
+        "TaskAgent",
+        queue,
+        knowledge_base,
+        agent_registry,
+        rule_engine=RuleEngine(knowledge_base),
+    )
+
+
+def installment_agent(queue, agent_registry: AgentRegistry) -> InstallmentPlanAgent:
+    return InstallmentPlanAgent(
+        "InstallmentPlanAgent",
+        queue,
+        get_knowledge_base("business_rules"),
+        agent_registry,
+    )
+
+
+def communication_agent(queue, agent_registry: AgentRegistry) -> CommunicationAgent:
+    return CommunicationAgent(
+        "CommunicationAgent",
+        queue,
+        get_knowledge_base("business_rules"),
+        agent_registry,
+    )
+
+
+def escalation_agent(queue, agent_registry: AgentRegistry) -> EscalationAgent:
+    return EscalationAgent("EscalationAgent", queue, agent_registry)
+
+
+def risk_assessment_agent(queue, agent_registry: AgentRegistry) -> RiskAssessmentAgent:
+    return RiskAssessmentAgent("RiskAssessmentAgent", queue, agent_registry)
+
+
+def default_specs(processes: dict[str, int] | None = None) -> list[AgentSpec]:
+    """
+    The agents of the debt collection workflow, each with the tasks it handles.
+    :param processes: Number of processes per agent name. Defaults to one each.
+    """
+    processes = processes or {}
+    specs = [
+        ("TaskAgent", task_agent, ["next_action"]),
+        ("InstallmentPlanAgent", installment_agent, ["installment_plan"]),
+        ("CommunicationAgent", communication_agent, ["contact_debtor"]),
+        ("EscalationAgent", escalation_agent, ["escalate", "escalate_case"]),
+        ("RiskAssessmentAgent", risk_assessment_agent, ["assess_risk"]),
+    ]
+    return [
+        AgentSpec(name, factory, tasks, processes.get(name, 1))
+        for name, factory, tasks in specs
+    ]
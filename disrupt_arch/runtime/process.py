@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import multiprocessing
+import queue as sync_queue
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from agents import AgentRegistry
+from agents.base.agent import Agent
+from config import settings
+from messages import decode_local_message, encode_local_message
+
+# Sent through an inbox to stop one process consuming it.
+STOP = None
+
+
+class ProcessQueue:
+    def __init__(self, queue: multiprocessing.Queue, name: str):
+        """
+        Asyncio style producer side of an inbox shared between processes, so it can
+        be registered with an AgentRegistry like any agent queue. Messages cross
+        the process boundary in their compact binary encoding.
+        :param queue: The multiprocessing queue.
+        :param name: The name of the agent consuming the queue.
+        """
+        self.queue = queue
+        self.name = name
+
+    async def put(self, item):
+        """Puts a message without blocking the event loop, waiting while it is full."""
+        data = encode_local_message(item)
+        try:
+            self.queue.put_nowait(data)
+        except sync_queue.Full:
+            await asyncio.to_thread(self.queue.put, data)
+
+    def put_nowait(self, item):
+        self.queue.put_nowait(encode_local_message(item))
+
+    def qsize(self) -> int:
+        try:
+            return self.queue.qsize()
+        except NotImplementedError:
+            return 0
+
+    def __repr__(self):
+        return f"<ProcessQueue {self.name}>"
+
+
+class ProcessRegistry(AgentRegistry):
+    """
+    Registry of an agent process. Routes are fixed by the runtime, so agents
+    registering their local queue are ignored.
+    """
+
+    def register(self, task, queue):
+        if isinstance(queue, ProcessQueue):
+            super().register(task, queue)
+
+
+class AgentSpec:
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[asyncio.Queue, AgentRegistry], Agent],
+        tasks: list[str],
+        processes: int = 1,
+        prefetch: int = 64,
+    ):
+        """
+        Describes an agent placed in its own processes.
+        :param name: The name of the agent.
+        :param factory: Module level function creating the agent in the process from
+            its local queue and registry.
+        :param tasks: The tasks handled by the agent.
+        :param processes: Number of processes sharing the inbox of the agent.
+        :param prefetch: Messages a process takes from the inbox ahead of its workers.
+        """
+        self.name = name
+        self.factory = factory
+        self.tasks = tasks
+        self.processes = processes
+        self.prefetch = prefetch
+
+
+def bridge(
+    inbox: multiprocessing.Queue,
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stopped: asyncio.Future,
+    batch_size: int,
+):
+    """
+    Moves messages from the inbox to the local queue of the agent in batches,
+    blocking while the local queue is full.
+    """
+
+    async def enqueue(items):
+        for item in items:
+            await queue.put(item)
+
+    while True:
+        items = [inbox.get()]
+        while len(items) < batch_size:
+            try:
+                items.append(inbox.get_nowait())
+            except sync_queue.Empty:
+                break
+
+        stop = STOP in items
+        if stop:
+            index = items.index(STOP)
+            for item in items[index + 1 :]:
+                inbox.put(item)
+            items = items[:index]
+
+        if items:
+            messages = [decode_local_message(item) for item in items]
+            asyncio.run_coroutine_threadsafe(enqueue(messages), loop).result()
+        if stop:
+            loop.call_soon_threadsafe(stopped.set_result, None)
+            return
+
+
+async def serve(spec: AgentSpec, inbox: multiprocessing.Queue, routes: dict):
+    """Runs an agent until the stop message arrives and its queue is drained."""
+    loop = asyncio.get_running_loop()
+    registry = ProcessRegistry()
+    for task, names in routes.items():
+        for name, queue in names:
+            registry.register(task, ProcessQueue(queue, name))
+
+    queue = asyncio.Queue(spec.prefetch)
+    agent = spec.factory(queue, registry)
+    stopped = loop.create_future()
+    threading.Thread(
+        target=bridge,
+        args=(inbox, queue, loop, stopped, spec.prefetch),
+        daemon=True,
+    ).start()
+
+    run = asyncio.create_task(agent.run())
+    await stopped
+    await queue.join()
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+
+
+def run_agent_process(
+    spec: AgentSpec, inbox: multiprocessing.Queue, routes: dict, log_level: int
+):
+    """Entry point of an agent process."""
+    logging.basicConfig(level=log_level)
+    asyncio.run(serve(spec, inbox, routes))
+
+
+class ProcessRuntime:
+    def __init__(
+        self,
+        specs: list[AgentSpec],
+        outputs: list[str] | tuple[str, ...] = (),
+        queue_capacity: int | None = None,
+        max_restarts: int = 5,
+        supervise_interval: float = 1.0,
+        start_method: str = "spawn",
+    ):
+        """
+        Runs agents in separate processes, connected by one inbox per agent. Agents
+        route messages with a registry that maps tasks to the inboxes, so agents
+        run unchanged. Messages taken by a process that crashes are lost.
+        :param specs: The agents and the number of processes for each.
+        :param outputs: Tasks routed back to the runtime, read with receive.
+        :param queue_capacity: Capacity of each inbox. Defaults to the settings.
+        :param max_restarts: Restarts of crashed processes per agent before giving up.
+        :param supervise_interval: Seconds between checks for crashed processes.
+        :param start_method: The multiprocessing start method.
+        """
+        self.context = multiprocessing.get_context(start_method)
+        self.specs = {spec.name: spec for spec in specs}
+        capacity = queue_capacity or settings.QUEUE_CAPACITY
+        self.inboxes = {spec.name: self.context.Queue(capacity) for spec in specs}
+        self.outputs = {task: self.context.Queue() for task in outputs}
+
+        self.routes: dict[str, list[tuple[str, multiprocessing.Queue]]] = {}
+        for spec in specs:
+            for task in spec.tasks:
+                self.routes.setdefault(task, []).append(
+                    (spec.name, self.inboxes[spec.name])
+                )
+        for task, queue in self.outputs.items():
+            self.routes.setdefault(task, []).append((task, queue))
+
+        self.max_restarts = max_restarts
+        self.supervise_interval = supervise_interval
+        self.processes: dict[tuple[str, int], multiprocessing.Process] = {}
+        self.restarts = Counter()
+        self.log_level = logging.getLogger().getEffectiveLevel()
+        self.stopping = False
+
+    def spawn(self, name: str, shard: int):
+        process = self.context.Process(
+            target=run_agent_process,
+            args=(self.specs[name], self.inboxes[name], self.routes, self.log_level),
+            name=f"{name}-{shard}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[(name, shard)] = process
+
+    def start(self):
+        """Starts the processes of all agents."""
+        for spec in self.specs.values():
+            for shard in range(spec.processes):
+                self.spawn(spec.name, shard)
+        logging.info(f"Started {len(self.processes)} agent processes.")
+
+    def supervise_once(self):
+        """Restarts crashed processes."""
+        for (name, shard), process in list(self.processes.items()):
+            if self.stopping or process.is_alive():
+                continue
+            if self.restarts[name] >= self.max_restarts:
+                logging.error(
+                    f"{process.name} exited with {process.exitcode}, "
+                    "restart limit reached."
+                )
+                del self.processes[(name, shard)]
+                continue
+
+            self.restarts[name] += 1
+            logging.warning(
+                f"{process.name} exited with {process.exitcode}, restarting."
+            )
+            self.spawn(name, shard)
+
+    async def supervise(self):
+        """Checks for crashed processes in the configured interval until cancelled."""
+        while not self.stopping:
+            await asyncio.sleep(self.supervise_interval)
+            self.supervise_once()
+
+    async def submit(self, task: str, entity):
+        """Publishes a message to the agents handling a task."""
+        for name, queue in self.routes.get(task, []):
+            await ProcessQueue(queue, name).put(entity)
+
+    async def receive(self, task: str, count: int = 1, timeout: float | None = None):
+        """Waits for messages routed to an output task."""
+        queue = self.outputs[task]
+
+        def get():
+            deadline = None if timeout is None else time.monotonic() + timeout
+            items = []
+            while len(items) < count:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                items.append(decode_local_message(queue.get(timeout=remaining)))
+            return items
+
+        return await asyncio.to_thread(get)
+
+    def stop(self, timeout: float = 5.0):
+        """Stops all processes after they drained their inbox."""
+        self.stopping = True
+        for (name, _), process in self.processes.items():
+            if process.is_alive():
+                self.inboxes[name].put(STOP)
+
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logging.warning(f"{process.name} did not stop, terminating.")
+                process.terminate()
+                process.join()
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "processes": sum(
+                    process.is_alive()
+                    for (spec_name, _), process in self.processes.items()
+                    if spec_name == name
+                ),
+                "restarts": self.restarts[name],
+                "inbox_depth": ProcessQueue(inbox, name).qsize(),
+            }
+            for name, inbox in self.inboxes.items()
+        }
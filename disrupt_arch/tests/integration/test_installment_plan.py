@@ -49,6 +49,7 @@ class TestInstallmentPlan(unittest.IsolatedAsyncioTestCase):
                 )
             ),
             agent_registry,
+            use_calculator=False,
         )
         installment_agent.reason_structured = AsyncMock(
             return_value={
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+
+class StubLLMServer:
+    def __init__(self, latency: float = 0.05, content: str = "Stub completion."):
+        """
+        Minimal OpenAI compatible chat completion server for benchmarks.
+        :param latency: Simulated completion time in seconds.
+        :param content: The message content returned for every completion.
+        """
+        self.latency = latency
+        self.content = content
+        self.server = None
+        self.requests = 0
+        self.connections = 0
+        self.writers = set()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves requests on a keep-alive connection until the client closes it."""
+        self.connections += 1
+        self.writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                content_length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    key, _, value = line.decode().partition(":")
+                    if key.lower() == "content-length":
+                        content_length = int(value)
+                request = json.loads(await reader.readexactly(content_length) or b"{}")
+
+                self.requests += 1
+                if request.get("stream"):
+                    await self.stream(writer)
+                    continue
+
+                await asyncio.sleep(self.latency)
+
+                body = json.dumps(self.completion()).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def stream(self, writer: asyncio.StreamWriter):
+        """Streams the content word by word as server-sent events."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        words = self.content.split(" ")
+        for index, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            delta = word if index == 0 else f" {word}"
+            self.write_event(writer, self.chunk({"content": delta}))
+            await writer.drain()
+
+        usage = self.completion()["usage"]
+        self.write_event(writer, {**self.chunk(None), "choices": [], "usage": usage})
+        self.write_event(writer, "[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def write_event(writer: asyncio.StreamWriter, data):
+        payload = data if isinstance(data, str) else json.dumps(data)
+        event = f"data: {payload}\n\n".encode()
+        writer.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+
+    def chunk(self, delta: dict | None) -> dict:
+        return {
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+            if delta is not None
+            else [],
+        }
+
+    def completion(self) -> dict:
+        return {
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": self.content},
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }
@@ -0,0 +1,49 @@
+import csv
+import logging
+import os
+import time
+
+import pytest
+from agents import InstallmentPlanCalculator
+from models import RiskLevel
+from samples import generate_samples
+
+
+@pytest.mark.parametrize("num_samples", [20000])
+def test_batch_calculation_throughput(num_samples):
+    """
+    Compares the throughput of calculating installment plans per profile and in
+    batches and stores the results.
+    """
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "installment_throughput.csv")
+
+    calculator = InstallmentPlanCalculator()
+    risk_levels = [level.value for level in RiskLevel]
+    profiles = generate_samples(num_samples)
+    for index, profile in enumerate(profiles):
+        profile.risk_level = risk_levels[index % len(risk_levels)]
+
+    start_time = time.perf_counter()
+    per_profile_plans = [calculator.calculate([profile])[0] for profile in profiles]
+    per_profile_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch_plans = calculator.calculate(profiles)
+    batch_time = time.perf_counter() - start_time
+
+    results = {
+        "per_profile": num_samples / per_profile_time,
+        "batch": num_samples / batch_time,
+    }
+    logging.info(f"Installment plans per second: {results}")
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Mode", "Num Samples", "Throughput"])
+        for mode, throughput in results.items():
+            writer.writerow([mode, num_samples, throughput])
+
+    assert per_profile_plans == batch_plans
+    assert results["batch"] > results["per_profile"]
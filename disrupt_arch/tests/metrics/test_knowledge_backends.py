@@ -0,0 +1,72 @@
+import csv
+import logging
+import os
+import statistics
+import time
+
+import pytest
+from config import chroma_client
+from knowledge import InMemoryBackend
+from samples import HashEmbeddingFunction
+
+
+@pytest.mark.parametrize("num_documents", [200])
+def test_query_latency_by_backend(num_documents):
+    """
+    Compares the query latency of the Chroma and the in-memory backend on the
+    same documents and embeddings and stores the results.
+    """
+    num_queries = 200
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "knowledge_backend_latency.csv")
+
+    embedding_function = HashEmbeddingFunction()
+    collection = chroma_client.get_or_create_collection(
+        "benchmark_rules", embedding_function=embedding_function
+    )
+    try:
+        collection.add(
+            documents=[
+                f"If overdue days > {i} and risk level is High, apply rule {i}."
+                for i in range(num_documents)
+            ],
+            ids=[str(i) for i in range(num_documents)],
+        )
+        backends = {
+            "chroma": collection,
+            "memory": InMemoryBackend.from_collection(collection, embedding_function),
+        }
+
+        queries = [
+            f"Risk level is HIGH and overdue days is {i}." for i in range(num_queries)
+        ]
+        results = {}
+        top_ids = {}
+        top_distances = {}
+        for name, backend in backends.items():
+            latencies = []
+            for query in queries:
+                start_time = time.perf_counter()
+                response = backend.query(query_texts=[query], n_results=3)
+                latencies.append(time.perf_counter() - start_time)
+            top_ids[name] = response["ids"][0][0]
+            top_distances[name] = response["distances"][0][0]
+            results[name] = {
+                "p50": statistics.median(latencies),
+                "p95": statistics.quantiles(latencies, n=20)[-1],
+            }
+    finally:
+        chroma_client.delete_collection("benchmark_rules")
+
+    logging.info(f"Query latency by backend: {results}")
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Backend", "Num Documents", "P50 Latency", "P95 Latency"])
+        for name, latency in results.items():
+            writer.writerow([name, num_documents, latency["p50"], latency["p95"]])
+
+    assert top_ids["memory"] == top_ids["chroma"]
+    assert top_distances["memory"] == pytest.approx(top_distances["chroma"], abs=1e-4)
+    assert results["memory"]["p50"] < results["chroma"]["p50"]
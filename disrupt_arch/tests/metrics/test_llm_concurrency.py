@@ -0,0 +1,86 @@
+import asyncio
+import csv
+import logging
+import os
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from agents import AgentRegistry, CommunicationAgent
+from agents.base import ReasoningBackend
+from openai import AsyncOpenAI
+from samples import generate_samples
+from stub_llm_server import StubLLMServer
+
+
+@pytest.mark.asyncio
+async def test_throughput_scales_with_workers():
+    """
+    Benchmarks CommunicationAgent completions against a local stub server and
+    stores throughput per worker count.
+    """
+    worker_counts = [1, 2, 5, 10]
+    num_samples = 40
+
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "llm_concurrency.csv")
+
+    server = StubLLMServer(latency=0.05)
+    await server.start()
+
+    results = []
+    try:
+        for num_workers in worker_counts:
+            results.append(await run_concurrency_test(server, num_workers, num_samples))
+    finally:
+        await server.stop()
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Num Workers", "Num Samples", "Execution Time", "Throughput"])
+        for result in results:
+            writer.writerow(result.values())
+
+    throughputs = {r["num_workers"]: r["throughput"] for r in results}
+    logging.info(f"Completion throughput by worker count: {throughputs}")
+
+    assert throughputs[10] > 4 * throughputs[1], "Workers did not reason concurrently."
+
+
+async def run_concurrency_test(server: StubLLMServer, num_workers, num_samples):
+    client = AsyncOpenAI(
+        api_key="stub",
+        base_url=server.base_url,
+        max_retries=0,
+        http_client=httpx.AsyncClient(limits=httpx.Limits(max_connections=num_workers)),
+    )
+    queue = asyncio.Queue()
+    agent = CommunicationAgent(
+        "CommunicationAgent",
+        queue,
+        MagicMock(),
+        AgentRegistry(),
+        ReasoningBackend(client=client, max_in_flight=num_workers),
+    )
+    agent.num_workers = num_workers
+
+    for profile in generate_samples(num_samples):
+        await queue.put(profile)
+
+    start_time = time.time()
+    agent_task = asyncio.create_task(agent.run())
+    await queue.join()
+    execution_time = time.time() - start_time
+
+    agent_task.cancel()
+    await asyncio.gather(agent_task, return_exceptions=True)
+    await client.close()
+
+    return {
+        "num_workers": num_workers,
+        "num_samples": num_samples,
+        "execution_time": execution_time,
+        "throughput": num_samples / execution_time,
+    }
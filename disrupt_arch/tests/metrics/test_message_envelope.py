@@ -0,0 +1,116 @@
+import csv
+import json
+import logging
+import os
+import pickle
+import time
+
+import pytest
+from messages import Envelope, decode_message, encode_message
+from models import DebtorProfile
+from samples import generate_samples
+
+
+def per_message(operation, messages, repeat: int = 5) -> float:
+    """Returns the best time per message in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for message in messages:
+            operation(message)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(messages) * 1e6
+
+
+def mutate_hop(profile: DebtorProfile):
+    profile.risk_level = "HIGH"
+    return profile
+
+
+@pytest.mark.parametrize("num_samples", [5000])
+def test_message_envelope(num_samples):
+    """
+    Compares encoding, decoding and per hop costs of pydantic profiles and
+    envelopes and stores the results. The envelope encoding is not the fastest:
+    pydantic's JSON round trip validates in Rust and beats the pure Python
+    codec. It is checked against the hops it replaced and for its size.
+    """
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "message_envelope.csv")
+
+    profiles = generate_samples(num_samples)
+    envelopes = [Envelope.ingress(profile) for profile in profiles]
+    as_json = [profile.model_dump_json() for profile in profiles]
+    as_pickle = [pickle.dumps(profile) for profile in profiles]
+    as_binary = [encode_message(envelope) for envelope in envelopes]
+
+    results = [
+        (
+            "encode",
+            "pydantic_json",
+            per_message(DebtorProfile.model_dump_json, profiles),
+        ),
+        (
+            "decode",
+            "pydantic_json",
+            per_message(DebtorProfile.model_validate_json, as_json),
+        ),
+        ("encode", "pickle", per_message(pickle.dumps, profiles)),
+        ("decode", "pickle", per_message(pickle.loads, as_pickle)),
+        ("encode", "envelope", per_message(encode_message, envelopes)),
+        ("decode", "envelope", per_message(decode_message, as_binary)),
+        ("in_process_hop", "mutable_profile", per_message(mutate_hop, profiles)),
+        (
+            "in_process_hop",
+            "envelope",
+            per_message(lambda e: e.update(risk_level="HIGH"), envelopes),
+        ),
+        (
+            "process_hop",
+            "pydantic_dict",
+            per_message(
+                lambda p: DebtorProfile.model_validate(
+                    json.loads(json.dumps(p.model_dump(mode="json")))
+                ),
+                profiles,
+            ),
+        ),
+        (
+            "process_hop",
+            "pydantic_json",
+            per_message(
+                lambda p: DebtorProfile.model_validate_json(p.model_dump_json()),
+                profiles,
+            ),
+        ),
+        (
+            "process_hop",
+            "pickle",
+            per_message(lambda p: pickle.loads(pickle.dumps(p)), profiles),
+        ),
+        (
+            "process_hop",
+            "envelope",
+            per_message(lambda e: decode_message(encode_message(e)), envelopes),
+        ),
+    ]
+    sizes = {
+        "pydantic_json": sum(map(len, as_json)) / num_samples,
+        "pickle": sum(map(len, as_pickle)) / num_samples,
+        "envelope": sum(map(len, as_binary)) / num_samples,
+    }
+    logging.info(f"Microseconds per message: {results}, bytes: {sizes}")
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Operation", "Format", "Microseconds", "Bytes"])
+        for operation, format, microseconds in results:
+            writer.writerow([operation, format, microseconds, sizes.get(format, "")])
+
+    # pydantic_dict is the previous broker hop and pickle the previous process hop.
+    # pydantic_json is faster, so only the size is compared against it.
+    hops = {(operation, format): us for operation, format, us in results}
+    assert hops[("process_hop", "envelope")] < hops[("process_hop", "pydantic_dict")]
+    assert hops[("process_hop", "envelope")] < hops[("process_hop", "pickle")]
+    assert sizes["envelope"] < sizes["pydantic_json"]
@@ -0,0 +1,60 @@
+import csv
+import logging
+import os
+
+import pytest
+from benchmark import Benchmark, LatencyDistribution
+
+
+@pytest.mark.asyncio
+async def test_offline_benchmark():
+    """
+    Runs open-loop load at increasing arrival rates against the agents with fake
+    reasoning and knowledge backends and stores the latency percentiles.
+    """
+    rates = [25, 50, 100]
+    num_requests = 200
+
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "offline_benchmark.csv")
+
+    reports = []
+    for rate in rates:
+        benchmark = Benchmark(
+            llm_latency=LatencyDistribution("lognormal", 0.05, 0.5, seed=0),
+            kb_latency=LatencyDistribution("constant", 0.005),
+        )
+        reports.append(await benchmark.run(num_requests, rate=rate, timeout=60))
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            [
+                "Rate",
+                "Completed",
+                "Throughput",
+                "P50",
+                "P95",
+                "P99",
+                "Max TaskAgent Depth",
+            ]
+        )
+        for rate, report in zip(rates, reports):
+            writer.writerow(
+                [
+                    rate,
+                    report["completed"],
+                    round(report["throughput"], 2),
+                    round(report["latency"]["p50"], 4),
+                    round(report["latency"]["p95"], 4),
+                    round(report["latency"]["p99"], 4),
+                    report["queue_depth"]["TaskAgent"]["max"],
+                ]
+            )
+
+    logging.info(f"Offline benchmark: {[r['latency'] for r in reports]}")
+
+    for report in reports:
+        assert report["completed"] == num_requests, "Workflows did not complete."
+    assert reports[-1]["throughput"] > reports[0]["throughput"]
@@ -0,0 +1,81 @@
+import asyncio
+import csv
+import hashlib
+import logging
+import os
+import time
+
+import pytest
+from agents.base import OperationalAgent
+from models import DebtorProfile
+from runtime import AgentSpec, ProcessRuntime
+from samples import generate_samples
+
+
+class HashingAgent(OperationalAgent):
+    """CPU bound agent standing in for client side embedding and validation."""
+
+    def __init__(self, queue, agent_registry):
+        super().__init__("HashingAgent", queue, num_workers=1)
+        self.agent_registry = agent_registry
+
+    async def process_message(self, entity: DebtorProfile):
+        await self.execute_task(entity)
+        await self.publish_message(
+            self.agent_registry.get_agents_for_task("done"), entity
+        )
+
+    async def execute_task(self, task: DebtorProfile):
+        hashlib.pbkdf2_hmac("sha256", task.model_dump_json().encode(), b"salt", 5000)
+
+
+def hashing_agent(queue, agent_registry):
+    return HashingAgent(queue, agent_registry)
+
+
+async def measure(num_processes: int, num_samples: int) -> float:
+    runtime = ProcessRuntime(
+        [AgentSpec("HashingAgent", hashing_agent, ["hash"], num_processes)],
+        outputs=["done"],
+    )
+    runtime.start()
+    try:
+        # Warm up until every process has imported its modules.
+        for profile in generate_samples(num_processes * 10):
+            await runtime.submit("hash", profile)
+        await runtime.receive("done", num_processes * 10, timeout=120)
+
+        start_time = time.perf_counter()
+        for profile in generate_samples(num_samples):
+            await runtime.submit("hash", profile)
+        await runtime.receive("done", num_samples, timeout=300)
+        return num_samples / (time.perf_counter() - start_time)
+    finally:
+        runtime.stop()
+
+
+@pytest.mark.parametrize("num_samples", [400])
+def test_process_scaling(num_samples):
+    """
+    Measures the throughput of a CPU bound agent by the number of processes
+    sharing its inbox and stores the results.
+    """
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "process_scaling.csv")
+
+    cores = os.cpu_count() or 1
+    results = {
+        processes: asyncio.run(measure(processes, num_samples))
+        for processes in (1, 2, 4)
+    }
+    logging.info(f"Messages per second by processes on {cores} cores: {results}")
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Processes", "Cores", "Num Samples", "Throughput"])
+        for processes, throughput in results.items():
+            writer.writerow([processes, cores, num_samples, throughput])
+
+    if cores >= 2:
+        assert results[2] > results[1] * 1.3
@@ -0,0 +1,126 @@
+import asyncio
+import csv
+import logging
+import os
+import time
+
+import pytest
+from agents import AgentRegistry
+from agents.base import OperationalAgent
+from models import DebtorProfile
+from samples import generate_samples
+
+
+class TimedAgent(OperationalAgent):
+    """Agent instance with one worker and a fixed processing delay."""
+
+    def __init__(self, name: str, queue: asyncio.Queue, delay: float):
+        super().__init__(name, queue, num_workers=1)
+        self.delay = delay
+        self.processed = 0
+
+    async def process_message(self, entity: DebtorProfile):
+        await self.execute_task(entity)
+        self.processed += 1
+
+    async def execute_task(self, task):
+        await asyncio.sleep(self.delay)
+
+
+async def run_routing_test(strategy: str, service_times: list[float], num_samples):
+    registry = AgentRegistry(strategies={"installment_plan": strategy})
+    agents = []
+    for index, service_time in enumerate(service_times):
+        queue = asyncio.Queue()
+        registry.register("installment_plan", queue)
+        agents.append(TimedAgent(f"Instance{index}", queue, service_time))
+    publisher = TimedAgent("Publisher", asyncio.Queue(), 0)
+    tasks = [asyncio.create_task(agent.run()) for agent in agents]
+
+    start_time = time.perf_counter()
+    for profile in generate_samples(num_samples):
+        await publisher.publish_message(
+            registry.get_agents_for_task("installment_plan"), profile
+        )
+        # Let the instances pick up work while messages arrive.
+        await asyncio.sleep(0)
+    await asyncio.gather(*(agent.queue.join() for agent in agents))
+    elapsed = time.perf_counter() - start_time
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "processed": sum(agent.processed for agent in agents),
+        "throughput": num_samples / elapsed,
+    }
+
+
+@pytest.mark.parametrize("num_samples", [200])
+def test_routing_strategies(num_samples):
+    """
+    Measures the throughput of unique messages by routing strategy and number of
+    agent instances per task and stores the results.
+    """
+    output_dir = "disrupt_arch/tests/metrics/results"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "routing_strategies.csv")
+
+    logging.getLogger().setLevel(logging.WARNING)
+    scenarios = {
+        "uniform": lambda instances: [0.005] * instances,
+        # One instance is four times slower than the others.
+        "skewed": lambda instances: [0.005] * (instances - 1) + [0.02],
+    }
+    results = {}
+    for scenario, service_times in scenarios.items():
+        for strategy in (
+            "broadcast",
+            "round_robin",
+            "least_queue_depth",
+            "power_of_two",
+        ):
+            for instances in (1, 2, 4):
+                if scenario == "skewed" and instances == 1:
+                    continue
+                results[(scenario, strategy, instances)] = asyncio.run(
+                    run_routing_test(strategy, service_times(instances), num_samples)
+                )
+    logging.getLogger().setLevel(logging.INFO)
+    logging.info(f"Routing results: {results}")
+
+    with open(csv_file, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            [
+                "Scenario",
+                "Strategy",
+                "Instances",
+                "Num Samples",
+                "Processed",
+                "Throughput",
+            ]
+        )
+        for (scenario, strategy, instances), result in results.items():
+            writer.writerow(
+                [
+                    scenario,
+                    strategy,
+                    instances,
+                    num_samples,
+                    result["processed"],
+                    result["throughput"],
+                ]
+            )
+
+    assert results[("uniform", "broadcast", 4)]["processed"] == 4 * num_samples
+    for strategy in ("round_robin", "least_queue_depth", "power_of_two"):
+        assert results[("uniform", strategy, 4)]["processed"] == num_samples
+        assert (
+            results[("uniform", strategy, 4)]["throughput"]
+            > results[("uniform", strategy, 1)]["throughput"] * 2.5
+        )
+    assert (
+        results[("skewed", "least_queue_depth", 4)]["throughput"]
+        > results[("skewed", "round_robin", 4)]["throughput"]
+    )
@@ -9,13 +9,16 @@ import pytest
 from agents import (
     AgentRegistry,
     CommunicationAgent,
+    EscalationAgent,
     InstallmentPlanAgent,
     RiskAssessmentAgent,
     TaskAgent,
+    WorkflowTracker,
 )
 from chromadb.utils import embedding_functions
 from config import chroma_client
 from knowledge import KnowledgeBase
+from messages import Envelope
 from models import InstallmentPlan
 from samples import generate_samples
 
@@ -63,6 +66,7 @@ async def run_performance_test(num_samples, csv_file):
     risk_queue = asyncio.Queue()
     installment_plan_queue = asyncio.Queue()
     communication_queue = asyncio.Queue()
+    escalation_queue = asyncio.Queue()
 
     task_agent = TaskAgent(
         "TaskAgent",
@@ -113,35 +117,39 @@ async def run_performance_test(num_samples, csv_file):
         return_value="This is a mocked debtor contact message."
     )
 
+    escalation_agent = EscalationAgent(
+        "EscalationAgent", escalation_queue, agent_registry
+    )
+    agent_registry.register("escalate", escalation_queue)
+
+    workflows = WorkflowTracker()
+    communication_agent.workflows = workflows
+    escalation_agent.workflows = workflows
+
     sample_profiles = generate_samples(num_samples=num_samples)
 
     start_time = time.time()
     task_count = 0
-    decision_timestamps = {}
-    execution_timestamps = {}
+    completions = {}
 
     agent_tasks = [
         asyncio.create_task(task_agent.run()),
         asyncio.create_task(risk_assessment_agent.run()),
         asyncio.create_task(installment_agent.run()),
         asyncio.create_task(communication_agent.run()),
+        asyncio.create_task(escalation_agent.run()),
     ]
 
     for profile in sample_profiles:
-        await task_queue.put(profile)
-        task_count += 1
-        decision_timestamps[profile.name] = time.time()
-
-    for profile in sample_profiles:
-        await task_queue.put(profile)
+        envelope = Envelope.ingress(profile)
+        completions[envelope.workflow_id] = workflows.track(envelope.workflow_id)
+        await task_queue.put(envelope)
         task_count += 1
-        decision_timestamps[profile.name] = time.time()
 
-    await asyncio.sleep(5)
-
-    for profile in sample_profiles:
-        if profile.name in decision_timestamps:
-            execution_timestamps[profile.name] = time.time()
+    _, pending = await asyncio.wait(completions.values(), timeout=60)
+    for workflow_id, completion in completions.items():
+        if completion in pending:
+            workflows.forget(workflow_id)
 
     messages_sent = (
         communication_queue.qsize()
@@ -150,15 +158,9 @@ async def run_performance_test(num_samples, csv_file):
     )
 
     latencies = [
-        execution_timestamps[name] - decision_timestamps[name]
-        for name in decision_timestamps
-        if name in execution_timestamps
-    ]
-
-    latencies = [
-        execution_timestamps[name] - decision_timestamps[name]
-        for name in execution_timestamps
-        if name in decision_timestamps
+        completion.result().latency
+        for completion in completions.values()
+        if completion.done() and not completion.cancelled()
     ]
 
     avg_latency = sum(latencies) / len(latencies) if latencies else 0
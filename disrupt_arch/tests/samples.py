@@ -1,5 +1,8 @@
+import hashlib
 import random
 
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from models import CommunicationState, DebtorProfile
 
 
@@ -36,3 +39,46 @@ def generate_samples(num_samples=10) -> list[DebtorProfile]:
         samples.append(sample_profile)
 
     return samples
+
+
+def make_profile(name: str = "Jane Doe", **fields) -> DebtorProfile:
+    """
+    Create a valid sample profile for tests.
+
+    :param name: Name of the debtor
+    :param fields: Fields overriding the defaults
+    :return: A DebtorProfile instance
+    """
+    return DebtorProfile(
+        **{
+            "communication_state": "NO_RESPONSE",
+            "name": name,
+            "income": 50000.0,
+            "installment_plan": None,
+            "outstanding_balance": 2000.0,
+            "overdue_days": 130,
+            "risk_level": None,
+            **fields,
+        }
+    )
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Deterministic bag-of-words embeddings that need no model download. Like
+    those of the default embedding function, the embeddings are normalized.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for document in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for word in document.lower().split():
+                digest = hashlib.md5(word.encode()).digest()
+                vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1
+            norm = np.linalg.norm(vector)
+            embeddings.append(vector / norm if norm else vector)
+        return embeddings
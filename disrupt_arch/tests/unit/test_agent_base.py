@@ -57,3 +57,17 @@ class TestAgentBase(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(await target_queue.get(), profile)
         self.assertEqual(target_queue.qsize(), 0)
+
+    async def test_next_batch_collects_until_window_elapses(self):
+        test_queue = asyncio.Queue()
+        agent = TestAgent("TestAgent", test_queue)
+        agent.batch_size = 5
+        agent.batch_window = 0.05
+
+        for _ in range(3):
+            await test_queue.put("message")
+
+        batch = await agent.next_batch()
+
+        self.assertEqual(len(batch), 3)
+        self.assertTrue(test_queue.empty())
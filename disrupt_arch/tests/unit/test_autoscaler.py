@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from agents import WorkerAutoscaler
+from agents.base.agent import Agent
+from models import DebtorProfile
+from samples import make_profile
+
+
+class SlowAgent(Agent):
+    def __init__(self, name: str, queue: asyncio.Queue):
+        super().__init__(name, queue, num_workers=1)
+        self.reasoning_backend = MagicMock(rate_limited=0)
+
+    async def process_message(self, message: DebtorProfile):
+        await asyncio.sleep(0.05)
+
+
+class BatchAgent(Agent):
+    def __init__(self, name: str, queue: asyncio.Queue):
+        super().__init__(name, queue, num_workers=1, batch_size=4, batch_window=0.1)
+        self.processed = []
+
+    async def process_message(self, message: DebtorProfile):
+        self.processed.append(message.name)
+
+
+class TestWorkerRemoval(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_filling_a_batch_is_not_cancelled(self):
+        queue = asyncio.Queue()
+        agent = BatchAgent("BatchAgent", queue)
+        task = asyncio.create_task(agent.run())
+        await asyncio.sleep(0)
+
+        await queue.put(make_profile("a"))
+        await asyncio.sleep(0.01)
+        agent.remove_worker()
+        await asyncio.wait_for(queue.join(), 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(agent.processed, ["a"])
+        self.assertEqual(agent.active_workers, 0)
+
+
+class TestWorkerAutoscaler(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.queue = asyncio.Queue()
+        self.agent = SlowAgent("SlowAgent", self.queue)
+        self.task = asyncio.create_task(self.agent.run())
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+    async def test_scales_up_with_queue_depth(self):
+        autoscaler = WorkerAutoscaler(self.agent, max_workers=8, target_latency=0.1)
+        for i in range(40):
+            await self.queue.put(make_profile(str(i)))
+        await asyncio.sleep(0.06)
+
+        autoscaler.scale()
+
+        self.assertEqual(self.agent.active_workers, 8)
+        self.assertEqual(autoscaler.stats()["scale_ups"], 1)
+        self.assertEqual(
+            autoscaler.stats()["last_decision"]["reason"][:11], "queue depth"
+        )
+        await asyncio.wait_for(self.queue.join(), 2)
+
+    async def test_scales_down_when_idle(self):
+        autoscaler = WorkerAutoscaler(self.agent, idle_ticks=2)
+        self.agent.add_worker()
+        self.agent.add_worker()
+        await asyncio.sleep(0)
+
+        autoscaler.scale()
+        self.assertEqual(self.agent.active_workers, 3)
+        autoscaler.scale()
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.agent.active_workers, 2)
+        self.assertEqual(len(self.agent.tasks), 2)
+
+    async def test_backs_off_when_downstream_rate_limits(self):
+        autoscaler = WorkerAutoscaler(self.agent, min_workers=1)
+        for _ in range(3):
+            self.agent.add_worker()
+        self.agent.reasoning_backend.rate_limited = 1
+        for i in range(40):
+            await self.queue.put(make_profile(str(i)))
+
+        autoscaler.scale()
+
+        self.assertEqual(self.agent.active_workers, 2)
+        self.assertEqual(autoscaler.decisions[-1]["reason"], "downstream saturated")
@@ -0,0 +1,58 @@
+import unittest
+
+from benchmark import Benchmark, LatencyDistribution, percentiles
+
+
+class TestLatencyDistribution(unittest.TestCase):
+    def test_same_seed_draws_same_latencies(self):
+        first = LatencyDistribution.parse("lognormal:0.05:0.5", seed=3)
+        second = LatencyDistribution.parse("lognormal:0.05:0.5", seed=3)
+
+        self.assertEqual(
+            [first.sample() for _ in range(5)], [second.sample() for _ in range(5)]
+        )
+
+    def test_parses_constant_and_rejects_unknown(self):
+        self.assertEqual(LatencyDistribution.parse("0.2").sample(), 0.2)
+        self.assertTrue(0.1 <= LatencyDistribution.parse("uniform:0.1:0.2").sample())
+        with self.assertRaises(ValueError):
+            LatencyDistribution.parse("pareto:1")
+
+    def test_percentiles(self):
+        summary = percentiles([float(i) for i in range(1, 101)])
+
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50"], 50.5)
+        self.assertLessEqual(summary["p95"], summary["p99"])
+        self.assertEqual(percentiles([]), {"count": 0})
+
+
+class TestBenchmark(unittest.IsolatedAsyncioTestCase):
+    def benchmark(self) -> Benchmark:
+        return Benchmark(
+            llm_latency=LatencyDistribution("constant", 0.001),
+            kb_latency=LatencyDistribution("constant", 0.0),
+        )
+
+    async def test_closed_loop_completes_every_workflow(self):
+        report = await self.benchmark().run(30, concurrency=5, timeout=10)
+
+        self.assertEqual(report["completed"], 30)
+        self.assertEqual(report["timed_out"], 0)
+        self.assertEqual(sum(report["terminals"].values()), 30)
+        self.assertIn("RiskAssessmentAgent", report["hops"])
+        self.assertEqual(report["hops"]["TaskAgent"]["service"]["count"], 60)
+        self.assertGreater(report["llm_calls"], 30)
+
+    async def test_open_loop_submits_at_rate(self):
+        report = await self.benchmark().run(20, rate=200, timeout=10)
+
+        self.assertEqual(report["load"]["mode"], "open")
+        self.assertEqual(report["completed"], 20)
+        self.assertGreaterEqual(report["duration"], 19 / 200)
+        self.assertLessEqual(report["latency"]["p50"], report["latency"]["p99"])
+        self.assertIn("TaskAgent", report["queue_depth"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from agents import AdmissionController, BoundedQueue, QueueRejectedError
+from agents.base.agent import Agent
+from models import DebtorProfile
+from samples import make_profile
+
+
+class TestAgent(Agent):
+    async def process_message(self, message: DebtorProfile):
+        pass
+
+
+class TestBoundedQueue(unittest.IsolatedAsyncioTestCase):
+    async def test_block_waits_for_space(self):
+        queue = BoundedQueue(maxsize=1)
+        await queue.put(make_profile("A"))
+
+        put = asyncio.create_task(queue.put(make_profile("B")))
+        await asyncio.sleep(0.01)
+        self.assertFalse(put.done())
+
+        self.assertEqual((await queue.get()).name, "A")
+        await put
+        self.assertEqual((await queue.get()).name, "B")
+        self.assertEqual(queue.stats()["high_water_mark"], 1)
+
+    async def test_drop_oldest(self):
+        queue = BoundedQueue(maxsize=2, policy="drop_oldest")
+        for name in "ABC":
+            await queue.put(make_profile(name))
+
+        self.assertEqual([queue.get_nowait().name for _ in range(2)], ["B", "C"])
+        self.assertEqual(queue.dropped, 1)
+
+    async def test_reject_raises_from_publish(self):
+        queue = BoundedQueue(maxsize=1, policy="reject")
+        agent = TestAgent("TestAgent", asyncio.Queue())
+        await agent.publish_message([queue], make_profile("A"))
+
+        with self.assertRaises(QueueRejectedError):
+            await agent.publish_message([queue], make_profile("B"))
+        self.assertEqual(queue.stats()["rejected"], 1)
+
+    async def test_spill_keeps_order_and_unfinished_count(self):
+        queue = BoundedQueue(maxsize=2, policy="spill")
+        for name in "ABCDE":
+            await queue.put(make_profile(name))
+
+        self.assertEqual(queue.qsize(), 2)
+        self.assertEqual(queue.stats()["spilled_depth"], 3)
+
+        names = []
+        for _ in range(5):
+            names.append((await queue.get()).name)
+            queue.task_done()
+
+        self.assertEqual(names, list("ABCDE"))
+        self.assertEqual(queue.stats()["spilled_depth"], 0)
+        await asyncio.wait_for(queue.join(), 1)
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    async def test_rejects_when_queue_is_full(self):
+        queue = BoundedQueue(maxsize=2)
+        admission = AdmissionController(queue, timeout=0.01)
+
+        results = [await admission.submit(make_profile(name)) for name in "ABC"]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(admission.stats(), {"admitted": 2, "rejected": 1})
+
+    async def test_rate_below_one_per_second_admits(self):
+        admission = AdmissionController(asyncio.Queue(), rate=0.5)
+
+        results = [await admission.submit(make_profile(name)) for name in "AB"]
+
+        self.assertEqual(results, [True, False])
+        with self.assertRaises(ValueError):
+            AdmissionController(asyncio.Queue(), rate=0.5, burst=0)
+
+    async def test_rate_limit(self):
+        admission = AdmissionController(asyncio.Queue(), rate=2, burst=2)
+
+        results = [await admission.submit(make_profile(name)) for name in "ABC"]
+
+        self.assertEqual(results, [True, True, False])
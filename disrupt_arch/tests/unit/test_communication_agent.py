@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from agents import AgentRegistry, BufferSink, CommunicationAgent, WorkflowTracker
+from messages import Envelope
+from samples import make_profile
+
+
+def make_chunk(content=None, usage=None):
+    choices = (
+        []
+        if content is None
+        else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    )
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class TestCommunicationAgent(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_message_to_sink(self):
+        async def stream(messages):
+            for content in ["Dear ", "John, ", "please pay."]:
+                await asyncio.sleep(0.01)
+                yield make_chunk(content)
+            yield make_chunk(usage=SimpleNamespace(completion_tokens=6))
+
+        reasoning_backend = MagicMock()
+        reasoning_backend.stream = stream
+        sink = BufferSink()
+        agent = CommunicationAgent(
+            "CommunicationAgent",
+            asyncio.Queue(),
+            MagicMock(),
+            AgentRegistry(),
+            reasoning_backend,
+            stream=True,
+            sink=sink,
+        )
+        profile = make_profile(
+            "John Doe", income=3000.0, overdue_days=20, risk_level="LOW"
+        )
+
+        await agent.process_message(profile)
+
+        self.assertEqual(sink.chunks["John Doe"], ["Dear ", "John, ", "please pay."])
+        self.assertEqual(sink.messages["John Doe"], "Dear John, please pay.")
+        metrics = agent.stream_metrics[-1]
+        self.assertEqual(metrics["tokens"], 6)
+        self.assertGreater(metrics["duration"], metrics["time_to_first_token"])
+        self.assertGreater(metrics["tokens_per_second"], 0)
+
+    async def test_failed_reasoning_fails_the_workflow(self):
+        reasoning_backend = MagicMock(model="fake")
+        reasoning_backend.create = AsyncMock(side_effect=TimeoutError("timed out"))
+        queue = asyncio.Queue()
+        agent = CommunicationAgent(
+            "CommunicationAgent", queue, MagicMock(), AgentRegistry(), reasoning_backend
+        )
+        agent.workflows = WorkflowTracker()
+        envelope = Envelope.ingress(make_profile())
+        completion = agent.workflows.track(envelope.workflow_id)
+
+        await queue.put(envelope)
+        task = asyncio.create_task(agent.run())
+        result = await asyncio.wait_for(completion, 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertIsInstance(result.error, RuntimeError)
+        self.assertEqual(agent.workflows.stats()["failed"], 1)
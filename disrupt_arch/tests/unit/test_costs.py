@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from agents import BudgetController, CommunicationAgent, InstallmentPlanAgent
+from agents.base import ReasoningBackend
+from benchmark import FakeKnowledgeBase, FakeOpenAIClient, LatencyDistribution
+from messages import Envelope
+from observability import CostLedger
+from samples import make_profile
+
+
+def usage(prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+    )
+
+
+class FakeRegistry:
+    def register(self, task, queue):
+        pass
+
+    def get_agents_for_task(self, task):
+        return [asyncio.Queue()]
+
+
+class TestCostLedger(unittest.IsolatedAsyncioTestCase):
+    async def test_accounts_per_agent_model_and_workflow(self):
+        ledger = CostLedger({"model": (1.0, 2.0)})
+
+        cost = ledger.record(
+            "TaskAgent", "model", usage(1_000_000, 500_000), ["a", "b"]
+        )
+        ledger.record("CommunicationAgent", "model", usage(0, 1_000_000), ["a"])
+        ledger.record("TaskAgent", "model", None, ["a"])
+
+        self.assertAlmostEqual(cost, 2.0)
+        self.assertEqual(ledger.agents["TaskAgent"].calls, 1)
+        self.assertAlmostEqual(ledger.models["model"].cost, 4.0)
+        self.assertAlmostEqual(ledger.workflows["a"].cost, 3.0)
+        self.assertAlmostEqual(ledger.workflows["b"].prompt_tokens, 500_000)
+        self.assertAlmostEqual(ledger.snapshot()["cost"], 4.0)
+
+    async def test_unpriced_models_cost_nothing(self):
+        ledger = CostLedger({})
+
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(ledger.record("TaskAgent", "other", usage(10, 10)), 0.0)
+        self.assertEqual(ledger.models["other"].prompt_tokens, 10)
+
+    async def test_flush_appends_and_forgets_workflows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "costs.jsonl")
+            ledger = CostLedger({"model": (1.0, 1.0)}, export_path=path)
+            ledger.record("TaskAgent", "model", usage(10, 10), ["a"])
+
+            await ledger.flush()
+            await ledger.flush()
+            # Completions made outside of workflows still count to the totals.
+            ledger.record("TaskAgent", "model", usage(10, 10))
+            await ledger.flush()
+            with open(path) as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["workflows"]["a"]["prompt_tokens"], 10)
+        self.assertEqual(records[0]["agents"]["TaskAgent"]["calls"], 1)
+        self.assertEqual(records[1]["workflows"], {})
+        self.assertEqual(records[1]["agents"]["TaskAgent"]["calls"], 2)
+        self.assertEqual(ledger.workflows, {})
+        self.assertEqual(ledger.agents["TaskAgent"].calls, 2)
+
+    async def test_cognitive_agent_accounts_completions(self):
+        queue = asyncio.Queue()
+        ledger = CostLedger({"fake": (1.0, 1.0)})
+        agent = CommunicationAgent(
+            "CommunicationAgent",
+            queue,
+            FakeKnowledgeBase(LatencyDistribution("constant", 0.0)),
+            FakeRegistry(),
+            reasoning_backend=ReasoningBackend(
+                FakeOpenAIClient(LatencyDistribution("constant", 0.0)), "fake"
+            ),
+        )
+        agent.costs = ledger
+        task = asyncio.create_task(agent.run())
+
+        envelope = Envelope.ingress(make_profile())
+        await queue.put(envelope)
+        await asyncio.wait_for(queue.join(), 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(list(ledger.workflows), [envelope.workflow_id])
+        self.assertEqual(ledger.agents["CommunicationAgent"].calls, 1)
+        self.assertGreater(agent.snapshot()["cost"], 0)
+
+    async def test_batch_completions_charge_only_their_workflows(self):
+        queue = asyncio.Queue()
+        ledger = CostLedger({"fake": (1.0, 1.0)})
+        agent = InstallmentPlanAgent(
+            "InstallmentPlanAgent",
+            queue,
+            FakeKnowledgeBase(LatencyDistribution("constant", 0.0)),
+            FakeRegistry(),
+            reasoning_backend=ReasoningBackend(
+                FakeOpenAIClient(LatencyDistribution("constant", 0.0)), "fake"
+            ),
+            batch_size=2,
+        )
+        agent.costs = ledger
+        calculated = Envelope.ingress(make_profile("Calculated", risk_level="HIGH"))
+        reasoned = Envelope.ingress(make_profile("Reasoned"))
+        await queue.put(calculated)
+        await queue.put(reasoned)
+        task = asyncio.create_task(agent.run())
+
+        await asyncio.wait_for(queue.join(), 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(list(ledger.workflows), [reasoned.workflow_id])
+        self.assertAlmostEqual(
+            ledger.workflows[reasoned.workflow_id].cost,
+            ledger.agents["InstallmentPlanAgent"].cost,
+        )
+
+
+class TestBudgetController(unittest.IsolatedAsyncioTestCase):
+    async def test_delays_grow_towards_the_ceiling(self):
+        budget = BudgetController(tokens_per_minute=1000, max_delay=1.0)
+
+        budget.observe(500, 0.0)
+        self.assertEqual(budget.delay(), 0.0)
+        budget.observe(400, 0.0)
+        self.assertAlmostEqual(budget.delay(), 0.5)
+
+    async def test_pauses_until_tokens_leave_the_window(self):
+        budget = BudgetController(tokens_per_minute=100, window=0.05)
+        budget.observe(100, 0.0)
+
+        await asyncio.wait_for(budget.admit(), 1)
+
+        self.assertEqual(budget.paused, 1)
+        self.assertGreaterEqual(budget.delayed_seconds, 0.03)
+        self.assertEqual(budget.pressure(), 0.0)
+
+    async def test_spent_daily_budget_pauses_until_midnight(self):
+        budget = BudgetController(daily_spend=1.0)
+
+        budget.observe(10, 1.5)
+
+        self.assertGreaterEqual(budget.pressure(), 1.0)
+        self.assertGreater(budget.delay(), 0.0)
+        self.assertLessEqual(budget.delay(), 24 * 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
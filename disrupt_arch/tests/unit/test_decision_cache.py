@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+from agents import DecisionCache
+from models import NextBestAction
+from samples import make_profile
+
+ESCALATE = NextBestAction(action="escalate_case", target="LegalAgent")
+
+
+class TestDecisionCache(unittest.TestCase):
+    def test_profiles_in_same_bucket_share_decision(self):
+        cache = DecisionCache()
+        cache.put(make_profile(overdue_days=130, name="A"), ESCALATE)
+
+        self.assertEqual(cache.get(make_profile(overdue_days=170, name="B")), ESCALATE)
+        self.assertIsNone(cache.get(make_profile(overdue_days=120)))
+        self.assertIsNone(cache.get(make_profile(risk_level="LOW")))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = DecisionCache(max_size=2)
+        cache.put(make_profile(risk_level="HIGH"), ESCALATE)
+        cache.put(make_profile(risk_level="MEDIUM"), ESCALATE)
+        cache.get(make_profile(risk_level="HIGH"))
+        cache.put(make_profile(risk_level="LOW"), ESCALATE)
+
+        self.assertIsNone(cache.get(make_profile(risk_level="MEDIUM")))
+        self.assertEqual(cache.get(make_profile(risk_level="HIGH")), ESCALATE)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expires_after_ttl(self):
+        cache = DecisionCache(ttl=10)
+        with patch("agents.cache.time.monotonic", return_value=100.0):
+            cache.put(make_profile(), ESCALATE)
+        with patch("agents.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(make_profile()))
+
+    def test_invalidates_on_knowledge_version_change(self):
+        cache = DecisionCache()
+        cache.put(make_profile(), ESCALATE, knowledge_version=1)
+
+        self.assertEqual(cache.get(make_profile(), knowledge_version=1), ESCALATE)
+        self.assertIsNone(cache.get(make_profile(), knowledge_version=2))
+        self.assertEqual(cache.stats()["invalidations"], 1)
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from agents import DurableQueue
+from agents.base.agent import Agent
+from messages import Envelope
+from models import DebtorProfile
+from samples import make_profile
+
+
+class ForwardingAgent(Agent):
+    def __init__(self, name: str, queue: asyncio.Queue, target: asyncio.Queue):
+        super().__init__(name, queue, num_workers=1)
+        self.target = target
+
+    async def process_message(self, message: DebtorProfile):
+        await self.publisher.publish([self.target], message)
+
+
+class TestDurableQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_resumes_unacknowledged_messages_after_restart(self):
+        queue = DurableQueue(self.path, commit_delay=0)
+        for name in ["a", "b", "c"]:
+            await queue.put(Envelope.create(make_profile(name)))
+
+        first = await queue.get()
+        queue.ack([first])
+        await queue.get()
+        await queue.commit()
+        queue.close()
+
+        reopened = DurableQueue(self.path, commit_delay=0)
+        self.assertEqual(reopened.qsize(), 2)
+        resumed = [await reopened.get() for _ in range(2)]
+        self.assertEqual([e.profile.name for e in resumed], ["b", "c"])
+        reopened.close()
+
+    async def test_groups_concurrent_puts_into_one_commit(self):
+        queue = DurableQueue(self.path, commit_delay=0.01)
+        await asyncio.gather(*(queue.put(make_profile(str(i))) for i in range(20)))
+
+        self.assertEqual(queue.qsize(), 20)
+        self.assertEqual(queue.stats()["commits"], 1)
+        queue.close()
+
+    async def test_deletes_acknowledged_segments(self):
+        queue = DurableQueue(self.path, segment_size=1, commit_delay=0)
+        for name in ["a", "b", "c"]:
+            await queue.put(make_profile(name))
+        self.assertEqual(queue.stats()["segments"], 3)
+
+        queue.ack([await queue.get(), await queue.get()])
+        self.assertEqual(queue.stats()["segments"], 1)
+        queue.close()
+
+        reopened = DurableQueue(self.path, commit_delay=0)
+        self.assertEqual([(await reopened.get()).name], ["c"])
+        reopened.close()
+
+    async def test_compacts_ack_log_in_background(self):
+        queue = DurableQueue(self.path, segment_size=1, commit_delay=0)
+        for name in ["a", "b", "c", "d"]:
+            await queue.put(make_profile(name))
+        received = [await queue.get() for _ in range(4)]
+
+        # The second ack arrives while the first rewrite is still running.
+        queue.ack(received[:1])
+        queue.ack(received[1:3])
+        await queue.compacting
+        await queue.commit()
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "acks")), 0)
+        queue.close()
+
+        reopened = DurableQueue(self.path, commit_delay=0)
+        self.assertEqual([(await reopened.get()).name], ["d"])
+        reopened.close()
+
+    async def test_continues_after_empty_newest_segment(self):
+        # A crash right after starting a new segment leaves it empty.
+        open(os.path.join(self.path, f"{5:020d}.log"), "wb").close()
+
+        queue = DurableQueue(self.path, commit_delay=0)
+        await queue.put(make_profile("a"))
+        self.assertEqual(queue.next_offset, 6)
+        queue.close()
+
+    async def test_cuts_off_torn_record(self):
+        queue = DurableQueue(self.path, commit_delay=0)
+        await queue.put(make_profile("a"))
+        await queue.put(make_profile("b"))
+        segment = queue.active.path
+        queue.close()
+
+        with open(segment, "r+b") as file:
+            file.truncate(os.path.getsize(segment) - 3)
+
+        reopened = DurableQueue(self.path, commit_delay=0)
+        self.assertEqual(reopened.qsize(), 1)
+        self.assertEqual((await reopened.get()).name, "a")
+        await reopened.put(make_profile("c"))
+        self.assertEqual((await reopened.get()).name, "c")
+        reopened.close()
+
+    async def test_agent_acknowledges_after_publishing(self):
+        inbox = DurableQueue(os.path.join(self.path, "inbox"), commit_delay=0)
+        outbox = DurableQueue(os.path.join(self.path, "outbox"), commit_delay=0)
+        agent = ForwardingAgent("ForwardingAgent", inbox, outbox)
+        task = asyncio.create_task(agent.run())
+
+        await inbox.put(Envelope.create(make_profile("a")))
+        await asyncio.wait_for(inbox.join(), 1.0)
+        await agent.publisher.drain(1.0)
+        await inbox.commit()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        inbox.close()
+        outbox.close()
+
+        resumed = DurableQueue(os.path.join(self.path, "inbox"))
+        forwarded = DurableQueue(os.path.join(self.path, "outbox"))
+        self.assertEqual(resumed.qsize(), 0)
+        self.assertEqual((await forwarded.get()).hops, ("ForwardingAgent",))
+        resumed.close()
+        forwarded.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import pickle
+import struct
+import unittest
+
+from agents import AdmissionController, AgentRegistry, BoundedQueue, RiskAssessmentAgent
+from messages import (
+    TRACED_ENVELOPE,
+    Envelope,
+    decode_local_message,
+    decode_message,
+    encode_local_message,
+    encode_message,
+)
+from models import InstallmentPlan
+from pydantic import ValidationError
+from samples import make_profile
+
+
+class TestEnvelope(unittest.TestCase):
+    def test_is_immutable(self):
+        envelope = Envelope.ingress(make_profile())
+
+        with self.assertRaises(AttributeError):
+            envelope.hops = ("TaskAgent",)
+        with self.assertRaises(AttributeError):
+            envelope.other = 1
+
+    def test_update_copies_on_write(self):
+        envelope = Envelope.ingress(make_profile())
+
+        updated = envelope.update(risk_level="HIGH")
+
+        self.assertIsNone(envelope.profile.risk_level)
+        self.assertEqual(updated.profile.risk_level, "HIGH")
+        self.assertEqual(updated.workflow_id, envelope.workflow_id)
+
+    def test_ingress_validates(self):
+        envelope = Envelope.ingress(
+            {**make_profile().model_dump(), "overdue_days": "12"}
+        )
+
+        self.assertEqual(envelope.profile.overdue_days, 12)
+        with self.assertRaises(ValidationError):
+            Envelope.ingress({"name": "Incomplete"})
+
+    def test_codec_round_trip(self):
+        plan = InstallmentPlan(monthly_payment=166.5, duration_months=12)
+        envelope = Envelope(
+            make_profile(
+                "Jürgen Doe",
+                outstanding_balance=2000.5,
+                risk_level="HIGH",
+                installment_plan=plan,
+            ),
+            "0123456789abcdef" * 2,
+            1767225600.5,
+            ("TaskAgent", "InstallmentPlanAgent"),
+        )
+
+        for message in (envelope, make_profile(), envelope.profile):
+            self.assertEqual(decode_message(encode_message(message)), message)
+        self.assertEqual(Envelope.decode(envelope.encode()), envelope)
+        self.assertEqual(
+            decode_local_message(encode_local_message({"other": 1})), {"other": 1}
+        )
+        with self.assertRaises(TypeError):
+            encode_message({"other": 1})
+        with self.assertRaises(ValueError):
+            decode_message(encode_local_message({"other": 1}))
+        self.assertLess(
+            len(encode_message(envelope)), len(envelope.profile.model_dump_json())
+        )
+
+    def test_decodes_envelopes_without_span_id(self):
+        envelope = Envelope.create(make_profile(), "0123456789abcdef" * 2, 100.0)
+        traced = envelope.with_profile(
+            envelope.profile, "TaskAgent", 101.0, span_id="fedcba9876543210"
+        )
+        # Encoded before envelopes carried the span id.
+        legacy = b"".join(
+            [
+                bytes([2]),
+                struct.pack(
+                    "<16sdBB", bytes.fromhex(envelope.workflow_id), 100.0, 0, 0
+                ),
+                encode_message(envelope.profile)[1:],
+            ]
+        )
+
+        self.assertEqual(decode_message(legacy), envelope)
+        self.assertEqual(encode_message(envelope), legacy)
+        self.assertEqual(decode_message(encode_message(traced)), traced)
+        self.assertEqual(encode_message(traced)[0], TRACED_ENVELOPE)
+
+    def test_pickle(self):
+        envelope = Envelope.ingress(make_profile())
+
+        self.assertEqual(pickle.loads(pickle.dumps(envelope)), envelope)
+
+
+class TestEnvelopeHops(unittest.IsolatedAsyncioTestCase):
+    async def test_agents_pass_envelopes_on(self):
+        registry = AgentRegistry()
+        risk_queue, first, second = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+        registry.register("next_action", first)
+        registry.register("next_action", second)
+        agent = RiskAssessmentAgent("RiskAssessmentAgent", risk_queue, registry)
+        admission = AdmissionController(risk_queue)
+
+        self.assertTrue(await admission.submit(make_profile()))
+        received = await risk_queue.get()
+        task = asyncio.create_task(agent.run())
+        await risk_queue.put(received)
+        first_envelope = await asyncio.wait_for(first.get(), 1)
+        second_envelope = await asyncio.wait_for(second.get(), 1)
+        task.cancel()
+
+        self.assertIsNone(received.profile.risk_level)
+        self.assertEqual(first_envelope.profile.risk_level, "HIGH")
+        self.assertEqual(first_envelope.hops, ("RiskAssessmentAgent",))
+        self.assertEqual(first_envelope.workflow_id, received.workflow_id)
+        self.assertEqual(second_envelope, first_envelope)
+        self.assertIsNot(second_envelope.profile, first_envelope.profile)
+
+    async def test_spill_keeps_envelopes(self):
+        queue = BoundedQueue(maxsize=1, policy="spill")
+        envelopes = [Envelope.ingress(make_profile(name=str(i))) for i in range(3)]
+        for envelope in envelopes:
+            await queue.put(envelope)
+
+        self.assertEqual([queue.get_nowait() for _ in range(3)], envelopes)
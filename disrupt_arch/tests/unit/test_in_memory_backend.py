@@ -0,0 +1,83 @@
+import tempfile
+import unittest
+
+import numpy as np
+from knowledge import InMemoryBackend, KnowledgeBackend, KnowledgeBase
+from samples import HashEmbeddingFunction
+
+DOCUMENTS = [
+    "If risk level is None request risk assessment",
+    "If overdue days > 120 and risk level is High, escalate case.",
+    "How to calculate the monthly payment for a debtor",
+]
+
+
+def make_backend() -> InMemoryBackend:
+    backend = InMemoryBackend(HashEmbeddingFunction())
+    backend.add(
+        documents=DOCUMENTS,
+        metadatas=[{"action": "assess_risk"}, {"action": "escalate_case"}, None],
+        ids=["1", "2", "3"],
+    )
+    return backend
+
+
+class TestInMemoryBackend(unittest.TestCase):
+    def test_is_knowledge_backend(self):
+        self.assertIsInstance(make_backend(), KnowledgeBackend)
+
+    def test_query_returns_top_k_by_cosine_similarity(self):
+        backend = make_backend()
+
+        results = backend.query(
+            query_texts=["calculate the monthly payment", "risk level is None"],
+            n_results=2,
+        )
+
+        self.assertEqual(results["ids"][0][0], "3")
+        self.assertEqual(results["ids"][1][0], "1")
+        self.assertEqual(len(results["documents"][0]), 2)
+        self.assertLessEqual(results["distances"][0][0], results["distances"][0][1])
+
+    def test_distances_are_squared_l2_of_normalized_embeddings(self):
+        backend = make_backend()
+
+        query = "escalate case"
+        embed = HashEmbeddingFunction()
+        (query_embedding,) = embed([query])
+
+        results = backend.query(query_texts=[query], n_results=3)
+
+        for document, distance in zip(results["documents"][0], results["distances"][0]):
+            (embedding,) = embed([document])
+            expected = float(np.sum((query_embedding - embedding) ** 2))
+            self.assertAlmostEqual(distance, expected, places=5)
+
+    def test_generated_ids_do_not_collide(self):
+        backend = InMemoryBackend(HashEmbeddingFunction())
+        backend.add(documents=DOCUMENTS[:1], ids=["2"])
+        backend.add(documents=DOCUMENTS[1:])
+
+        self.assertEqual(len(set(backend.get()["ids"])), 3)
+
+    def test_snapshot_round_trip(self):
+        backend = make_backend()
+
+        with tempfile.TemporaryDirectory() as path:
+            backend.snapshot(path)
+            restored = InMemoryBackend.load(path, HashEmbeddingFunction())
+
+        self.assertEqual(restored.get(), backend.get())
+        self.assertEqual(
+            restored.query(query_texts=["escalate case"], n_results=1)["ids"],
+            [["2"]],
+        )
+
+    def test_serves_knowledge_base(self):
+        knowledge_base = KnowledgeBase(make_backend())
+
+        results = knowledge_base.query_knowledge("risk level is None", top_k=1)
+        knowledge_base.add_knowledge("If risk level is Low, contact the debtor.", {})
+
+        self.assertEqual(results["ids"], [["1"]])
+        self.assertEqual(knowledge_base.collection.count(), 4)
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+from agents import AgentRegistry, InstallmentPlanAgent, InstallmentPlanCalculator
+from messages import Envelope
+from models import InstallmentPlan
+from samples import make_profile
+
+# A profile the business rule pays off in three months.
+LOW_RISK = {"income": 3000.0, "risk_level": "LOW"}
+
+
+class TestInstallmentPlanCalculator(unittest.TestCase):
+    def test_applies_business_rule(self):
+        calculator = InstallmentPlanCalculator()
+
+        plans = calculator.calculate(
+            [
+                make_profile(risk_level="HIGH"),
+                make_profile(risk_level="MEDIUM", income=1000.0),
+                make_profile(**LOW_RISK),
+            ]
+        )
+
+        self.assertAlmostEqual(plans[0].monthly_payment, 2000.0 / 12)
+        self.assertEqual(plans[0].duration_months, 12)
+        self.assertAlmostEqual(plans[1].monthly_payment, 200.0)
+        self.assertEqual(plans[1].duration_months, 10)
+        self.assertAlmostEqual(plans[2].monthly_payment, 600.0)
+        self.assertEqual(plans[2].duration_months, 3)
+
+    def test_marks_exceptions(self):
+        calculator = InstallmentPlanCalculator()
+
+        plans = calculator.calculate(
+            [make_profile(), make_profile(income=0.0, risk_level="LOW")]
+        )
+
+        self.assertEqual(plans, [None, None])
+
+    def test_calculate_arrays(self):
+        calculator = InstallmentPlanCalculator()
+
+        payments, months, valid = calculator.calculate_arrays(
+            np.array([1200.0, 500.0]), np.array([5000.0, -1.0]), np.array([12, 3])
+        )
+
+        self.assertEqual(payments[0], 100.0)
+        self.assertEqual(months[0], 12)
+        self.assertEqual(valid.tolist(), [True, False])
+
+
+class TestInstallmentPlanAgent(unittest.IsolatedAsyncioTestCase):
+    async def test_reasons_only_about_exceptions(self):
+        target = asyncio.Queue()
+        mock_registry = MagicMock()
+        mock_registry.get_agents_for_task.return_value = [target]
+        agent = InstallmentPlanAgent(
+            "InstallmentPlanAgent", asyncio.Queue(), MagicMock(), mock_registry
+        )
+        agent.retrieve = AsyncMock(return_value="Rule 5")
+        agent.reason_structured = AsyncMock(
+            return_value=InstallmentPlan(monthly_payment=50, duration_months=12)
+        )
+
+        profiles = [make_profile(**LOW_RISK), make_profile()]
+        await agent.process_batch(profiles)
+        await agent.publisher.drain()
+
+        published = [target.get_nowait() for _ in range(target.qsize())]
+        agent.reason_structured.assert_awaited_once()
+        self.assertEqual(published[0].installment_plan.duration_months, 3)
+        self.assertEqual(published[1].installment_plan.monthly_payment, 50)
+        self.assertEqual([p.installment_plan for p in profiles], [None, None])
+        self.assertEqual(agent.plan_paths, {"calculator": 1, "llm": 1})
+
+    async def test_validations_are_bounded_and_drained(self):
+        mock_registry = MagicMock()
+        mock_registry.get_agents_for_task.return_value = [asyncio.Queue()]
+        agent = InstallmentPlanAgent(
+            "InstallmentPlanAgent",
+            asyncio.Queue(),
+            MagicMock(),
+            mock_registry,
+            validation_rate=1.0,
+            max_validations=1,
+        )
+        released = asyncio.Event()
+
+        async def reason(**kwargs):
+            await released.wait()
+            return InstallmentPlan(monthly_payment=600, duration_months=3)
+
+        agent.retrieve = AsyncMock(return_value="Rule 5")
+        agent.reason_structured = reason
+
+        await agent.process_batch([make_profile(**LOW_RISK), make_profile(**LOW_RISK)])
+        self.assertEqual(len(agent.validations), 1)
+        self.assertEqual(agent.plan_paths["validation_skipped"], 1)
+        self.assertFalse(await agent.drain_validations(0.01))
+
+        await agent.process_batch([make_profile(**LOW_RISK)])
+        released.set()
+        self.assertTrue(await agent.drain_validations(1))
+        self.assertEqual(agent.validations, set())
+        self.assertEqual(agent.plan_paths["validated"], 1)
+
+    async def test_batched_plans_keep_their_envelopes(self):
+        queue, target = asyncio.Queue(), asyncio.Queue()
+        registry = AgentRegistry()
+        registry.register("contact_debtor", target)
+        agent = InstallmentPlanAgent(
+            "InstallmentPlanAgent", queue, MagicMock(), registry, batch_size=2
+        )
+        envelopes = [
+            Envelope.ingress(make_profile(name, **LOW_RISK)) for name in ("Ann", "Bob")
+        ]
+        for envelope in envelopes:
+            queue.put_nowait(envelope)
+
+        task = asyncio.create_task(agent.run())
+        await asyncio.wait_for(queue.join(), 1)
+        await agent.publisher.drain()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        published = [target.get_nowait() for _ in range(target.qsize())]
+        self.assertEqual(
+            {(e.workflow_id, e.profile.name) for e in published},
+            {(e.workflow_id, e.profile.name) for e in envelopes},
+        )
+        self.assertTrue(all(e.profile.installment_plan for e in published))
+        self.assertTrue(all(e.profile.installment_plan is None for e in envelopes))
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from knowledge import KnowledgeBase
+
+
+def make_collection() -> MagicMock:
+    collection = MagicMock()
+    collection.get.return_value = {"ids": ["1"], "documents": ["Rule 1"]}
+    collection.query.side_effect = lambda query_texts, n_results: {
+        "documents": [query_texts]
+    }
+    return collection
+
+
+class TestKnowledgeBase(unittest.TestCase):
+    def test_memoizes_query_results(self):
+        collection = make_collection()
+        knowledge_base = KnowledgeBase(collection)
+
+        first = knowledge_base.query_knowledge("rules")
+        second = knowledge_base.query_knowledge("rules")
+        knowledge_base.query_knowledge("rules", top_k=5)
+
+        self.assertIs(first, second)
+        self.assertEqual(collection.query.call_count, 2)
+        self.assertEqual(knowledge_base.cache_stats()["hits"], 1)
+
+    def test_add_knowledge_invalidates_cache(self):
+        collection = make_collection()
+        knowledge_base = KnowledgeBase(collection)
+
+        knowledge_base.query_knowledge("rules")
+        knowledge_base.add_knowledge("Rule 2", {"action": "escalate_case"})
+        knowledge_base.query_knowledge("rules")
+
+        self.assertEqual(collection.query.call_count, 2)
+
+    def test_external_change_invalidates_cache(self):
+        collection = make_collection()
+        knowledge_base = KnowledgeBase(collection, version_check_interval=0)
+
+        knowledge_base.query_knowledge("rules")
+        collection.get.return_value = {"ids": ["1", "2"], "documents": ["1", "2"]}
+        knowledge_base.query_knowledge("rules")
+
+        self.assertEqual(knowledge_base.version, 1)
+        self.assertEqual(collection.query.call_count, 2)
+
+    def test_concurrent_identical_queries_share_request(self):
+        collection = make_collection()
+        release = threading.Event()
+
+        def slow_query(query_texts, n_results):
+            release.wait(1)
+            return {"documents": [query_texts]}
+
+        collection.query.side_effect = slow_query
+        knowledge_base = KnowledgeBase(collection)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(knowledge_base.query_knowledge, "rules")
+                for _ in range(4)
+            ]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(collection.query.call_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(knowledge_base.cache_stats()["shared"], 3)
+
+
+class TestAsyncKnowledgeBase(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_concurrent_queries(self):
+        collection = make_collection()
+        collection.query.side_effect = lambda query_texts, n_results: {
+            "ids": [[f"{text}-{i}" for i in range(n_results)] for text in query_texts],
+            "documents": [[text] * n_results for text in query_texts],
+            "embeddings": None,
+            "included": ["documents"],
+        }
+        knowledge_base = KnowledgeBase(collection)
+
+        results = await asyncio.gather(
+            knowledge_base.aquery_knowledge("rule a", top_k=1),
+            knowledge_base.aquery_knowledge("rule b", top_k=3),
+            knowledge_base.aquery_knowledge("rule b", top_k=3),
+        )
+
+        collection.query.assert_called_once()
+        self.assertEqual(collection.query.call_args.kwargs["n_results"], 3)
+        self.assertEqual(results[0]["ids"], [['"rule a"-0']])
+        self.assertEqual(len(results[1]["ids"][0]), 3)
+        self.assertIs(results[1], results[2])
+        self.assertEqual(results[0]["included"], ["documents"])
+        self.assertEqual(knowledge_base.cache_stats()["batches"], 1)
+
+    async def test_concurrent_queries_share_version_check(self):
+        collection = make_collection()
+        collection.query.side_effect = lambda query_texts, n_results: {
+            "documents": [[text] for text in query_texts]
+        }
+        knowledge_base = KnowledgeBase(collection)
+
+        await asyncio.gather(
+            *(knowledge_base.aquery_knowledge(f"rule {i}") for i in range(5)),
+            knowledge_base.check_version(),
+        )
+
+        collection.get.assert_called_once()
+        self.assertIsNone(knowledge_base.version_sync)
+
+    async def test_cancelled_caller_does_not_cancel_shared_query(self):
+        collection = make_collection()
+        collection.query.side_effect = lambda query_texts, n_results: {
+            "documents": [[text] for text in query_texts]
+        }
+        knowledge_base = KnowledgeBase(collection, version_check_interval=None)
+
+        cancelled = asyncio.create_task(knowledge_base.aquery_knowledge("b"))
+        waiting = asyncio.create_task(knowledge_base.aquery_knowledge("b"))
+        other = asyncio.create_task(knowledge_base.aquery_knowledge("c"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(waiting, other), 1)
+        again = await asyncio.wait_for(knowledge_base.aquery_knowledge("b"), 1)
+
+        self.assertEqual(results, [{"documents": [['"b"']]}, {"documents": [['"c"']]}])
+        self.assertIs(again, results[0])
+        self.assertEqual(knowledge_base.in_flight, {})
+        self.assertEqual(knowledge_base.cache_stats()["shared"], 1)
+
+    async def test_propagates_query_errors(self):
+        collection = make_collection()
+        collection.query.side_effect = RuntimeError("unavailable")
+        knowledge_base = KnowledgeBase(collection)
+
+        with self.assertRaises(RuntimeError):
+            await knowledge_base.aquery_knowledge("rules")
+        self.assertEqual(knowledge_base.in_flight, {})
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import unittest
+
+from agents import CommunicationAgent, RiskAssessmentAgent
+from agents.base import ReasoningBackend
+from benchmark import FakeKnowledgeBase, FakeOpenAIClient, LatencyDistribution
+from messages import Envelope
+from observability import Histogram, MetricsServer, render_prometheus, snapshot
+from samples import make_profile
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.queues = {}
+
+    def register(self, task, queue):
+        self.queues[task] = queue
+
+    def get_agents_for_task(self, task):
+        return [asyncio.Queue()]
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in [0.05] * 8 + [0.5, 2.0]:
+            histogram.observe(value)
+
+        self.assertEqual(
+            histogram.cumulative(), [(0.1, 8), (1.0, 9), (float("inf"), 10)]
+        )
+        self.assertLessEqual(histogram.quantile(0.5), 0.1)
+        self.assertGreater(histogram.quantile(0.85), 0.1)
+        self.assertAlmostEqual(histogram.snapshot()["sum"], 2.9)
+
+
+class TestAgentMetrics(unittest.IsolatedAsyncioTestCase):
+    async def test_records_processing_and_reasoning(self):
+        queue = asyncio.Queue()
+        client = FakeOpenAIClient(LatencyDistribution("constant", 0.01))
+        agent = CommunicationAgent(
+            "CommunicationAgent",
+            queue,
+            FakeKnowledgeBase(LatencyDistribution("constant", 0.0)),
+            FakeRegistry(),
+            reasoning_backend=ReasoningBackend(client, "fake"),
+        )
+        task = asyncio.create_task(agent.run())
+
+        for index in range(3):
+            await queue.put(Envelope.ingress(make_profile(str(index))))
+        await asyncio.wait_for(queue.join(), 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        metrics = agent.snapshot()
+        self.assertEqual(metrics["messages"], 3)
+        self.assertEqual(metrics["llm_calls"], 3)
+        self.assertEqual(metrics["llm_latency"]["count"], 3)
+        self.assertGreaterEqual(metrics["llm_latency"]["mean"], 0.01)
+        self.assertEqual(metrics["completion_tokens"], 3 * client.completion_tokens)
+        self.assertGreater(metrics["prompt_tokens"], 0)
+        self.assertEqual(metrics["queue_wait"]["count"], 3)
+        self.assertEqual(metrics["service_time"]["count"], 3)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    async def test_serves_prometheus_text(self):
+        agent = RiskAssessmentAgent(
+            "RiskAssessmentAgent", asyncio.Queue(), FakeRegistry()
+        )
+        agent.record_service_time(0.02)
+        server = MetricsServer([agent], port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            await server.stop()
+
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK"))
+        self.assertIn('agent_messages_total{agent="RiskAssessmentAgent"} 1', response)
+        self.assertIn(
+            'agent_service_time_seconds_bucket{agent="RiskAssessmentAgent",le="0.025"} 1',
+            response,
+        )
+        self.assertIn("# TYPE agent_queue_depth gauge", response)
+        self.assertEqual(response.split("\r\n\r\n", 1)[1], render_prometheus([agent]))
+        self.assertEqual(
+            json.loads(json.dumps(snapshot([agent])))["RiskAssessmentAgent"][
+                "messages"
+            ],
+            1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
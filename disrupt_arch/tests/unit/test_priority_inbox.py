@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from agents import AgentRegistry, PriorityInbox, priority_score
+from agents.base.agent import Agent
+from models import DebtorProfile
+from samples import make_profile
+
+
+class RecordingAgent(Agent):
+    def __init__(self, name: str, queue: asyncio.Queue):
+        super().__init__(name, queue, num_workers=1)
+        self.processed = []
+
+    async def process_message(self, message: DebtorProfile):
+        self.processed.append(message.name)
+
+
+class TestPriorityInbox(unittest.IsolatedAsyncioTestCase):
+    def test_score_prefers_high_value_cases(self):
+        self.assertGreater(
+            priority_score(
+                make_profile("Big", outstanding_balance=50000.0, overdue_days=170)
+            ),
+            priority_score(
+                make_profile("Small", outstanding_balance=50.0, overdue_days=3)
+            ),
+        )
+
+    async def test_highest_priority_first(self):
+        queue = PriorityInbox(aging_rate=0.0)
+        await queue.put(make_profile("Small", outstanding_balance=50.0, overdue_days=3))
+        await queue.put(
+            make_profile("Big", outstanding_balance=50000.0, overdue_days=170)
+        )
+        await queue.put(
+            make_profile("Medium", outstanding_balance=5000.0, overdue_days=60)
+        )
+
+        names = [queue.get_nowait().name for _ in range(3)]
+
+        self.assertEqual(names, ["Big", "Medium", "Small"])
+
+    async def test_aging_prevents_starvation(self):
+        queue = PriorityInbox(aging_rate=1000.0)
+        await queue.put(make_profile("Small", outstanding_balance=50.0, overdue_days=3))
+        await asyncio.sleep(0.02)
+        await queue.put(
+            make_profile("Big", outstanding_balance=50000.0, overdue_days=170)
+        )
+
+        self.assertEqual(queue.get_nowait().name, "Small")
+
+    async def test_drop_evicts_lowest_priority(self):
+        queue = PriorityInbox(maxsize=2, policy="drop_oldest", aging_rate=0.0)
+        await queue.put(
+            make_profile("Medium", outstanding_balance=5000.0, overdue_days=60)
+        )
+        await queue.put(make_profile("Small", outstanding_balance=50.0, overdue_days=3))
+        await queue.put(
+            make_profile("Big", outstanding_balance=50000.0, overdue_days=170)
+        )
+
+        names = [queue.get_nowait().name for _ in range(2)]
+
+        self.assertEqual(names, ["Big", "Medium"])
+
+    async def test_agent_registered_with_priority_inbox(self):
+        registry = AgentRegistry()
+        queue = PriorityInbox(aging_rate=0.0)
+        registry.register("installment_plan", queue)
+        agent = RecordingAgent("RecordingAgent", queue)
+        publisher = RecordingAgent("Publisher", asyncio.Queue())
+
+        for case in (
+            make_profile("Small", outstanding_balance=50.0, overdue_days=3),
+            make_profile("Big", outstanding_balance=50000.0, overdue_days=170),
+        ):
+            await publisher.publish_message(
+                registry.get_agents_for_task("installment_plan"), case
+            )
+
+        task = asyncio.create_task(agent.run())
+        await asyncio.wait_for(queue.join(), 1)
+        task.cancel()
+
+        self.assertEqual(agent.processed, ["Big", "Small"])
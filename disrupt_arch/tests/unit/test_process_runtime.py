@@ -0,0 +1,69 @@
+import asyncio
+import os
+import unittest
+
+from agents.base import OperationalAgent
+from models import DebtorProfile
+from runtime import AgentSpec, ProcessRuntime
+from samples import make_profile
+
+
+class EchoAgent(OperationalAgent):
+    def __init__(self, queue, agent_registry):
+        super().__init__("EchoAgent", queue)
+        self.agent_registry = agent_registry
+        agent_registry.register("echo", queue)
+
+    async def process_message(self, entity: DebtorProfile):
+        if entity.name == "crash":
+            os._exit(1)
+        entity.risk_level = f"{os.getpid()}"
+        await self.publish_message(
+            self.agent_registry.get_agents_for_task("done"), entity
+        )
+
+    async def execute_task(self, task):
+        pass
+
+
+def echo_agent(queue, agent_registry):
+    return EchoAgent(queue, agent_registry)
+
+
+class TestProcessRuntime(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.runtime = ProcessRuntime(
+            [AgentSpec("EchoAgent", echo_agent, ["echo"], processes=2)],
+            outputs=["done"],
+            supervise_interval=0.1,
+        )
+        self.runtime.start()
+
+    async def asyncTearDown(self):
+        self.runtime.stop()
+
+    async def test_messages_pass_through_agent_processes(self):
+        for i in range(20):
+            await self.runtime.submit("echo", make_profile(str(i)))
+
+        results = await self.runtime.receive("done", count=20, timeout=60)
+
+        self.assertEqual(sorted(int(r.name) for r in results), list(range(20)))
+        pids = {process.pid for process in self.runtime.processes.values()}
+        self.assertTrue({int(r.risk_level) for r in results} <= pids)
+
+    async def test_crashed_process_is_restarted(self):
+        await self.runtime.submit("echo", make_profile("crash"))
+        supervisor = asyncio.create_task(self.runtime.supervise())
+
+        for _ in range(300):
+            if self.runtime.restarts["EchoAgent"]:
+                break
+            await asyncio.sleep(0.1)
+        await self.runtime.submit("echo", make_profile("after"))
+        results = await self.runtime.receive("done", timeout=60)
+        supervisor.cancel()
+
+        self.assertEqual(self.runtime.restarts["EchoAgent"], 1)
+        self.assertEqual(results[0].name, "after")
+        self.assertEqual(self.runtime.stats()["EchoAgent"]["processes"], 2)
@@ -0,0 +1,82 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from agents.base import PromptBuilder
+from agents.base.prompt import count_tokens, get_encoding
+from models import DebtorProfile
+
+PROFILE = DebtorProfile(
+    communication_state="NO_RESPONSE",
+    name="John Doe",
+    income=50000.0,
+    installment_plan=None,
+    outstanding_balance=2000.0,
+    overdue_days=130,
+    risk_level=None,
+)
+
+QUERY_RESULT = {
+    "ids": [["1", "2"]],
+    "distances": [[0.1, 0.2]],
+    "embeddings": None,
+    "metadatas": [[{"action": "assess_risk"}, {"action": "escalate_case"}]],
+    "documents": [
+        [
+            "If risk level is None request risk assessment",
+            '"\n        If overdue days > 120\n        and risk level is High.',
+        ]
+    ],
+}
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def test_encodes_profile_compactly(self):
+        encoded = PromptBuilder.encode_profile(PROFILE)
+
+        self.assertNotIn(" ", encoded.replace("John Doe", ""))
+        self.assertEqual(json.loads(encoded)["overdue_days"], 130)
+        self.assertIsNone(json.loads(encoded)["risk_level"])
+        self.assertIn('"risk_level":null', encoded)
+
+    def test_extracts_rule_documents(self):
+        rules = PromptBuilder.encode_rules([QUERY_RESULT, QUERY_RESULT])
+
+        self.assertEqual(
+            rules,
+            (
+                "If risk level is None request risk assessment",
+                "If overdue days > 120 and risk level is High.",
+            ),
+        )
+
+    def test_static_prefix_comes_first_and_is_reused(self):
+        builder = PromptBuilder()
+        rules = PromptBuilder.encode_rules(QUERY_RESULT)
+
+        with patch("agents.base.prompt.count_tokens", return_value=10) as count:
+            first = builder.messages("Decide.", "profile a", rules)
+            second = builder.messages("Decide.", "profile b", rules)
+
+        self.assertEqual(first[0], second[0])
+        self.assertTrue(first[0]["content"].startswith(builder.preamble))
+        self.assertIn(rules[1], first[0]["content"])
+        self.assertEqual(first[1], {"role": "user", "content": "profile a"})
+        self.assertEqual(count.call_count, 3)
+        self.assertEqual(builder.stats()["prompt_tokens"], 40)
+
+    def test_flags_estimated_token_counts(self):
+        get_encoding.cache_clear()
+        self.addCleanup(get_encoding.cache_clear)
+        builder = PromptBuilder()
+
+        with (
+            patch("agents.base.prompt.tiktoken", None),
+            self.assertLogs(level="WARNING") as logs,
+        ):
+            builder.messages("Decide.", "profile a")
+            builder.messages("Decide.", "profile b")
+            self.assertEqual(count_tokens("12345678"), 2)
+            self.assertTrue(builder.stats()["estimated"])
+
+        self.assertEqual(len(logs.records), 1)
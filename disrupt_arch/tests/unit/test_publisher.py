@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from agents.base import Publisher
+from agents.base.agent import Agent
+from models import DebtorProfile
+from samples import make_profile
+
+
+class IdleAgent(Agent):
+    async def process_message(self, message: DebtorProfile):
+        pass
+
+
+class TestPublisher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.agent = IdleAgent("IdleAgent", asyncio.Queue())
+
+    async def test_publishes_and_counts_messages(self):
+        publisher = Publisher(self.agent)
+        target = asyncio.Queue()
+
+        await publisher.publish([target], make_profile("a"))
+        await publisher.publish_many(
+            [([target], make_profile("b")), ([target], make_profile("c"))]
+        )
+        self.assertTrue(await publisher.drain(1.0))
+
+        self.assertEqual(target.qsize(), 3)
+        self.assertEqual(publisher.stats()["published"], 3)
+        self.assertEqual(publisher.stats()["in_flight"], 0)
+
+    async def test_bounds_publishes_in_flight(self):
+        publisher = Publisher(self.agent, max_in_flight=2)
+        target = asyncio.Queue(maxsize=1)
+        target.put_nowait(make_profile("full"))
+
+        await publisher.publish([target], make_profile("a"))
+        await publisher.publish([target], make_profile("b"))
+        blocked = asyncio.create_task(publisher.publish([target], make_profile("c")))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+        self.assertEqual(publisher.stats()["in_flight"], 2)
+
+        for _ in range(3):
+            await target.get()
+            await asyncio.sleep(0)
+        await blocked
+        self.assertTrue(await publisher.drain(1.0))
+        self.assertEqual(publisher.stats()["high_water_mark"], 2)
+        self.assertEqual(publisher.stats()["published"], 3)
+
+    async def test_counts_failed_publishes(self):
+        publisher = Publisher(self.agent)
+        target = asyncio.Queue(maxsize=1)
+        target.put_nowait(make_profile("full"))
+
+        async def put(item):
+            target.put_nowait(item)
+
+        target.put = put
+        await publisher.publish_many(
+            [([target], make_profile("a")), ([asyncio.Queue()], make_profile("b"))]
+        )
+        await publisher.drain(1.0)
+
+        self.assertEqual(publisher.stats()["failed"], 1)
+        self.assertEqual(publisher.stats()["published"], 1)
+        self.assertIn("QueueFull", publisher.stats()["last_error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
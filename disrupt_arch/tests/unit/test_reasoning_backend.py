@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from agents.base import ReasoningBackend
+
+
+class TestReasoningBackend(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_in_flight_completions(self):
+        in_flight = 0
+        max_observed = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, max_observed
+            in_flight += 1
+            max_observed = max(max_observed, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock()
+
+        client = MagicMock()
+        client.chat.completions.create = create
+        backend = ReasoningBackend(client=client, max_in_flight=2, timeout=5)
+
+        await asyncio.gather(*(backend.create(messages=[]) for _ in range(6)))
+
+        self.assertEqual(max_observed, 2)
+
+    async def test_passes_timeout_and_model(self):
+        client = MagicMock()
+        calls = []
+
+        async def parse(**kwargs):
+            calls.append(kwargs)
+            return MagicMock()
+
+        client.beta.chat.completions.parse = parse
+        backend = ReasoningBackend(client=client, model="test-model", timeout=3)
+
+        await backend.parse(messages=[], response_format=MagicMock)
+
+        self.assertEqual(calls[0]["model"], "test-model")
+        self.assertEqual(calls[0]["timeout"], 3)
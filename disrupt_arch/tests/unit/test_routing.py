@@ -0,0 +1,61 @@
+import asyncio
+import random
+import unittest
+
+from agents import AgentRegistry, PowerOfTwoChoices
+
+
+class TestRoutingStrategies(unittest.TestCase):
+    def setUp(self):
+        self.queues = [asyncio.Queue() for _ in range(3)]
+
+    def registry(self, strategy) -> AgentRegistry:
+        registry = AgentRegistry(strategies={"installment_plan": strategy})
+        for queue in self.queues:
+            registry.register("installment_plan", queue)
+        return registry
+
+    def test_broadcast_is_the_default(self):
+        registry = AgentRegistry()
+        for queue in self.queues:
+            registry.register("installment_plan", queue)
+
+        self.assertEqual(registry.get_agents_for_task("installment_plan"), self.queues)
+
+    def test_round_robin(self):
+        registry = self.registry("round_robin")
+
+        selected = [
+            registry.get_agents_for_task("installment_plan")[0] for _ in range(6)
+        ]
+
+        self.assertEqual(selected, self.queues * 2)
+
+    def test_least_queue_depth(self):
+        registry = self.registry("least_queue_depth")
+        self.queues[0].put_nowait(1)
+        self.queues[2].put_nowait(1)
+
+        self.assertEqual(
+            registry.get_agents_for_task("installment_plan"), [self.queues[1]]
+        )
+
+    def test_power_of_two_choices_picks_less_loaded(self):
+        registry = self.registry(PowerOfTwoChoices(random.Random(1)))
+        for _ in range(5):
+            self.queues[0].put_nowait(1)
+            self.queues[1].put_nowait(1)
+
+        selected = [
+            registry.get_agents_for_task("installment_plan")[0] for _ in range(20)
+        ]
+
+        # Two of the three pairs contain the empty queue, which wins its pairs.
+        self.assertGreaterEqual(selected.count(self.queues[2]), 10)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            AgentRegistry(strategies={"installment_plan": "random"})
+
+    def test_unregistered_task(self):
+        self.assertEqual(self.registry("round_robin").get_agents_for_task("x"), [])
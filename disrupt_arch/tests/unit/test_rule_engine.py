@@ -0,0 +1,84 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from knowledge import InMemoryBackend, KnowledgeBase, RuleEngine
+from samples import HashEmbeddingFunction, make_profile
+
+
+def make_knowledge_base() -> MagicMock:
+    knowledge_base = MagicMock(version=0)
+    knowledge_base.collection.get.return_value = {
+        "ids": ["1", "2", "5"],
+        "metadatas": [
+            {
+                "action": "assess_risk",
+                "target": "RiskAssessmentAgent",
+                "priority": 1,
+                "conditions": json.dumps(
+                    [{"field": "risk_level", "op": "==", "value": None}]
+                ),
+            },
+            {
+                "action": "escalate_case",
+                "target": "LegalAgent",
+                "priority": 2,
+                "conditions": json.dumps(
+                    [
+                        {"field": "overdue_days", "op": ">", "value": 120},
+                        {"field": "risk_level", "op": "==", "value": "HIGH"},
+                    ]
+                ),
+            },
+            {"action": "contact_debtor", "target": "CommunicationAgent"},
+        ],
+    }
+    return knowledge_base
+
+
+class TestRuleEngine(unittest.TestCase):
+    def test_compiles_only_rules_with_conditions(self):
+        engine = RuleEngine(make_knowledge_base())
+
+        self.assertEqual([rule.rule_id for rule in engine.rules], ["1", "2"])
+
+    def test_evaluates_first_matching_rule(self):
+        engine = RuleEngine(make_knowledge_base())
+
+        self.assertEqual(engine.evaluate(make_profile()).action, "assess_risk")
+        self.assertEqual(
+            engine.evaluate(make_profile(risk_level="HIGH")).action, "escalate_case"
+        )
+        self.assertIsNone(
+            engine.evaluate(make_profile(risk_level="HIGH", overdue_days=90))
+        )
+        self.assertEqual(engine.stats(), {"matches": {"1": 1, "2": 1}, "misses": 1})
+
+    def test_reloads_when_knowledge_changes(self):
+        knowledge_base = make_knowledge_base()
+        engine = RuleEngine(knowledge_base)
+
+        knowledge_base.version = 1
+        engine.evaluate(make_profile())
+
+        self.assertEqual(knowledge_base.collection.get.call_count, 2)
+
+    def test_reloads_when_another_client_changes_the_rules(self):
+        def rule(action: str, priority: int) -> dict:
+            return {
+                "action": action,
+                "target": "Agent",
+                "priority": priority,
+                "conditions": json.dumps(
+                    [{"field": "risk_level", "op": "==", "value": None}]
+                ),
+            }
+
+        backend = InMemoryBackend(HashEmbeddingFunction())
+        backend.add(documents=["Assess risk"], metadatas=[rule("assess_risk", 2)])
+        engine = RuleEngine(KnowledgeBase(backend, version_check_interval=0))
+        self.assertEqual(engine.evaluate(make_profile()).action, "assess_risk")
+
+        backend.add(documents=["Escalate"], metadatas=[rule("escalate_case", 1)])
+
+        self.assertEqual(engine.evaluate(make_profile()).action, "escalate_case")
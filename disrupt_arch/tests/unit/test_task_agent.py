@@ -2,8 +2,12 @@ import asyncio
 import unittest
 from unittest.mock import AsyncMock, MagicMock
 
-from agents import TaskAgent
-from models import DebtorProfile, NextBestAction
+from agents import AgentRegistry, DecisionCache, TaskAgent, WorkflowTracker
+from agents.base import PromptBuilder
+from knowledge import InMemoryBackend, KnowledgeBase
+from messages import Envelope
+from models import NextBestAction, NextBestActionBatch, ProfileNextBestAction
+from samples import HashEmbeddingFunction, make_profile
 
 
 class TestTaskAgent(unittest.IsolatedAsyncioTestCase):
@@ -33,15 +37,7 @@ class TestTaskAgent(unittest.IsolatedAsyncioTestCase):
             mock_registry,
         )
 
-        profile = DebtorProfile(
-            communication_state="NO_RESPONSE",
-            name="John Doe",
-            income=50000.0,
-            installment_plan=None,
-            outstanding_balance=2000.0,
-            overdue_days=120,
-            risk_level=None,
-        )
+        profile = make_profile("John Doe", overdue_days=120)
         await task_queue.put(profile)
 
         agent.retrieve = AsyncMock(return_value="Rule 1, Rule 2")
@@ -55,8 +51,170 @@ class TestTaskAgent(unittest.IsolatedAsyncioTestCase):
 
         agent.retrieve.assert_awaited_once_with(profile)
         agent.reason_structured.assert_awaited_once_with(
-            content=f"debtor profile: {profile}, business rules: Rule 1, Rule 2",
+            content=PromptBuilder.encode_profile(profile),
             response_format=NextBestAction,
             task=agent.task,
+            rules=("Rule 1, Rule 2",),
+            entities=[profile],
         )
         mock_registry.get_agents_for_task.assert_called_with("escalate")
+
+    async def test_process_batch(self):
+        mock_registry = MagicMock()
+        mock_registry.get_agents_for_task.return_value = [asyncio.Queue()]
+
+        task_queue = asyncio.Queue()
+        agent = TaskAgent(
+            "TaskAgent",
+            task_queue,
+            AsyncMock(),
+            mock_registry,
+            batch_size=3,
+            batch_window=0.05,
+        )
+
+        profiles = [make_profile(f"Debtor {i}", risk_level="HIGH") for i in range(3)]
+        for profile in profiles:
+            await task_queue.put(profile)
+
+        agent.retrieve = AsyncMock(return_value="Rule 1, Rule 2")
+        agent.reason_structured = AsyncMock(
+            return_value=NextBestActionBatch(
+                actions=[
+                    ProfileNextBestAction(
+                        profile_key=str(i), action="escalate_case", target="Legal"
+                    )
+                    for i in range(3)
+                ]
+            )
+        )
+
+        task = asyncio.create_task(agent.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        agent.reason_structured.assert_awaited_once()
+        self.assertEqual(
+            agent.reason_structured.await_args.kwargs["response_format"],
+            NextBestActionBatch,
+        )
+        self.assertEqual(mock_registry.get_agents_for_task.call_count, 3)
+        self.assertTrue(task_queue.empty())
+
+    async def test_process_batch_publishes_resolved_routes_if_a_fallback_fails(self):
+        target = asyncio.Queue()
+        registry = AgentRegistry()
+        registry.register("escalate_case", target)
+        task_queue = asyncio.Queue()
+        agent = TaskAgent("TaskAgent", task_queue, AsyncMock(), registry, batch_size=3)
+        agent.workflows = WorkflowTracker()
+        envelopes = [
+            Envelope.ingress(make_profile(f"Debtor {i}", risk_level="HIGH"))
+            for i in range(3)
+        ]
+        failed = agent.workflows.track(envelopes[2].workflow_id)
+        for envelope in envelopes:
+            await task_queue.put(envelope)
+
+        agent.retrieve = AsyncMock(return_value="Rule 1, Rule 2")
+        agent.reason_structured = AsyncMock(
+            side_effect=[
+                NextBestActionBatch(
+                    actions=[
+                        ProfileNextBestAction(
+                            profile_key=str(i), action="escalate_case", target="Legal"
+                        )
+                        for i in range(2)
+                    ]
+                ),
+                None,
+            ]
+        )
+
+        task = asyncio.create_task(agent.run())
+        await asyncio.wait_for(task_queue.join(), 1)
+        await agent.publisher.drain()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        published = [target.get_nowait().profile.name for _ in range(target.qsize())]
+        self.assertEqual(sorted(published), ["Debtor 0", "Debtor 1"])
+        self.assertIsInstance((await failed).error, RuntimeError)
+        self.assertEqual(agent.decision_stats()["undecided"], 1)
+
+    async def test_process_message_uses_decision_cache(self):
+        mock_registry = MagicMock()
+        mock_registry.get_agents_for_task.return_value = [asyncio.Queue()]
+        mock_knowledge_base = MagicMock(version=0)
+        mock_knowledge_base.check_version = AsyncMock(return_value=0)
+
+        task_queue = asyncio.Queue()
+        agent = TaskAgent(
+            "TaskAgent",
+            task_queue,
+            mock_knowledge_base,
+            mock_registry,
+            decision_cache=DecisionCache(),
+        )
+        agent.retrieve = AsyncMock(return_value="Rule 1, Rule 2")
+        agent.reason_structured = AsyncMock(
+            return_value=NextBestAction(action="escalate_case", target="LegalAgent")
+        )
+
+        for name in ["John Doe", "Jane Doe"]:
+            await agent.process_message(make_profile(name, risk_level="HIGH"))
+
+        agent.reason_structured.assert_awaited_once()
+        self.assertEqual(agent.decision_cache.stats()["hits"], 1)
+        self.assertEqual(mock_registry.get_agents_for_task.call_count, 2)
+
+    async def test_changed_rules_invalidate_cached_decisions(self):
+        backend = InMemoryBackend(HashEmbeddingFunction())
+        backend.add(documents=["If overdue days > 120, escalate case."], ids=["1"])
+        knowledge_base = KnowledgeBase(backend, version_check_interval=0)
+        agent = TaskAgent(
+            "TaskAgent",
+            asyncio.Queue(),
+            knowledge_base,
+            MagicMock(),
+            decision_cache=DecisionCache(),
+        )
+        agent.retrieve = AsyncMock(return_value="Rule 1")
+        agent.reason_structured = AsyncMock(
+            return_value=NextBestAction(action="escalate_case", target="LegalAgent")
+        )
+
+        await agent.process_message(make_profile())
+        await agent.process_message(make_profile())
+        # Another client re-seeds the business rules.
+        backend.add(documents=["If overdue days > 120, contact the debtor."])
+        await agent.process_message(make_profile())
+
+        self.assertEqual(agent.reason_structured.await_count, 2)
+        self.assertEqual(agent.decision_cache.stats()["hits"], 1)
+
+    async def test_process_message_prefers_rule_engine(self):
+        mock_registry = MagicMock()
+        mock_registry.get_agents_for_task.return_value = [asyncio.Queue()]
+        rule_engine = MagicMock()
+        rule_engine.knowledge_base.check_version = AsyncMock(return_value=0)
+        rule_engine.evaluate.return_value = NextBestAction(
+            action="assess_risk", target="RiskAssessmentAgent"
+        )
+
+        agent = TaskAgent(
+            "TaskAgent",
+            asyncio.Queue(),
+            MagicMock(version=0),
+            mock_registry,
+            rule_engine=rule_engine,
+        )
+        agent.retrieve = AsyncMock()
+        agent.reason_structured = AsyncMock()
+
+        await agent.process_message(make_profile("John Doe", overdue_days=20))
+
+        agent.retrieve.assert_not_awaited()
+        agent.reason_structured.assert_not_awaited()
+        mock_registry.get_agents_for_task.assert_called_with("assess_risk")
+        self.assertEqual(agent.decision_stats(), {"rule_engine": 1})
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from agents import (
+    AdmissionController,
+    AgentRegistry,
+    EscalationAgent,
+    RiskAssessmentAgent,
+    WorkflowTracker,
+)
+from messages import Envelope, decode_message, encode_message
+from observability import JsonlSpanExporter, Tracer, current_span
+from observability.critical_path import UNTRACED, critical_path, load_traces
+from samples import make_profile
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def span(name, span_id, parent_id, start, end) -> dict:
+    return {
+        "name": name,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "start": start,
+        "end": end,
+    }
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+
+        with tracer.span("TaskAgent.llm") as recorded:
+            self.assertIsNone(recorded)
+        self.assertIsNone(tracer.record("TaskAgent.queue_wait", 1.0, 2.0, "a" * 32))
+
+    def test_spans_nest_under_current_span(self):
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        root = tracer.record("TaskAgent.queue_wait", 1.0, 2.0, "a" * 32)
+
+        with tracer.span("TaskAgent.process", root) as process:
+            with tracer.span("TaskAgent.llm", model="gpt") as llm:
+                self.assertIs(current_span.get(), llm)
+        self.assertIsNone(current_span.get())
+
+        self.assertEqual(exporter.spans, [root, llm, process])
+        self.assertEqual(llm.parent_id, process.span_id)
+        self.assertEqual(process.parent_id, root.span_id)
+        self.assertEqual(llm.trace_id, "a" * 32)
+        self.assertEqual(root.end - root.start, 1_000_000_000)
+
+    def test_without_trace_context_no_span_is_started(self):
+        tracer = Tracer(MemoryExporter())
+
+        with tracer.span("TaskAgent.llm") as recorded:
+            self.assertIsNone(recorded)
+
+    def test_exports_otlp_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            exporter = JsonlSpanExporter(path, flush_interval=0.01)
+            tracer = Tracer(exporter)
+            root = tracer.record("TaskAgent.queue_wait", 1.0, 2.0, "a" * 32)
+            with self.assertRaises(ValueError):
+                with tracer.span("TaskAgent.llm", root, tokens=12):
+                    raise ValueError("rate limited")
+            exporter.close()
+
+            with open(path) as file:
+                spans = [
+                    span
+                    for line in file
+                    for resource in json.loads(line)["resourceSpans"]
+                    for scope in resource["scopeSpans"]
+                    for span in scope["spans"]
+                ]
+            traces = load_traces(path)
+
+        self.assertEqual(
+            [s["name"] for s in spans], ["TaskAgent.queue_wait", "TaskAgent.llm"]
+        )
+        llm = spans[1]
+        self.assertEqual(llm["parentSpanId"], root.span_id)
+        self.assertEqual(llm["status"], {"code": 2, "message": "rate limited"})
+        self.assertIn({"key": "tokens", "value": {"intValue": "12"}}, llm["attributes"])
+        self.assertEqual(len(traces["a" * 32]), 2)
+
+
+class TestTraceContext(unittest.TestCase):
+    def test_codec_keeps_span_id(self):
+        envelope = Envelope.create(make_profile()).with_profile(
+            make_profile(), "TaskAgent", span_id="0123456789abcdef"
+        )
+
+        self.assertEqual(decode_message(encode_message(envelope)), envelope)
+        self.assertEqual(envelope.update(risk_level="LOW").span_id, "0123456789abcdef")
+        untraced = Envelope.create(make_profile())
+        self.assertEqual(decode_message(encode_message(untraced)).span_id, "")
+
+
+class TestAgentSpans(unittest.IsolatedAsyncioTestCase):
+    async def test_spans_of_a_workflow_form_one_trace(self):
+        exporter = MemoryExporter()
+        registry = AgentRegistry()
+        tracker = WorkflowTracker()
+        risk_queue, escalation_queue = asyncio.Queue(), asyncio.Queue()
+        registry.register("next_action", escalation_queue)
+        agents = [
+            RiskAssessmentAgent("RiskAssessmentAgent", risk_queue, registry),
+            EscalationAgent("EscalationAgent", escalation_queue, registry),
+        ]
+        for agent in agents:
+            agent.tracer = Tracer(exporter)
+            agent.workflows = tracker
+        tasks = [asyncio.create_task(agent.run()) for agent in agents]
+
+        envelope = Envelope.ingress(make_profile())
+        done = tracker.track(envelope.workflow_id)
+        await AdmissionController(risk_queue).submit(envelope)
+        result = await asyncio.wait_for(done, 1)
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        spans = {span.name: span for span in exporter.spans}
+        self.assertEqual({s.trace_id for s in exporter.spans}, {envelope.workflow_id})
+        publish = spans["RiskAssessmentAgent.publish"]
+        self.assertEqual(result.envelope.span_id, publish.span_id)
+        self.assertEqual(
+            publish.parent_id, spans["RiskAssessmentAgent.process"].span_id
+        )
+        self.assertEqual(spans["EscalationAgent.queue_wait"].parent_id, publish.span_id)
+        self.assertIsNone(spans["RiskAssessmentAgent.queue_wait"].parent_id)
+
+
+class TestCriticalPath(unittest.TestCase):
+    def test_splits_chain_among_children(self):
+        spans = [
+            span("A.queue_wait", "1", None, 0.0, 1.0),
+            span("A.process", "2", "1", 1.0, 5.0),
+            span("A.llm", "3", "2", 2.0, 4.0),
+            span("A.publish", "4", "2", 4.5, 4.6),
+            span("B.queue_wait", "5", "4", 4.6, 6.0),
+            span("B.process", "6", "5", 6.0, 7.0),
+            span("A.retrieval", "7", "2", 4.8, 4.9),
+        ]
+
+        path = critical_path(spans)
+
+        self.assertEqual(
+            [name for name, _ in path],
+            [
+                "A.queue_wait",
+                "A.process",
+                "A.llm",
+                "A.process",
+                "A.publish",
+                "B.queue_wait",
+                "B.process",
+            ],
+        )
+        self.assertAlmostEqual(dict(path)["A.llm"], 2.0)
+        self.assertAlmostEqual(sum(seconds for _, seconds in path), 7.0)
+
+    def test_gap_between_spans_is_untraced(self):
+        spans = [
+            span("A.process", "1", None, 0.0, 1.0),
+            span("A.publish", "2", "1", 1.5, 2.0),
+        ]
+
+        self.assertEqual(
+            critical_path(spans),
+            [("A.process", 1.0), (UNTRACED, 0.5), ("A.publish", 0.5)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
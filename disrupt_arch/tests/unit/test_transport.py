@@ -0,0 +1,189 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import unittest
+
+from agents import AgentRegistry
+from samples import make_profile
+from transport import BrokerTransport, InProcessTransport, MessageBroker
+from transport.protocol import write_frame
+
+executed = []
+
+
+def execute():
+    executed.append(True)
+
+
+class Exploit:
+    def __reduce__(self):
+        return execute, ()
+
+
+async def drain(queue: asyncio.Queue) -> list[str]:
+    names = []
+    while not queue.empty():
+        names.append(queue.get_nowait().name)
+    return names
+
+
+class TestInProcessTransport(unittest.TestCase):
+    def test_registry_defaults_to_in_process_queues(self):
+        registry = AgentRegistry()
+        queue = asyncio.Queue()
+        registry.register("escalate", queue)
+        registry.register("escalate", queue)
+
+        self.assertIsInstance(registry.transport, InProcessTransport)
+        self.assertEqual(registry.get_agents_for_task("escalate"), [queue])
+        self.assertEqual(registry.get_agents_for_task("unknown"), [])
+
+
+class TestBrokerTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.broker = MessageBroker(port=0, batch_size=8)
+        await self.broker.start()
+        self.transports = []
+
+    async def asyncTearDown(self):
+        for transport in self.transports:
+            await transport.close()
+        await self.broker.stop()
+
+    async def node(self, **kwargs) -> AgentRegistry:
+        transport = BrokerTransport(port=self.broker.port, **kwargs)
+        self.transports.append(transport)
+        registry = AgentRegistry(transport)
+        await transport.connect()
+        return registry
+
+    async def test_nodes_share_messages_of_a_task(self):
+        producer = await self.node()
+        consumers = [await self.node(prefetch=4), await self.node(prefetch=4)]
+        queues = [asyncio.Queue(), asyncio.Queue()]
+        for registry, queue in zip(consumers, queues):
+            registry.register("installment_plan", queue)
+        await asyncio.sleep(0.05)
+
+        (endpoint,) = producer.get_agents_for_task("installment_plan")
+        await asyncio.gather(*(endpoint.put(make_profile(str(i))) for i in range(40)))
+        for _ in range(100):
+            if (
+                sum(queue.qsize() for queue in queues) == 40
+                and self.broker.stats()["acked"] == 40
+            ):
+                break
+            await asyncio.sleep(0.01)
+
+        names = [await drain(queue) for queue in queues]
+        self.assertEqual(sorted(int(n) for n in names[0] + names[1]), list(range(40)))
+        self.assertTrue(all(names))
+        self.assertEqual(self.broker.stats()["acked"], 40)
+
+    async def test_publishes_are_batched_and_confirmed(self):
+        producer = await self.node(batch_size=10, linger=0.05)
+        (endpoint,) = producer.get_agents_for_task("escalate")
+
+        await asyncio.gather(*(endpoint.put(make_profile(str(i))) for i in range(25)))
+
+        self.assertEqual(self.broker.stats()["published"], 25)
+        self.assertEqual(self.broker.stats()["queued"]["escalate"], 25)
+        self.assertEqual(next(self.transports[0].sequence), 4)
+
+    async def test_unacknowledged_messages_are_redelivered(self):
+        producer = await self.node()
+        first = await self.node(prefetch=2)
+        blocked = asyncio.Queue(maxsize=1)
+        first.register("escalate", blocked)
+        await asyncio.sleep(0.05)
+
+        (endpoint,) = producer.get_agents_for_task("escalate")
+        await asyncio.gather(*(endpoint.put(make_profile(str(i))) for i in range(3)))
+        await asyncio.sleep(0.05)
+        await self.transports[1].close()
+        await asyncio.sleep(0.05)
+
+        second = await self.node()
+        queue = asyncio.Queue()
+        second.register("escalate", queue)
+        for _ in range(100):
+            if queue.qsize() == 3:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(await drain(queue), ["0", "1", "2"])
+        self.assertEqual(self.broker.stats()["redelivered"], 2)
+
+    async def test_full_inbox_does_not_hold_up_confirms(self):
+        producer = await self.node()
+        forwarder = await self.node(prefetch=64)
+        inbox = asyncio.Queue(maxsize=2)
+        forwarder.register("escalate", inbox)
+        consumer = await self.node()
+        outbox = asyncio.Queue()
+        consumer.register("contact_debtor", outbox)
+        await asyncio.sleep(0.05)
+
+        (forward,) = forwarder.get_agents_for_task("contact_debtor")
+
+        async def worker():
+            while True:
+                await forward.put(await inbox.get())
+
+        workers = [asyncio.create_task(worker()) for _ in range(2)]
+        (endpoint,) = producer.get_agents_for_task("escalate")
+        await asyncio.gather(*(endpoint.put(make_profile(str(i))) for i in range(10)))
+        for _ in range(100):
+            if outbox.qsize() == 10:
+                break
+            await asyncio.sleep(0.01)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        self.assertEqual(sorted(int(n) for n in await drain(outbox)), list(range(10)))
+
+    async def test_pickled_messages_are_never_unpickled(self):
+        producer = await self.node()
+        consumer = await self.node()
+        queue = asyncio.Queue()
+        consumer.register("escalate", queue)
+        await asyncio.sleep(0.05)
+
+        _, writer = await asyncio.open_connection("127.0.0.1", self.broker.port)
+        payload = bytes([0]) + pickle.dumps(Exploit())
+        write_frame(
+            writer,
+            {"op": "publish", "task": "escalate", "seq": 1},
+            [payload],
+        )
+        await writer.drain()
+        (endpoint,) = producer.get_agents_for_task("escalate")
+        await endpoint.put(make_profile("Alice"))
+        message = await asyncio.wait_for(queue.get(), 1)
+        writer.close()
+
+        self.assertEqual(message, make_profile("Alice"))
+        self.assertEqual(executed, [])
+        self.assertTrue(queue.empty())
+
+
+class TestUnixSocketBroker(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip_over_unix_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+        broker = MessageBroker(path=path)
+        await broker.start()
+        transport = BrokerTransport(path=path)
+        registry = AgentRegistry(transport)
+        queue = asyncio.Queue()
+        registry.register("contact_debtor", queue)
+        await transport.connect()
+
+        (endpoint,) = registry.get_agents_for_task("contact_debtor")
+        await endpoint.put(make_profile("Alice"))
+        message = await asyncio.wait_for(queue.get(), 1)
+
+        await transport.close()
+        await broker.stop()
+        self.assertEqual(message, make_profile("Alice"))
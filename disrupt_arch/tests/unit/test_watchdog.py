@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from agents.base.agent import Agent
+from models import DebtorProfile
+from observability import LoopWatchdog, MetricsServer, render_prometheus
+
+
+class BlockingAgent(Agent):
+    async def process_message(self, message: DebtorProfile):
+        await self.query_knowledge()
+
+    async def query_knowledge(self):
+        time.sleep(0.3)
+
+
+class TestLoopWatchdog(unittest.IsolatedAsyncioTestCase):
+    async def test_attributes_stall_to_agent_method(self):
+        queue = asyncio.Queue()
+        agent = BlockingAgent("BlockingAgent", queue, num_workers=1)
+        directory = tempfile.TemporaryDirectory()
+        export_path = os.path.join(directory.name, "stalls.json")
+        watchdog = LoopWatchdog(threshold=0.1, interval=0.02, export_path=export_path)
+        await watchdog.start()
+        task = asyncio.create_task(agent.run())
+
+        await queue.put("message")
+        await asyncio.wait_for(queue.join(), 2)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await watchdog.stop()
+
+        (site,) = [s for s in watchdog.stats() if s["agent"] == "BlockingAgent"]
+        self.assertEqual(site["method"], "query_knowledge")
+        self.assertIn("test_watchdog.py", site["site"])
+        self.assertEqual(site["count"], 1)
+        self.assertGreaterEqual(site["max_seconds"], 0.2)
+        self.assertGreaterEqual(watchdog.lag.count, 1)
+
+        with open(export_path) as file:
+            self.assertEqual(json.load(file)["stalls"], watchdog.stalls)
+        directory.cleanup()
+
+        metrics = render_prometheus([agent], watchdog)
+        self.assertIn(
+            'event_loop_stalls_total{agent="BlockingAgent",method="query_knowledge"} 1',
+            metrics,
+        )
+        self.assertIn('event_loop_lag_seconds_bucket{le="+Inf"}', metrics)
+
+    async def test_no_stall_without_blocking(self):
+        watchdog = LoopWatchdog(threshold=0.1, interval=0.01)
+        await watchdog.start()
+        await asyncio.sleep(0.1)
+        await watchdog.stop()
+
+        self.assertEqual(watchdog.stalls, 0)
+        self.assertEqual(watchdog.stats(), [])
+        self.assertGreater(watchdog.lag.count, 0)
+
+    async def test_serves_stalls(self):
+        watchdog = LoopWatchdog()
+        watchdog.record_stall(0.5)
+        server = MetricsServer([], port=0, watchdog=watchdog)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /stalls.json HTTP/1.1\r\n\r\n")
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            await server.stop()
+
+        stalls = json.loads(response.split("\r\n\r\n", 1)[1])
+        self.assertEqual(stalls["stalls"], 1)
+        self.assertEqual(stalls["sites"][0]["agent"], "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from agents import (
+    AdmissionController,
+    AgentRegistry,
+    EscalationAgent,
+    RiskAssessmentAgent,
+    WorkflowTracker,
+)
+from messages import Envelope, decode_message, encode_message
+from samples import make_profile
+
+
+class TestEnvelopeTimings(unittest.TestCase):
+    def test_records_timings_per_hop(self):
+        envelope = Envelope.create(make_profile(), created_at=100.0)
+
+        first = envelope.with_profile(envelope.profile, "TaskAgent", received_at=101.0)
+        second = first.with_profile(first.profile, "RiskAssessmentAgent")
+
+        self.assertEqual(len(second.timings), 2)
+        self.assertEqual(second.timings[0][0], 101.0)
+        self.assertEqual(second.update(risk_level="HIGH").timings, second.timings)
+        hop, waited, _ = second.breakdown()[0]
+        self.assertEqual((hop, waited), ("TaskAgent", 1.0))
+
+    def test_codec_keeps_timings(self):
+        envelope = Envelope(
+            make_profile(),
+            "0123456789abcdef" * 2,
+            100.0,
+            ("TaskAgent",),
+            ((101.0, 102.5),),
+        )
+
+        self.assertEqual(decode_message(encode_message(envelope)), envelope)
+
+
+class TestWorkflowTracker(unittest.IsolatedAsyncioTestCase):
+    async def test_terminal_agent_completes_workflow(self):
+        registry = AgentRegistry()
+        tracker = WorkflowTracker()
+        risk_queue, escalation_queue = asyncio.Queue(), asyncio.Queue()
+        registry.register("next_action", escalation_queue)
+        risk_agent = RiskAssessmentAgent("RiskAssessmentAgent", risk_queue, registry)
+        escalation_agent = EscalationAgent(
+            "EscalationAgent", escalation_queue, registry
+        )
+        escalation_agent.workflows = tracker
+        completed = []
+        tracker.add_listener(completed.append)
+        tasks = [
+            asyncio.create_task(risk_agent.run()),
+            asyncio.create_task(escalation_agent.run()),
+        ]
+
+        envelope = Envelope.ingress(make_profile())
+        done = tracker.track(envelope.workflow_id)
+        self.assertTrue(await AdmissionController(risk_queue).submit(envelope))
+        result = await asyncio.wait_for(done, 1)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertEqual(result.workflow_id, envelope.workflow_id)
+        self.assertEqual(result.agent, "EscalationAgent")
+        self.assertEqual(
+            result.envelope.hops, ("RiskAssessmentAgent", "EscalationAgent")
+        )
+        self.assertEqual(result.envelope.profile.risk_level, "HIGH")
+        self.assertGreaterEqual(result.latency, 0)
+        self.assertEqual(completed, [result])
+        self.assertEqual(tracker.stats(), {"pending": 0, "completed": 1, "failed": 0})
+
+    async def test_forget_cancels_waiting(self):
+        tracker = WorkflowTracker()
+        done = tracker.track("a" * 32)
+
+        tracker.forget("a" * 32)
+
+        self.assertTrue(done.cancelled())
+        self.assertEqual(tracker.stats()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,12 @@
+from .base import InProcessTransport, Transport
+from .broker import MessageBroker
+from .client import BrokerTransport, RemoteQueue, open_transport
+
+__all__ = [
+    "BrokerTransport",
+    "InProcessTransport",
+    "MessageBroker",
+    "RemoteQueue",
+    "Transport",
+    "open_transport",
+]
@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from asyncio import Queue
+
+
+class Transport(ABC):
+    """
+    Carries messages between agents. Agents bind their queue to the tasks they
+    handle and publish to the endpoints of a task, which offer an async put.
+    """
+
+    @abstractmethod
+    def bind(self, task: str, queue: Queue):
+        """Delivers the messages of a task into a local queue."""
+        pass
+
+    @abstractmethod
+    def endpoints(self, task: str) -> list:
+        """Returns the queues messages of a task are published to."""
+        pass
+
+    async def connect(self):
+        """Opens the connections of the transport, if any."""
+        pass
+
+    async def close(self):
+        """Closes the connections of the transport, if any."""
+        pass
+
+
+class InProcessTransport(Transport):
+    """Publishes messages straight into the queues of agents in this process."""
+
+    def __init__(self):
+        self.queues: dict[str, list[Queue]] = {}
+
+    def bind(self, task: str, queue: Queue):
+        if task not in self.queues:
+            self.queues[task] = []
+        if queue not in self.queues[task]:
+            self.queues[task].append(queue)
+
+    def endpoints(self, task: str) -> list[Queue]:
+        return self.queues.get(task, [])
@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import itertools
+import logging
+from collections import defaultdict, deque
+
+from .protocol import read_frame, write_frame
+
+
+class Subscription:
+    def __init__(self, writer: asyncio.StreamWriter, task: str, prefetch: int):
+        """
+        A connection consuming the messages of a task.
+        :param writer: The connection of the consumer.
+        :param task: The task consumed.
+        :param prefetch: Messages delivered to the consumer before it acknowledges.
+        """
+        self.writer = writer
+        self.task = task
+        self.credit = prefetch
+        self.unacked: dict[int, bytes] = {}
+
+
+class MessageBroker:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 7000,
+        path: str | None = None,
+        batch_size: int = 64,
+    ):
+        """
+        Lightweight broker holding one queue per task. Consumers of a task share its
+        messages, so agents of one type can run on several nodes. Published batches
+        are confirmed once queued, and delivered messages are redelivered to another
+        consumer if their consumer disconnects before acknowledging them.
+        :param host: The host to listen on.
+        :param port: The TCP port to listen on. 0 picks a free port.
+        :param path: Listen on this Unix socket instead of TCP.
+        :param batch_size: Maximum messages per delivery.
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = batch_size
+        self.queues: dict[str, deque[tuple[int, bytes]]] = defaultdict(deque)
+        self.subscribers: dict[str, list[Subscription]] = defaultdict(list)
+        self.ids = itertools.count(1)
+        self.writers: set[asyncio.StreamWriter] = set()
+        self.server: asyncio.Server | None = None
+        self.published = 0
+        self.delivered = 0
+        self.acked = 0
+        self.redelivered = 0
+
+    async def start(self):
+        if self.path:
+            self.server = await asyncio.start_unix_server(self.handle, self.path)
+        else:
+            self.server = await asyncio.start_server(self.handle, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"Message broker listening on {self.path or self.port}.")
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves the frames of one client connection."""
+        self.writers.add(writer)
+        subscriptions: dict[str, Subscription] = {}
+        try:
+            while (received := await read_frame(reader)) is not None:
+                frame, payloads = received
+                task = frame["task"]
+                if frame["op"] == "publish":
+                    self.queues[task].extend(
+                        (next(self.ids), message) for message in payloads
+                    )
+                    self.published += len(payloads)
+                    write_frame(writer, {"op": "confirm", "seq": frame["seq"]})
+                elif frame["op"] == "subscribe":
+                    subscription = Subscription(writer, task, frame["prefetch"])
+                    subscriptions[task] = subscription
+                    self.subscribers[task].append(subscription)
+                elif frame["op"] == "ack":
+                    subscription = subscriptions[task]
+                    for message_id in frame["ids"]:
+                        subscription.unacked.pop(message_id, None)
+                    subscription.credit += len(frame["ids"])
+                    self.acked += len(frame["ids"])
+
+                self.dispatch(task)
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError) as e:
+            logging.warning(f"Message broker dropped a connection: {e}")
+        finally:
+            self.writers.discard(writer)
+            for task, subscription in subscriptions.items():
+                self.subscribers[task].remove(subscription)
+                self.queues[task].extendleft(reversed(subscription.unacked.items()))
+                self.redelivered += len(subscription.unacked)
+                self.dispatch(task)
+            writer.close()
+
+    def dispatch(self, task: str):
+        """Delivers queued messages of a task to consumers with credit, in turns."""
+        queue = self.queues[task]
+        while queue:
+            ready = [s for s in self.subscribers[task] if s.credit > 0]
+            if not ready:
+                return
+
+            share = max(len(queue) // len(ready), 1)
+            for subscription in ready:
+                count = min(subscription.credit, self.batch_size, share, len(queue))
+                batch = [queue.popleft() for _ in range(count)]
+                subscription.unacked.update(batch)
+                subscription.credit -= count
+                self.delivered += count
+                write_frame(
+                    subscription.writer,
+                    {
+                        "op": "deliver",
+                        "task": task,
+                        "ids": [message_id for message_id, _ in batch],
+                    },
+                    [message for _, message in batch],
+                )
+                if not queue:
+                    return
+
+    def stats(self) -> dict:
+        return {
+            "queued": {task: len(queue) for task, queue in self.queues.items()},
+            "consumers": {task: len(subs) for task, subs in self.subscribers.items()},
+            "published": self.published,
+            "delivered": self.delivered,
+            "acked": self.acked,
+            "redelivered": self.redelivered,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the agent message broker.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--path", help="Unix socket path, replaces host and port.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MessageBroker(args.host, args.port, args.path).serve_forever())
@@ -0,0 +1,239 @@
+import asyncio
+import itertools
+import logging
+from asyncio import Queue
+
+from config import settings
+from messages import decode_message, encode_message
+
+from .base import InProcessTransport, Transport
+from .protocol import read_frame, write_frame
+
+
+class RemoteQueue:
+    def __init__(self, transport: "BrokerTransport", task: str):
+        """Publishes the messages of a task to the broker."""
+        self.transport = transport
+        self.task = task
+
+    async def put(self, item):
+        """Returns once the broker confirmed the message."""
+        await self.transport.publish(self.task, item)
+
+    def qsize(self) -> int:
+        return 0
+
+    def __repr__(self):
+        return f"<RemoteQueue {self.task}>"
+
+
+class BrokerTransport(Transport):
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 7000,
+        path: str | None = None,
+        batch_size: int = 64,
+        linger: float = 0.002,
+        prefetch: int = 64,
+    ):
+        """
+        Exchanges messages through a MessageBroker. A node binds one queue per task,
+        and all nodes bound to a task share its messages. Messages travel in their
+        compact binary encoding and are not validated again on arrival.
+        :param host: The host of the broker.
+        :param port: The TCP port of the broker.
+        :param path: Connect to this Unix socket instead of TCP.
+        :param batch_size: Maximum messages published in one frame.
+        :param linger: Seconds a publish waits for further messages to batch.
+        :param prefetch: Messages delivered per task before they are acknowledged.
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.prefetch = prefetch
+        self.bindings: dict[str, Queue] = {}
+        self.remote_queues: dict[str, RemoteQueue] = {}
+        self.batches: dict[str, tuple[list[bytes], asyncio.Future]] = {}
+        self.flush_tasks: dict[str, asyncio.Task] = {}
+        self.confirms: dict[int, asyncio.Future] = {}
+        self.sequence = itertools.count(1)
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self.receiver: asyncio.Task | None = None
+        self.deliveries: dict[str, Queue] = {}
+        self.delivery_tasks: dict[str, asyncio.Task] = {}
+        self.published = 0
+        self.received = 0
+
+    def bind(self, task: str, queue: Queue):
+        if task in self.bindings and self.bindings[task] is not queue:
+            raise ValueError(f"A queue is already bound to task {task}.")
+        self.bindings[task] = queue
+        if self.writer is not None:
+            self.subscribe(task)
+
+    def subscribe(self, task: str):
+        write_frame(
+            self.writer, {"op": "subscribe", "task": task, "prefetch": self.prefetch}
+        )
+
+    def endpoints(self, task: str) -> list[RemoteQueue]:
+        if task not in self.remote_queues:
+            self.remote_queues[task] = RemoteQueue(self, task)
+        return [self.remote_queues[task]]
+
+    async def connect(self):
+        if self.path:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        for task in self.bindings:
+            self.subscribe(task)
+        await self.writer.drain()
+        self.receiver = asyncio.create_task(self.receive())
+
+    async def close(self):
+        for task in list(self.flush_tasks.values()):
+            task.cancel()
+        for task in list(self.delivery_tasks.values()):
+            task.cancel()
+        if self.receiver is not None:
+            self.receiver.cancel()
+            await asyncio.gather(self.receiver, return_exceptions=True)
+        if self.writer is not None:
+            self.writer.close()
+        self.fail_pending(ConnectionError("Transport closed."))
+
+    async def publish(self, task: str, item):
+        """Adds a message to the open batch of its task and waits for the confirm."""
+        if task not in self.batches:
+            self.batches[task] = ([], asyncio.get_running_loop().create_future())
+        messages, confirmed = self.batches[task]
+        messages.append(encode_message(item))
+
+        if len(messages) >= self.batch_size:
+            await self.flush(task)
+        elif task not in self.flush_tasks:
+            self.flush_tasks[task] = asyncio.create_task(self.flush_later(task))
+        await confirmed
+
+    async def flush_later(self, task: str):
+        await asyncio.sleep(self.linger)
+        self.flush_tasks.pop(task, None)
+        await self.flush(task)
+
+    async def flush(self, task: str):
+        """Sends the open batch of a task."""
+        if task not in self.batches:
+            return
+        messages, confirmed = self.batches.pop(task)
+        flush_task = self.flush_tasks.pop(task, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+        seq = next(self.sequence)
+        self.confirms[seq] = confirmed
+        try:
+            write_frame(
+                self.writer,
+                {"op": "publish", "task": task, "seq": seq},
+                messages,
+            )
+            await self.writer.drain()
+        except Exception as e:
+            self.confirms.pop(seq, None)
+            if not confirmed.done():
+                confirmed.set_exception(e)
+            return
+        self.published += len(messages)
+
+    async def receive(self):
+        """
+        Handles confirms and deliveries from the broker. Deliveries are handed
+        to a delivery task per task, so a full bound queue never holds up the
+        confirms workers may be waiting for. The prefetch credit bounds the
+        handed over messages.
+        """
+        try:
+            while (received := await read_frame(self.reader)) is not None:
+                frame, payloads = received
+                if frame["op"] == "confirm":
+                    confirmed = self.confirms.pop(frame["seq"], None)
+                    if confirmed is not None and not confirmed.done():
+                        confirmed.set_result(None)
+                elif frame["op"] == "deliver":
+                    self.handover(frame["task"], list(zip(frame["ids"], payloads)))
+            logging.warning("Message broker closed the connection.")
+        except ConnectionError as e:
+            logging.error(f"Message broker connection failed: {e}")
+        self.fail_pending(ConnectionError("Message broker connection lost."))
+
+    def handover(self, task: str, messages: list):
+        if task not in self.deliveries:
+            self.deliveries[task] = Queue()
+            self.delivery_tasks[task] = asyncio.create_task(self.delivery(task))
+        self.deliveries[task].put_nowait(messages)
+
+    async def delivery(self, task: str):
+        """Delivers the handed over messages of a task in order."""
+        deliveries = self.deliveries[task]
+        while True:
+            messages = await deliveries.get()
+            try:
+                await self.deliver(task, messages)
+            except ConnectionError as e:
+                logging.error(f"Unable to acknowledge messages of {task}: {e}")
+
+    async def deliver(self, task: str, messages: list):
+        """Puts delivered messages into the bound queue and acknowledges them."""
+        queue = self.bindings[task]
+        for message_id, message in messages:
+            try:
+                decoded = decode_message(message)
+            except Exception as e:
+                logging.error(f"Dropped undecodable message {message_id}: {e}")
+                continue
+            await queue.put(decoded)
+        self.received += len(messages)
+        write_frame(
+            self.writer,
+            {
+                "op": "ack",
+                "task": task,
+                "ids": [message_id for message_id, _ in messages],
+            },
+        )
+        await self.writer.drain()
+
+    def fail_pending(self, error: Exception):
+        pending = list(self.confirms.values()) + [
+            confirmed for _, confirmed in self.batches.values()
+        ]
+        self.confirms.clear()
+        self.batches.clear()
+        for confirmed in pending:
+            if not confirmed.done():
+                confirmed.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "received": self.received,
+            "pending_confirms": len(self.confirms),
+        }
+
+
+def open_transport() -> Transport:
+    """Creates the transport configured in the settings."""
+    if settings.TRANSPORT == "memory":
+        return InProcessTransport()
+    if settings.TRANSPORT == "broker":
+        return BrokerTransport(
+            settings.BROKER_HOST, settings.BROKER_PORT, settings.BROKER_PATH
+        )
+    raise ValueError(f"Unknown transport: {settings.TRANSPORT}")
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import struct
+
+# Frames are a 4 byte big-endian length followed by a JSON control header. A
+# header with "payloads" is followed by that many binary payloads, each with
+# its own 4 byte length, so encoded messages travel as they are.
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+async def read_part(reader: asyncio.StreamReader) -> bytes:
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the maximum frame size.")
+    return await reader.readexactly(size)
+
+
+async def read_frame(
+    reader: asyncio.StreamReader,
+) -> tuple[dict, list[bytes]] | None:
+    """
+    Reads the next frame and its payloads, or returns None when the connection
+    was closed.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the maximum frame size.")
+    frame = json.loads(await reader.readexactly(size))
+    return frame, [await read_part(reader) for _ in range(frame.get("payloads", 0))]
+
+
+def write_frame(writer: asyncio.StreamWriter, frame: dict, payloads: list[bytes] = ()):
+    """Writes a frame to the buffer of the writer. Drain to apply backpressure."""
+    if payloads:
+        frame = {**frame, "payloads": len(payloads)}
+    header = json.dumps(frame, separators=(",", ":")).encode()
+    parts = [HEADER.pack(len(header)), header]
+    for payload in payloads:
+        parts += [HEADER.pack(len(payload)), payload]
+    writer.writelines(parts)